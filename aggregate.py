@@ -0,0 +1,146 @@
+"""Summarize matching close approaches without building an object per match.
+
+`aggregate` folds a stream of row ids of an `ApproachTable` into per-group
+metrics in a single pass, reading each value straight from the table's columns.
+Rows can be grouped by the year or month of the approach, by NEO, or by the
+hazard flag of the NEO, and each group reports any of:
+
+* `count` - the number of matching approaches;
+* `min_<column>`, `max_<column>`, `mean_<column>` and `sum_<column>`, where the
+  column is one of `distance`, `velocity` and `diameter`.
+
+Approaches of NEOs without a known diameter are counted, but are left out of the
+diameter metrics; a metric over no values is `None`.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+from helpers import minutes_to_datetime
+from table import ApproachTable
+
+# The ways of grouping rows.
+GROUPINGS = ("year", "month", "neo", "hazardous")
+
+# The columns that metrics can summarize, and the functions applied to them.
+METRIC_COLUMNS = ("distance", "velocity", "diameter")
+METRIC_FUNCTIONS = ("min", "max", "mean", "sum")
+
+_MINUTES_PER_DAY = 24 * 60
+
+
+def parse_metric(metric: str) -> Tuple[str, str | None]:
+    """Split the name of a metric into its function and column.
+
+    :param metric: A metric name, such as 'count' or 'mean_distance'.
+    :return: A (function, column) pair; the column of `count` is `None`.
+    :raises ValueError: If the metric is unknown.
+    """
+    if metric == "count":
+        return "count", None
+    function, _, column = metric.partition("_")
+    if function not in METRIC_FUNCTIONS or column not in METRIC_COLUMNS:
+        raise ValueError(
+            f"Unknown metric {metric!r}; expected 'count' or one of "
+            f"{'/'.join(METRIC_FUNCTIONS)} followed by '_' and one of "
+            f"{'/'.join(METRIC_COLUMNS)}."
+        )
+    return function, column
+
+
+def _group_key(table: ApproachTable, group_by: str | None) -> Callable[[int], Any]:
+    """Return a function mapping a row id to the key of its group."""
+    if group_by is None:
+        return lambda row: None
+    if group_by == "neo":
+        designations = [neo.designation for neo in table.neos] + [None]
+        neo_index = table.neo_index
+        return lambda row: designations[neo_index[row]]
+    if group_by == "hazardous":
+        # Unlinked approaches have a hazard flag of -1 and form a group of `None`.
+        flags = [bool(flag) if flag >= 0 else None for flag in table.hazardous]
+        neo_index = table.neo_index
+        return lambda row: flags[neo_index[row]]
+    if group_by not in ("year", "month"):
+        raise ValueError(
+            f"Unknown grouping {group_by!r}; expected one of {', '.join(GROUPINGS)}."
+        )
+
+    # Many approaches share a day, so the key of each day is only computed once.
+    epochs = table.epochs
+    keys: Dict[int, Any] = {}
+
+    def key(row: int) -> Any:
+        day = epochs[row] // _MINUTES_PER_DAY
+        if day not in keys:
+            date = minutes_to_datetime(day * _MINUTES_PER_DAY)
+            keys[day] = date.year if group_by == "year" else f"{date:%Y-%m}"
+        return keys[day]
+
+    return key
+
+
+def aggregate(
+    table: ApproachTable,
+    rows: Iterable[int],
+    group_by: str | None = None,
+    metrics: Sequence[str] = ("count",),
+) -> Dict[Any, Dict[str, Any]]:
+    """Compute metrics over groups of rows of a table in one pass.
+
+    :param table: The table the rows belong to.
+    :param rows: The ids of the rows to summarize.
+    :param group_by: One of `GROUPINGS`, or `None` for a single group.
+    :param metrics: The names of the metrics to compute.
+    :return: A dictionary from each group's key (`None` without a grouping) to a
+        dictionary from metric name to value, with groups in order of their keys.
+    :raises ValueError: If the grouping or a metric is unknown.
+    """
+    parsed = [parse_metric(metric) for metric in metrics]
+    columns = sorted({column for _, column in parsed if column is not None})
+    readers: List[Tuple[Sequence[float], Sequence[int] | None]] = [
+        (
+            table.column(column),
+            table.neo_index if column == "diameter" else None,
+        )
+        for column in columns
+    ]
+    key = _group_key(table, group_by)
+
+    # Each group holds its count, then [n, sum, min, max] for each column.
+    groups: Dict[Any, List[Any]] = {}
+    for row in rows:
+        group = key(row)
+        state = groups.get(group)
+        if state is None:
+            state = groups[group] = [0] + [[0, 0.0, None, None] for _ in columns]
+        state[0] += 1
+        for summary, (values, neo_index) in zip(state[1:], readers):
+            value = values[row if neo_index is None else neo_index[row]]
+            if value != value:
+                continue
+            summary[0] += 1
+            summary[1] += value
+            if summary[2] is None or value < summary[2]:
+                summary[2] = value
+            if summary[3] is None or value > summary[3]:
+                summary[3] = value
+
+    if group_by is None and not groups:
+        groups[None] = [0] + [[0, 0.0, None, None] for _ in columns]
+
+    results: Dict[Any, Dict[str, Any]] = {}
+    for group in sorted(groups, key=lambda group: (group is None, group)):
+        state = groups[group]
+        results[group] = {}
+        for metric, (function, column) in zip(metrics, parsed):
+            if column is None:
+                results[group][metric] = state[0]
+                continue
+            n, total, smallest, largest = state[1 + columns.index(column)]
+            results[group][metric] = {
+                "min": smallest,
+                "max": largest,
+                "mean": total / n if n else None,
+                "sum": total if n else None,
+            }[function]
+    return results
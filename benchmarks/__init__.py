@@ -0,0 +1,6 @@
+"""Micro-benchmarks for the hot paths of loading and querying the dataset.
+
+Run a benchmark from the project root as a module, for example:
+
+    $ python3 -m benchmarks.bench_helpers
+"""
@@ -0,0 +1,66 @@
+"""Compare the Python and NumPy query engines on a multi-million-row table.
+
+A synthetic `ApproachTable` is built directly from columns and wrapped with
+`NEODatabase.from_table`, so that no `CloseApproach` objects are created. Each
+query is timed from planning to the last matching row id, which excludes the
+cost of materializing the matches, the same for both engines.
+
+    $ python3 -m benchmarks.bench_engines [rows]
+"""
+
+import datetime
+import sys
+import time
+import timeit
+from typing import Dict
+
+from benchmarks.synthetic import synthetic_table
+from database import NEODatabase
+from filters import create_filters
+
+QUERIES: Dict[str, Dict] = {
+    "broad velocity range": {"velocity_min": 5.0, "velocity_max": 35.0},
+    "not hazardous, close": {"hazardous": False, "distance_max": 0.2},
+    "decade, fast, large": {
+        "start_date": datetime.date(2000, 1, 1),
+        "end_date": datetime.date(2009, 12, 31),
+        "velocity_min": 30.0,
+        "diameter_min": 0.5,
+    },
+    "one day": {"date": datetime.date(2020, 1, 1)},
+}
+
+
+def main(rows: int = 3_000_000) -> None:
+    """Run the benchmark and print a comparison table."""
+    started = time.perf_counter()
+    table = synthetic_table(rows)
+    database = NEODatabase.from_table(table)
+    print(f"Built {rows} rows in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    database.use_engine("numpy")
+    print(f"Prepared numpy engine in {time.perf_counter() - started:.2f}s")
+
+    print(f"{'query':<24}{'matches':>10}{'python':>12}{'numpy':>12}")
+    for label, criteria in QUERIES.items():
+        filters = create_filters(**criteria)
+        timings = {}
+        matches = {}
+        for engine in ("python", "numpy"):
+            database.use_engine(engine)
+
+            def run() -> None:
+                matches[engine] = list(database.execute(database.plan(filters)))
+
+            timings[engine] = min(timeit.repeat(run, number=1, repeat=3))
+        assert matches["python"] == matches["numpy"]
+        print(
+            f"{label:<24}{len(matches['numpy']):>10}"
+            f"{timings['python'] * 1e3:>10.1f}ms{timings['numpy'] * 1e3:>10.1f}ms"
+            f"   ({timings['python'] / timings['numpy']:.2f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,84 @@
+"""Measure the per-row cost of evaluating a query's filters.
+
+Three evaluation strategies are compared over every close approach:
+
+* the original per-row loop over all filters of `create_filters`, which builds
+  a dictionary of results and calls each `AttributeFilter`;
+* the single predicate of `compile_filters`, called on `CloseApproach` objects;
+* the fused row-id predicate of `ApproachTable`, driven by `filter`.
+
+    $ python3 -m benchmarks.bench_filters
+"""
+
+import datetime
+import pathlib
+import timeit
+from typing import Any, Callable, Dict, List
+
+from benchmarks.synthetic import synthetic_data
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import compile_filters, create_filters
+from models import CloseApproach
+from table import ApproachTable
+
+TESTS_ROOT = pathlib.Path(__file__).parent.parent / "tests"
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+def per_row_loop(approaches: List[CloseApproach], filters: Dict[str, Any]) -> List:
+    """Evaluate the filters the way `NEODatabase.query` originally did."""
+    matches = []
+    for approach in approaches:
+        boolean_dict = {}
+        for filtr_name, filtr in filters.items():
+            if filtr.value is not None:
+                boolean_dict[filtr_name] = filtr(approach)
+        if all(boolean_dict.values()):
+            matches.append(approach)
+    return matches
+
+
+def measure(run: Callable[[], List], rows: int) -> float:
+    """Return the best time per row, in nanoseconds, of a run over `rows` rows."""
+    return min(timeit.repeat(run, number=1, repeat=3)) / rows * 1e9
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    filters = create_filters(
+        start_date=datetime.date(2020, 2, 1),
+        distance_max=0.2,
+        velocity_min=5.0,
+        diameter_max=2.0,
+        hazardous=False,
+    )
+    compiled = compile_filters(filters)
+
+    neos, approaches = load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE)
+    NEODatabase(neos, approaches)
+    datasets = {
+        "test-cad-2020.json": (neos, approaches),
+        "synthetic 500k": synthetic_data(500_000),
+    }
+
+    print(f"{'dataset':<20}{'per-row loop':>14}{'compiled':>12}{'table':>12}")
+    for label, (neos, approaches) in datasets.items():
+        table = ApproachTable.from_approaches(neos, approaches)
+        expected = per_row_loop(approaches, filters)
+        assert [ca for ca in approaches if compiled(ca)] == expected
+        assert [table.row(i) for i in table.select(compiled.bounds)] == expected
+
+        rows = len(approaches)
+        before = measure(lambda: per_row_loop(approaches, filters), rows)
+        objects = measure(lambda: [ca for ca in approaches if compiled(ca)], rows)
+        columns = measure(lambda: list(table.select(compiled.bounds)), rows)
+        print(
+            f"{label:<20}{before:>12.0f}ns{objects:>10.0f}ns{columns:>10.0f}ns"
+            f"   ({before / columns:.1f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
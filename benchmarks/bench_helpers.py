@@ -0,0 +1,68 @@
+"""Compare `helpers.cd_to_datetime` with the `datetime.strptime` it replaces.
+
+The calendar dates of the test data set are parsed repeatedly, both in file
+order (which hits the memoized date prefixes the way loading does) and with
+every date distinct (which only exercises the slicing path).
+
+    $ python3 -m benchmarks.bench_helpers
+"""
+
+import datetime
+import json
+import pathlib
+import timeit
+from typing import Callable, List
+
+from helpers import _parse_cd_date, cd_to_datetime
+
+TEST_CAD_FILE = pathlib.Path(__file__).parent.parent / "tests" / "test-cad-2020.json"
+
+
+def strptime(calendar_date: str) -> datetime.datetime:
+    """Parse a calendar date the way `cd_to_datetime` used to."""
+    return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+
+
+def distinct_dates(n: int) -> List[str]:
+    """Return `n` calendar dates on distinct days."""
+    start = datetime.datetime(1900, 1, 1, 12, 34)
+    return [
+        (start + datetime.timedelta(days=i)).strftime("%Y-%b-%d %H:%M")
+        for i in range(n)
+    ]
+
+
+def measure(parse: Callable[[str], datetime.datetime], dates: List[str]) -> float:
+    """Return the best time per date, in nanoseconds, of parsing all `dates`.
+
+    Each repetition starts from an empty memo of date prefixes.
+    """
+    best = min(
+        timeit.repeat(
+            lambda: [parse(date) for date in dates],
+            setup=_parse_cd_date.cache_clear,
+            number=1,
+            repeat=5,
+        )
+    )
+    return best / len(dates) * 1e9
+
+
+def main() -> None:
+    """Run the benchmark and print a comparison table."""
+    with open(TEST_CAD_FILE) as infile:
+        file_dates = [record[3] for record in json.load(infile)["data"]]
+    workloads = {
+        "test-cad-2020.json": file_dates,
+        "distinct days": distinct_dates(len(file_dates)),
+    }
+    print(f"{'workload':<20}{'strptime':>12}{'cd_to_datetime':>16}{'speedup':>10}")
+    for label, dates in workloads.items():
+        assert [strptime(d) for d in dates] == [cd_to_datetime(d) for d in dates]
+        before = measure(strptime, dates)
+        after = measure(cd_to_datetime, dates)
+        print(f"{label:<20}{before:>10.0f}ns{after:>14.0f}ns{before / after:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Report the memory retained per model object, with and without `__slots__`.
+
+The "before" classes are copies of `NearEarthObject` and `CloseApproach` with
+their `__slots__` removed, so each instance carries a `__dict__` as the models
+used to. Each class is instantiated from the rows of the test data set while
+`tracemalloc` tracks the allocations that remain alive afterwards.
+
+    $ python3 -m benchmarks.bench_memory
+"""
+
+import csv
+import json
+import pathlib
+import tracemalloc
+from typing import Any, Callable, List, Tuple
+
+from models import CloseApproach, NearEarthObject
+
+TESTS_ROOT = pathlib.Path(__file__).parent.parent / "tests"
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+def unslotted(cls: type) -> type:
+    """Return a copy of a slotted class whose instances store attributes in a `__dict__`."""
+    slots = set(getattr(cls, "__slots__", ()))
+    namespace = {
+        key: value
+        for key, value in vars(cls).items()
+        if key != "__slots__" and key not in slots
+    }
+    return type(cls.__name__, cls.__bases__, namespace)
+
+
+def retained_bytes(build: Callable[[], List[Any]]) -> Tuple[int, int]:
+    """Return the number of objects built by `build` and the bytes they retain."""
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        objects = build()
+        after, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return len(objects), after - before
+
+
+def main() -> None:
+    """Run the report and print a comparison table."""
+    with open(TEST_NEO_FILE) as infile:
+        neo_rows = list(csv.reader(infile))[1:]
+    with open(TEST_CAD_FILE) as infile:
+        cad_rows = json.load(infile)["data"]
+
+    def neos(cls: type) -> Callable[[], List[Any]]:
+        return lambda: [cls(row[3], row[4], row[15], row[7]) for row in neo_rows]
+
+    def approaches(cls: type) -> Callable[[], List[Any]]:
+        return lambda: [cls(row[0], row[3], row[4], row[7]) for row in cad_rows]
+
+    print(f"{'model':<18}{'objects':>9}{'__dict__':>12}{'__slots__':>12}{'saved':>8}")
+    for model, build in ((NearEarthObject, neos), (CloseApproach, approaches)):
+        count, before = retained_bytes(build(unslotted(model)))
+        _, after = retained_bytes(build(model))
+        print(
+            f"{model.__name__:<18}{count:>9}{before / count:>10.0f} B"
+            f"{after / count:>10.0f} B{1 - after / before:>8.0%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Measure how sharded queries scale with the number of worker processes.
+
+A synthetic `ApproachTable` is built directly from columns and wrapped with
+`NEODatabase.from_table`. Each broad query is timed from planning to the last
+matching row id with 1, 2, 4, ... workers up to the number of CPUs (or the
+given maximum), and checked against the serial results.
+
+    $ python3 -m benchmarks.bench_parallel [rows] [max_workers]
+"""
+
+import os
+import sys
+import time
+import timeit
+from typing import Dict, List
+
+from benchmarks.synthetic import synthetic_table
+from database import NEODatabase
+from filters import create_filters
+
+QUERIES: Dict[str, Dict] = {
+    "broad velocity range": {"velocity_min": 5.0, "velocity_max": 35.0},
+    "not hazardous, close": {"hazardous": False, "distance_max": 0.2},
+    "fast and large": {"velocity_min": 30.0, "diameter_min": 0.5},
+}
+
+
+def main(rows: int = 3_000_000, max_workers: int | None = None) -> None:
+    """Run the benchmark and print the time and speedup per number of workers."""
+    max_workers = max_workers or os.cpu_count() or 1
+    counts: List[int] = [1]
+    while counts[-1] * 2 < max_workers:
+        counts.append(counts[-1] * 2)
+    if max_workers > 1:
+        counts.append(max_workers)
+
+    started = time.perf_counter()
+    database = NEODatabase.from_table(synthetic_table(rows))
+    print(f"Built {rows} rows in {time.perf_counter() - started:.1f}s")
+
+    print(f"{'query':<24}{'matches':>10}" + "".join(f"{n:>10}w" for n in counts))
+    for label, criteria in QUERIES.items():
+        filters = create_filters(**criteria)
+        timings = {}
+        matches = {}
+        for workers in counts:
+            database.use_workers(workers)
+            # Start the pool's processes before timing.
+            database.count(create_filters(velocity_min=0.0))
+
+            def run() -> None:
+                matches[workers] = list(database.query_rows(filters))
+
+            timings[workers] = min(timeit.repeat(run, number=1, repeat=3))
+            assert matches[workers] == matches[1]
+        print(
+            f"{label:<24}{len(matches[1]):>10}"
+            + "".join(f"{timings[n] * 1e3:>9.0f}ms" for n in counts)
+        )
+        print(
+            f"{'  speedup':<34}"
+            + "".join(f"{timings[1] / timings[n]:>10.2f}x" for n in counts)
+        )
+    database.use_workers(1)
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,82 @@
+"""Compare starting query workers from shared memory and from a pickled database.
+
+A synthetic `ApproachTable` is wrapped with `NEODatabase.from_table` and both
+shared with `NEODatabase.share` and pickled. Each of a few spawned worker
+processes then either attaches to the shared segment or unpickles the database,
+and reports how long that took before it could run its first query.
+
+    $ python3 -m benchmarks.bench_shared [rows] [workers]
+"""
+
+import multiprocessing
+import pickle
+import sys
+import time
+from typing import Any
+
+from benchmarks.synthetic import synthetic_table
+from database import NEODatabase
+from filters import create_filters
+from shared import attach_database
+
+
+def _attach(name: str, queue: Any) -> None:
+    """Attach to a shared database, and report the time taken and a count."""
+    started = time.perf_counter()
+    with attach_database(name) as shared:
+        elapsed = time.perf_counter() - started
+        assert shared.database is not None
+        queue.put((elapsed, shared.database.count(create_filters(velocity_min=30))))
+
+
+def _unpickle(payload: bytes, queue: Any) -> None:
+    """Unpickle a database, and report the time taken and a count."""
+    started = time.perf_counter()
+    database = pickle.loads(payload)
+    elapsed = time.perf_counter() - started
+    queue.put((elapsed, database.count(create_filters(velocity_min=30))))
+
+
+def main(rows: int = 3_000_000, workers: int = 4) -> None:
+    """Run the benchmark and print the startup time of each worker."""
+    started = time.perf_counter()
+    database = NEODatabase.from_table(synthetic_table(rows))
+    print(f"Built {rows} rows in {time.perf_counter() - started:.1f}s")
+    expected = database.count(create_filters(velocity_min=30))
+
+    started = time.perf_counter()
+    exported = database.share()
+    print(
+        f"Exported {exported.segment.size / 2**20:.0f} MiB of shared memory "
+        f"in {(time.perf_counter() - started) * 1e3:.0f} ms"
+    )
+    payload = pickle.dumps(database, protocol=pickle.HIGHEST_PROTOCOL)
+
+    context = multiprocessing.get_context("spawn")
+    with exported:
+        for label, target, argument in (
+            ("shared memory", _attach, exported.name),
+            ("pickle", _unpickle, payload),
+        ):
+            queue = context.Queue()
+            processes = [
+                context.Process(target=target, args=(argument, queue))
+                for _ in range(workers)
+            ]
+            for process in processes:
+                process.start()
+            timings = []
+            for _ in processes:
+                elapsed, count = queue.get()
+                assert count == expected
+                timings.append(elapsed)
+            for process in processes:
+                process.join()
+            print(
+                f"{label:<16}{workers} workers, startup "
+                f"{min(timings) * 1e3:.0f}-{max(timings) * 1e3:.0f} ms each"
+            )
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -0,0 +1,88 @@
+"""Generate synthetic near-Earth objects and close approaches at any scale.
+
+The values are drawn to resemble the public data set: approach times between
+1900 and 2200, distances up to 0.5 au, velocities up to 40 km/s, a known
+diameter for about a tenth of the NEOs, and about one NEO in ten potentially
+hazardous. The returned objects are linked like those of an `NEODatabase`.
+
+For tables of millions of approaches, `synthetic_table` fills the columns of an
+`ApproachTable` directly, without creating a `CloseApproach` per row.
+"""
+
+import datetime
+import random
+from array import array
+from typing import List, Tuple
+
+from helpers import datetime_to_minutes
+from models import CloseApproach, NearEarthObject
+from table import ApproachTable
+
+_START = datetime.datetime(1900, 1, 1)
+_MINUTES = int((datetime.datetime(2200, 1, 1) - _START).total_seconds() // 60)
+
+
+def _synthetic_neos(rng: random.Random, count: int) -> List[NearEarthObject]:
+    """Generate unlinked NEOs."""
+    return [
+        NearEarthObject(
+            designation=f"S{i}",
+            name=f"Synthetic {i}" if rng.random() < 0.05 else "",
+            diameter=f"{rng.lognormvariate(-1, 1):.3f}" if rng.random() < 0.1 else "",
+            hazardous="Y" if rng.random() < 0.1 else "N",
+        )
+        for i in range(count)
+    ]
+
+
+def synthetic_data(
+    approaches: int, neos: int | None = None, seed: int = 0
+) -> Tuple[List[NearEarthObject], List[CloseApproach]]:
+    """Generate NEOs and close approaches, ordered by approach time.
+
+    :param approaches: The number of close approaches to generate.
+    :param neos: The number of NEOs; defaults to one for every 16 approaches.
+    :param seed: The seed of the random number generator.
+    :return: A tuple of the NEOs and their close approaches.
+    """
+    rng = random.Random(seed)
+    neo_list = _synthetic_neos(rng, neos or max(1, approaches // 16))
+    minutes = sorted(rng.randrange(_MINUTES) for _ in range(approaches))
+    approach_list = []
+    for minute in minutes:
+        neo = rng.choice(neo_list)
+        approach = CloseApproach.from_values(
+            neo.designation,
+            _START + datetime.timedelta(minutes=minute),
+            rng.random() * 0.5,
+            rng.random() * 40.0,
+            neo,
+        )
+        neo.approaches.append(approach)
+        approach_list.append(approach)
+    return neo_list, approach_list
+
+
+def synthetic_table(
+    approaches: int, neos: int | None = None, seed: int = 0
+) -> ApproachTable:
+    """Generate the columns of a table of close approaches, ordered by approach time.
+
+    The table's NEOs have no approaches linked; build an `NEODatabase` over it
+    with `NEODatabase.from_table`.
+
+    :param approaches: The number of close approaches to generate.
+    :param neos: The number of NEOs; defaults to one for every 16 approaches.
+    :param seed: The seed of the random number generator.
+    :return: A new `ApproachTable`.
+    """
+    rng = random.Random(seed)
+    neo_list = _synthetic_neos(rng, neos or max(1, approaches // 16))
+    start = datetime_to_minutes(_START)
+    return ApproachTable(
+        neo_list,
+        array("q", sorted(start + rng.randrange(_MINUTES) for _ in range(approaches))),
+        array("d", (rng.random() * 0.5 for _ in range(approaches))),
+        array("d", (rng.random() * 40.0 for _ in range(approaches))),
+        array("i", (rng.randrange(len(neo_list)) for _ in range(approaches))),
+    )
@@ -0,0 +1,288 @@
+"""Remember the results of recent queries, as compact arrays of row ids.
+
+A `QueryCache` is a least-recently-used map from the normalized form of a query
+to the ids of the rows it produced. The key of a query is built from its
+compiled filters - one closed interval per column, in column order - so filters
+given in any order, or spelled differently but meaning the same (such as
+`--date` and an equal `--start-date` and `--end-date`), share one entry. The
+ordering and the limit of the query are part of the key.
+
+Each entry stores an `array` of 4-byte row ids rather than a list of objects.
+The cache evicts its least recently used entries whenever it holds more than a
+maximum number of entries or more than a maximum number of bytes of row ids.
+
+A `ResultCache` keeps the same entries on disk, one file per query, so that
+separate runs of the main module share them. Its keys also identify the data
+files - by path, size and modification time - so that editing either file
+invalidates every result computed from it, and the layout of the database - a
+snapshot, column files or an SQLite file - whose row ids the results are. The
+least recently used files are deleted once the directory grows past a maximum
+size.
+"""
+
+import hashlib
+import os
+import pathlib
+import pickle
+from array import array
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Sequence, Tuple
+
+import filters as fls
+
+DEFAULT_MAX_ENTRIES = 128
+DEFAULT_MAX_BYTES = 64 << 20
+
+DEFAULT_RESULT_DIR = pathlib.Path(__file__).parent.resolve() / ".cache" / "results"
+
+# Bump whenever the format of a result file, or the meaning of a row id, changes.
+RESULT_CACHE_VERSION = 2
+
+# The key of every query whose criteria contradict each other.
+_EMPTY = ("empty",)
+
+
+def query_key(
+    filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters,
+    order_by: str | None = None,
+    descending: bool = False,
+    limit: int | None = None,
+) -> Tuple[Hashable, ...]:
+    """Normalize a query into a hashable key.
+
+    :param filters: A collection of filters, as returned by `create_filters`.
+    :param order_by: The column that the results are ordered by, if any.
+    :param descending: Whether the results are in descending order.
+    :param limit: The maximum number of results; 0 or None for all.
+    :return: A key shared by every equivalent query.
+    """
+    compiled = fls.compile_filters(filters)
+    if compiled.empty:
+        return _EMPTY
+    bounds = tuple(sorted(compiled.bounds.items()))
+    if order_by is None:
+        descending = False
+    return (bounds, order_by, descending, limit or None)
+
+
+class QueryCache:
+    """A least-recently-used cache of query results as arrays of row ids."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Create an empty cache.
+
+        :param max_entries: The largest number of entries to keep.
+        :param max_bytes: The largest total size of the stored row ids, in bytes.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: "OrderedDict[Hashable, array]" = OrderedDict()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        return len(self.entries)
+
+    def get(self, key: Hashable) -> array | None:
+        """Look up the row ids of a query, marking the entry as recently used.
+
+        :param key: A key from `query_key`.
+        :return: The stored row ids, or `None` on a miss.
+        """
+        rows = self.entries.get(key)
+        if rows is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        return rows
+
+    def put(self, key: Hashable, rows: Iterable[int]) -> array:
+        """Store the row ids of a query, evicting old entries to make room.
+
+        A result larger than the whole cache isn't stored.
+
+        :param key: A key from `query_key`.
+        :param rows: The row ids produced by the query, in order.
+        :return: The row ids, as an array.
+        """
+        rows = array("i", rows)
+        size = self._size(rows)
+        if key in self.entries:
+            self.bytes -= self._size(self.entries.pop(key))
+        if size > self.max_bytes or self.max_entries <= 0:
+            return rows
+        self.entries[key] = rows
+        self.bytes += size
+        while len(self.entries) > self.max_entries or self.bytes > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.bytes -= self._size(evicted)
+            self.evictions += 1
+        return rows
+
+    def clear(self) -> None:
+        """Remove every entry, keeping the statistics."""
+        self.entries.clear()
+        self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Describe the cache's contents and effectiveness.
+
+        :return: A dictionary of the number of entries and bytes held, the
+            limits, and the numbers of hits, misses and evictions.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self.entries),
+            "max_entries": self.max_entries,
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    @staticmethod
+    def _size(rows: array) -> int:
+        """Return the number of bytes of an array of row ids."""
+        return rows.itemsize * len(rows)
+
+
+class ResultCache:
+    """A least-recently-used cache of query results, stored as files on disk."""
+
+    def __init__(
+        self,
+        sources: Sequence[str | os.PathLike],
+        layout: str,
+        directory: str | os.PathLike = DEFAULT_RESULT_DIR,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+    ) -> None:
+        """Open a cache of the results of queries over a pair of data files.
+
+        :param sources: The paths of the data files that queries run against.
+        :param layout: The `layout` of the database that queries run against.
+        :param directory: The directory holding the result files.
+        :param max_bytes: The largest total size of the result files, in bytes.
+        """
+        self.directory = pathlib.Path(directory)
+        self.max_bytes = max_bytes
+        self.layout = layout
+        self.sources: List[Tuple[str, int, int]] = []
+        for source in sources:
+            resolved = pathlib.Path(source).resolve()
+            stat = resolved.stat()
+            self.sources.append((str(resolved), stat.st_size, stat.st_mtime_ns))
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: Hashable) -> Tuple[pathlib.Path, str]:
+        """Return the file of a key, and the full description stored in it."""
+        description = repr((RESULT_CACHE_VERSION, self.layout, self.sources, key))
+        digest = hashlib.sha256(description.encode()).hexdigest()[:32]
+        return self.directory / f"{digest}.rows", description
+
+    def get(self, key: Hashable) -> array | None:
+        """Look up the row ids of a query, marking its file as recently used.
+
+        :param key: A key from `query_key`.
+        :return: The stored row ids, or `None` on a miss.
+        """
+        path, description = self._path(key)
+        try:
+            with open(path, "rb") as infile:
+                stored, rows = pickle.load(infile)
+        except Exception:
+            stored = None
+        if stored != description:
+            self.misses += 1
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        self.hits += 1
+        return rows
+
+    def put(self, key: Hashable, rows: Iterable[int]) -> array:
+        """Store the row ids of a query, deleting old files to make room.
+
+        Failing to write the cache only costs the speedup, so write errors are
+        ignored.
+
+        :param key: A key from `query_key`.
+        :param rows: The row ids produced by the query, in order.
+        :return: The row ids, as an array.
+        """
+        rows = array("i", rows)
+        if rows.itemsize * len(rows) > self.max_bytes:
+            return rows
+        path, description = self._path(key)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            with open(tmp_path, "wb") as outfile:
+                pickle.dump(
+                    (description, rows), outfile, protocol=pickle.HIGHEST_PROTOCOL
+                )
+            os.replace(tmp_path, path)
+            self._evict()
+        except OSError:
+            pass
+        finally:
+            tmp_path.unlink(missing_ok=True)
+        return rows
+
+    def _files(self) -> List[Tuple[float, int, pathlib.Path]]:
+        """List the result files by their last use, oldest first, with their sizes."""
+        files = []
+        for path in self.directory.glob("*.rows"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        return sorted(files)
+
+    def _evict(self) -> None:
+        """Delete the least recently used files until the directory fits its cap."""
+        files = self._files()
+        total = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= size
+            self.evictions += 1
+
+    def clear(self) -> None:
+        """Delete every result file."""
+        for _, _, path in self._files():
+            path.unlink(missing_ok=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """Describe the cache's contents and effectiveness.
+
+        :return: A dictionary of the number of files and bytes held, the limit,
+            and the numbers of hits, misses and evictions.
+        """
+        files = self._files() if self.directory.exists() else []
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(files),
+            "bytes": sum(size for _, size, _ in files),
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
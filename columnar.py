@@ -0,0 +1,440 @@
+"""Store an `NEODatabase` on disk as column files, and open them with `mmap`.
+
+`convert` builds a database from the data files once and writes everything a
+query reads into a directory, one file per array:
+
+* the approach columns `epochs`, `distances`, `velocities` and `neo_index`;
+* the NEO columns `diameters` and `hazardous`, each with the extra entry of
+  approaches without an NEO;
+* the row ids and values of each sorted index, as `index-<column>.rows` and
+  `index-<column>.keys`;
+* one `bitmap-<name>` file per bitmap of rows;
+* string heaps of the NEOs' designations and names: the UTF-8 bytes of every
+  string back to back in `<strings>.heap`, and the offset where each string
+  starts in `<strings>.offsets`;
+* `histograms.pickle`, the planner's statistics, and `manifest.json`, which
+  records the layout's version, the typecode of every column, the year
+  partitions of the rows and fingerprints of the data files it was built from.
+
+`convert` writes the close approaches in the order of the data file, so that
+row ids mean the same as in every other database built from it. The data file
+lists approaches in order of time, so the rows of each year are one contiguous
+partition of every column. The manifest keeps each partition's zone map - the
+range of its approach times, distances, velocities and diameters - and a full
+scan skips the partitions that a query's criteria rule out; see the
+`partitions` module.
+
+`open_columnar` maps each column file into memory and builds an `NEODatabase`
+over `memoryview`s of them with `NEODatabase.from_table`, so opening reads and
+sorts no per-approach data at all: pages of a column are only read from disk
+when a query first touches them, so a partition that every query skips is
+never loaded at all. Creating the NEOs from the string heaps is the
+only work proportional to the size of the data. Close approaches are created as
+queries yield them, and an NEO's approaches when it is first looked up or one
+of its approaches is yielded.
+
+`load_columnar` opens a directory only if it is current with the data files, as
+`snapshot.load_database` does for snapshots.
+
+`scan_columnar` answers a single query without opening the directory at all, by
+reading the columns in fixed-size chunks, for the out-of-core queries of the
+`stream` module.
+"""
+
+import contextlib
+import json
+import mmap
+import os
+import pathlib
+import pickle
+import shutil
+import sys
+from array import array
+from typing import Any, BinaryIO, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from helpers import minutes_to_datetime
+from index import Bitmap, SortedIndex
+from models import CloseApproach, NearEarthObject
+from partitions import Partition, partition_by_year
+from planner import Histogram
+from snapshot import fingerprint, is_fresh
+from table import ApproachTable
+
+# Bump whenever the layout of the directory changes.
+COLUMNAR_VERSION = 3
+
+_INDEXED_COLUMNS = ("neo", "epoch", "distance", "velocity")
+
+
+def _write_strings(directory: pathlib.Path, name: str, strings: Sequence[str]) -> None:
+    """Write a string heap and the offsets of its strings."""
+    offsets = array("q", [0])
+    with open(directory / f"{name}.heap", "wb") as outfile:
+        for string in strings:
+            encoded = string.encode("utf-8")
+            outfile.write(encoded)
+            offsets.append(offsets[-1] + len(encoded))
+    with open(directory / f"{name}.offsets", "wb") as outfile:
+        offsets.tofile(outfile)
+
+
+def _map(path: pathlib.Path, typecode: str) -> Sequence:
+    """Map a column file into memory as a sequence of `typecode` items."""
+    with open(path, "rb") as infile:
+        if os.fstat(infile.fileno()).st_size == 0:
+            # An empty file can't be mapped.
+            return array(typecode)
+        mapped = mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ)
+    return memoryview(mapped).cast(typecode)  # type: ignore
+
+
+def _read_strings(directory: pathlib.Path, name: str) -> List[str]:
+    """Read every string of a string heap."""
+    heap = (directory / f"{name}.heap").read_bytes()
+    offsets = _map(directory / f"{name}.offsets", "q")
+    return [
+        heap[start:stop].decode("utf-8") for start, stop in zip(offsets, offsets[1:])
+    ]
+
+
+def _read_neos(
+    directory: pathlib.Path, diameters: Sequence[float], hazardous: Sequence[int]
+) -> List[NearEarthObject]:
+    """Create the NEOs of a directory from its string heaps and NEO columns."""
+    return [
+        NearEarthObject.from_values(
+            designation, name or None, diameters[i], hazardous[i] == 1
+        )
+        for i, (designation, name) in enumerate(
+            zip(
+                _read_strings(directory, "designations"),
+                _read_strings(directory, "names"),
+            )
+        )
+    ]
+
+
+def _read_rows(infile: BinaryIO, typecode: str, start: int, stop: int) -> array:
+    """Read a run of rows of a column file into a new array."""
+    values = array(typecode)
+    infile.seek(start * values.itemsize)
+    values.fromfile(infile, stop - start)
+    return values
+
+
+def write_columnar(
+    table: ApproachTable,
+    indexes: Mapping[str, SortedIndex],
+    bitmaps: Mapping[str, Bitmap],
+    histograms: Mapping[str, Histogram],
+    directory: str | os.PathLike,
+    sources: Sequence[Dict[str, Any]] = (),
+) -> None:
+    """Write the parts of a database to a directory of column files.
+
+    The files are written to a temporary directory next to `directory`, which
+    then replaces it, so a concurrent reader never observes a partial layout.
+
+    :param table: The database's table.
+    :param indexes: The database's sorted indexes, by column.
+    :param bitmaps: The database's bitmaps, by name.
+    :param histograms: The database's planner histograms, by column.
+    :param directory: The directory to write.
+    :param sources: Fingerprints of the data files the database was built from.
+    """
+    directory = pathlib.Path(directory)
+    tmp_directory = directory.with_name(f"{directory.name}.{os.getpid()}.tmp")
+    shutil.rmtree(tmp_directory, ignore_errors=True)
+    tmp_directory.mkdir(parents=True)
+    try:
+        columns: Dict[str, Any] = {
+            "epochs": table.epochs,
+            "distances": table.distances,
+            "velocities": table.velocities,
+            "neo_index": table.neo_index,
+            "diameters": table.diameters,
+            "hazardous": table.hazardous,
+        }
+        for column in _INDEXED_COLUMNS:
+            columns[f"index-{column}.rows"] = indexes[column].rows
+            columns[f"index-{column}.keys"] = indexes[column].keys
+        for name, values in columns.items():
+            with open(tmp_directory / name, "wb") as outfile:
+                outfile.write(memoryview(values).cast("B"))
+        for name, bitmap in bitmaps.items():
+            (tmp_directory / f"bitmap-{name}").write_bytes(
+                bitmap.bits.to_bytes((bitmap.size + 7) // 8, "little")
+            )
+        _write_strings(
+            tmp_directory, "designations", [neo.designation for neo in table.neos]
+        )
+        _write_strings(tmp_directory, "names", [neo.name or "" for neo in table.neos])
+        with open(tmp_directory / "histograms.pickle", "wb") as outfile:
+            pickle.dump(dict(histograms), outfile, protocol=pickle.HIGHEST_PROTOCOL)
+
+        # Approaches without an NEO can't be recreated from the columns alone.
+        unlinked = len(table.neos)
+        orphans = {
+            row: table.rows[row]._designation
+            for row, position in enumerate(table.neo_index)
+            if position == unlinked and row in table.rows
+        }
+        manifest = {
+            "version": COLUMNAR_VERSION,
+            "byteorder": sys.byteorder,
+            "rows": len(table),
+            "columns": {
+                name: memoryview(values).format for name, values in columns.items()
+            },
+            "bitmaps": sorted(bitmaps),
+            "orphans": orphans,
+            "partitions": [
+                partition.to_dict() for partition in partition_by_year(table)
+            ],
+            "sources": list(sources),
+        }
+        with open(tmp_directory / "manifest.json", "w") as outfile:
+            json.dump(manifest, outfile, indent=1)
+
+        old_directory = directory.with_name(f"{directory.name}.{os.getpid()}.old")
+        if directory.exists():
+            os.replace(directory, old_directory)
+        os.replace(tmp_directory, directory)
+        shutil.rmtree(old_directory, ignore_errors=True)
+    finally:
+        shutil.rmtree(tmp_directory, ignore_errors=True)
+
+
+def read_manifest(directory: str | os.PathLike) -> Dict[str, Any] | None:
+    """Read the manifest of a directory of column files.
+
+    :param directory: The directory written by `write_columnar`.
+    :return: The manifest, or `None` if it is missing, unreadable, or was
+        written by another version of this module or on another platform.
+    """
+    try:
+        with open(pathlib.Path(directory) / "manifest.json") as infile:
+            manifest = json.load(infile)
+    except (OSError, ValueError):
+        return None
+    if (
+        manifest.get("version") != COLUMNAR_VERSION
+        or manifest.get("byteorder") != sys.byteorder
+    ):
+        return None
+    return manifest
+
+
+def open_columnar(directory: str | os.PathLike, engine: str = "python") -> NEODatabase:
+    """Open a directory of column files as an `NEODatabase`, mapping its columns.
+
+    :param directory: The directory written by `write_columnar`.
+    :param engine: The query engine to use, one of `database.ENGINES`.
+    :return: A database over memory-mapped columns.
+    :raises ValueError: If the directory holds no readable manifest.
+    """
+    directory = pathlib.Path(directory)
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise ValueError(f"{directory} doesn't hold a columnar database.")
+    columns = {
+        name: _map(directory / name, typecode)
+        for name, typecode in manifest["columns"].items()
+    }
+
+    diameters, hazardous = columns["diameters"], columns["hazardous"]
+    neos = _read_neos(directory, diameters, hazardous)
+    table = ApproachTable(
+        neos,
+        columns["epochs"],  # type: ignore
+        columns["distances"],  # type: ignore
+        columns["velocities"],  # type: ignore
+        columns["neo_index"],  # type: ignore
+        diameters=diameters,  # type: ignore
+        hazardous=hazardous,  # type: ignore
+    )
+    for row, designation in manifest["orphans"].items():
+        row = int(row)
+        table.rows[row] = CloseApproach.from_values(
+            designation,
+            minutes_to_datetime(table.epochs[row]),
+            table.distances[row],
+            table.velocities[row],
+        )
+
+    indexes = {
+        column: SortedIndex.from_sorted(
+            columns[f"index-{column}.rows"], columns[f"index-{column}.keys"]
+        )
+        for column in _INDEXED_COLUMNS
+    }
+    bitmaps = {
+        name: Bitmap(
+            int.from_bytes((directory / f"bitmap-{name}").read_bytes(), "little"),
+            manifest["rows"],
+        )
+        for name in manifest["bitmaps"]
+    }
+    with open(directory / "histograms.pickle", "rb") as infile:
+        histograms = pickle.load(infile)
+    partitions = [Partition.from_dict(values) for values in manifest["partitions"]]
+    database = NEODatabase.from_table(
+        table, engine, indexes, bitmaps, histograms, partitions
+    )
+    database.layout = f"columnar-{COLUMNAR_VERSION}"
+    return database
+
+
+def convert(
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+    directory: str | os.PathLike,
+) -> NEODatabase:
+    """Build a database from the data files and write it as column files.
+
+    The close approaches are written in the order of the data file, and
+    partitioned by year if that is the order of time.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param directory: The directory to write.
+    :return: The database that was written.
+    """
+    sources = [fingerprint(neo_csv_path), fingerprint(cad_json_path)]
+    database = NEODatabase(load_neos(neo_csv_path), load_approaches(cad_json_path))
+    database.to_columnar(directory, sources)
+    return database
+
+
+def load_columnar(
+    directory: str | os.PathLike,
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+    engine: str = "python",
+) -> NEODatabase | None:
+    """Open a directory of column files if it was built from the given data files.
+
+    :param directory: The directory written by `convert`.
+    :param neo_csv_path: A path to the CSV file of NEOs.
+    :param cad_json_path: A path to the JSON file of close approaches.
+    :param engine: The query engine to use, one of `database.ENGINES`.
+    :return: The database, or `None` if the directory is missing or stale.
+    """
+    if not is_current(directory, neo_csv_path, cad_json_path):
+        return None
+    return open_columnar(directory, engine)
+
+
+def is_current(
+    directory: str | os.PathLike,
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+) -> bool:
+    """Return whether a directory of column files is up to date with the data files.
+
+    :param directory: The directory written by `convert`.
+    :param neo_csv_path: A path to the CSV file of NEOs.
+    :param cad_json_path: A path to the JSON file of close approaches.
+    :return: True if the directory was built from these very files, unchanged since.
+    """
+    manifest = read_manifest(directory)
+    if manifest is None:
+        return False
+    sources = manifest["sources"]
+    paths = [
+        str(pathlib.Path(path).resolve()) for path in (neo_csv_path, cad_json_path)
+    ]
+    mtimes = [recorded["mtime_ns"] for recorded in sources]
+    if [recorded["path"] for recorded in sources] != paths or not all(
+        is_fresh(recorded) for recorded in sources
+    ):
+        return False
+    if mtimes != [recorded["mtime_ns"] for recorded in sources]:
+        # Record the new times of touched files, so they aren't hashed again.
+        path = pathlib.Path(directory) / "manifest.json"
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            with open(tmp_path, "w") as outfile:
+                json.dump(manifest, outfile, indent=1)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass
+        finally:
+            tmp_path.unlink(missing_ok=True)
+    return True
+
+
+def scan_columnar(
+    directory: str | os.PathLike,
+    bounds: Mapping[str, Tuple[Any, Any]],
+    chunk_rows: int,
+) -> Iterator[CloseApproach]:
+    """Generate the close approaches of a directory that fall within every interval.
+
+    Unlike `open_columnar`, this maps nothing and builds no database: the
+    approach columns are read from their files `chunk_rows` rows at a time,
+    into a small `ApproachTable` that is scanned and then dropped, so at most
+    one chunk of rows is in memory at once, however large the files are. Only
+    the NEOs are read in full. Year partitions that the zone maps rule out are
+    never read.
+
+    :param directory: The directory written by `write_columnar`.
+    :param bounds: The closed (low, high) interval of each constrained column.
+    :param chunk_rows: The number of rows to read and scan at a time.
+    :yield: The matching close approaches, linked to their NEOs, in row order.
+    :raises ValueError: If the directory holds no readable manifest.
+    """
+    directory = pathlib.Path(directory)
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise ValueError(f"{directory} doesn't hold a columnar database.")
+    formats = manifest["columns"]
+    diameters = _map(directory / "diameters", formats["diameters"])
+    hazardous = _map(directory / "hazardous", formats["hazardous"])
+    neos = _read_neos(directory, diameters, hazardous)
+    orphans = {
+        int(row): designation for row, designation in manifest["orphans"].items()
+    }
+
+    partitions = [Partition.from_dict(values) for values in manifest["partitions"]]
+    if partitions:
+        ranges = [
+            (partition.start, partition.stop)
+            for partition in partitions
+            if partition.may_match(bounds)
+        ]
+    else:
+        ranges = [(0, manifest["rows"])]
+
+    names = ("epochs", "distances", "velocities", "neo_index")
+    with contextlib.ExitStack() as stack:
+        files = {
+            name: stack.enter_context(open(directory / name, "rb")) for name in names
+        }
+        for start, stop in ranges:
+            for low in range(start, stop, chunk_rows):
+                high = min(low + chunk_rows, stop)
+                epochs, distances, velocities, neo_index = (
+                    _read_rows(files[name], formats[name], low, high) for name in names
+                )
+                chunk = ApproachTable(
+                    neos,
+                    epochs,
+                    distances,
+                    velocities,
+                    neo_index,
+                    diameters=diameters,  # type: ignore
+                    hazardous=hazardous,  # type: ignore
+                )
+                for i in chunk.select(bounds):
+                    designation = orphans.get(low + i)
+                    if designation is not None:
+                        chunk.rows[i] = CloseApproach.from_values(
+                            designation,
+                            minutes_to_datetime(chunk.epochs[i]),
+                            chunk.distances[i],
+                            chunk.velocities[i],
+                        )
+                    yield chunk.row(i)
@@ -9,13 +9,74 @@ Under normal circumstances, the main module creates one NEODatabase from the
 data on NEOs and close approaches extracted by `extract.load_neos` and
 `extract.load_approaches`.
 
+Queries are evaluated over an `ApproachTable`, a columnar copy of the numeric
+attributes of every close approach, so that matching compares plain numbers by
+row id and only the yielded rows are fetched as `CloseApproach` objects. The
+table's rows are also indexed by approach time, distance and velocity. A
+`QueryPlanner` estimates the selectivity of each criterion from histograms built
+at load time and drives the query from the index of the most selective one, from
+the approaches of the NEOs that pass the diameter and hazard criteria, or from a
+full scan, checking only those rows against the other criteria. Bitmaps of the
+approaches of hazardous, non-hazardous, known-diameter, named and unnamed NEOs
+narrow broad scans down by bitwise intersection before any row is checked.
+
+With `engine="numpy"`, queries are instead evaluated as vectorized scans over
+NumPy views of the table's columns by `vectorized.NumpyEngine`. A database can
+also be built directly over the columns of a large table with `from_table`, in
+which case close approaches are only created as they are yielded.
+`share` copies the columns, indexes and statistics of a database into shared
+memory, where other processes attach to them without copying or rebuilding
+them; see the `shared` module. `to_columnar` writes the same parts to one file
+per column, which the `columnar` module maps back into memory.
+
+After `use_workers`, broad queries on the Python engine are instead split into
+shards of the table, scanned in parallel by a pool of worker processes from the
+`parallel` module, and their matches merged back in the serial order.
+
+NEOs can also be looked up approximately: `complete` lists the names or
+designations starting with a prefix and `suggest` proposes the ones closest to a
+misspelling, from a `NameIndex` built the first time either is needed.
+
+`aggregate` summarizes the matches of a query - counts and the extremes, means
+and sums of their columns, optionally by year, month, NEO or hazard flag -
+without creating a close approach for any of them. `count` answers from the
+width of an index range or the cardinality of a bitmap when those cover every
+criterion.
+
 You'll edit this file in Tasks 2 and 3.
 """
 
-from typing import Any, Dict, Generator, List
+import heapq
+import itertools
+import os
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Collection,
+    Dict,
+    Generator,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+)
 
+import aggregate as agg
 import filters as fls
+from index import Bitmap, SortedIndex
 from models import CloseApproach, NearEarthObject
+from names import NameIndex
+from parallel import ShardedExecutor
+from partitions import Partition, RowRanges
+from planner import ORDERINGS, Histogram, Plan, QueryPlanner
+from table import ApproachTable, TableRows
+
+if TYPE_CHECKING:
+    from shared import SharedDatabase
+
+# The engines that can evaluate queries; see `NEODatabase.use_engine`.
+ENGINES = ("python", "numpy")
 
 
 class NEODatabase:
@@ -27,8 +88,15 @@ class NEODatabase:
     querying for close approaches that match criteria.
     """
 
+    # Identifies the storage that the rows come from, and so what a row id
+    # means; results cached by row id are only valid for the same layout.
+    layout = "memory"
+
     def __init__(
-        self, neos: List[NearEarthObject], approaches: List[CloseApproach]
+        self,
+        neos: List[NearEarthObject],
+        approaches: List[CloseApproach],
+        engine: str = "python",
     ) -> None:
         """Create a new `NEODatabase`.
 
@@ -46,9 +114,10 @@ class NEODatabase:
 
         :param neos: A collection of `NearEarthObject`s.
         :param approaches: A collection of `CloseApproach`es.
+        :param engine: The query engine to use, one of `ENGINES`.
         """
         self._neos = neos
-        self._approaches = approaches
+        self._approaches: Sequence[CloseApproach] = approaches
 
         self._neos_by_designation = {neo.designation: neo for neo in self._neos}
         self._neos_by_name = {
@@ -62,6 +131,214 @@ class NEODatabase:
                 neo.approaches.append(approach)
                 approach.neo = neo
 
+        self._unlinked: Dict[str, int] = {}
+        self._build(ApproachTable.from_approaches(self._neos, self._approaches))
+        # The table holds the approaches from now on.
+        self._approaches = TableRows(self._table)
+        self.use_engine(engine)
+
+    @classmethod
+    def from_table(
+        cls,
+        table: ApproachTable,
+        engine: str = "python",
+        indexes: Mapping[str, SortedIndex] | None = None,
+        bitmaps: Mapping[str, Bitmap] | None = None,
+        histograms: Mapping[str, Histogram] | None = None,
+        partitions: Sequence[Partition] = (),
+    ) -> "NEODatabase":
+        """Create a new `NEODatabase` directly over the columns of a table.
+
+        No `CloseApproach` is created up front: a row becomes an object when a
+        query yields it, and an NEO's `.approaches` are filled in the first time
+        the NEO is fetched by designation or by name, or a query yields one of
+        its approaches. This keeps tables of millions of approaches cheap to
+        load.
+
+        The indexes, bitmaps and histograms of another database over the same
+        table can be passed in to skip building them again.
+
+        :param table: An `ApproachTable`, whose NEOs have no approaches linked yet.
+        :param engine: The query engine to use, one of `ENGINES`.
+        :param indexes: The sorted index of each of the 'neo', 'epoch',
+            'distance' and 'velocity' columns, if already built.
+        :param bitmaps: The bitmaps of the table's rows by name, if already built.
+        :param histograms: The planner's histograms by column, if already built.
+        :param partitions: The year partitions of the table, whose zone maps let
+            full scans skip the partitions that can't match.
+        :return: A new `NEODatabase`.
+        """
+        database = cls.__new__(cls)
+        database._neos = table.neos
+        database._approaches = TableRows(table)
+        database._neos_by_designation = {neo.designation: neo for neo in table.neos}
+        database._neos_by_name = {
+            neo.name: neo for neo in table.neos if neo.name is not None
+        }
+        database._unlinked = {neo.designation: i for i, neo in enumerate(table.neos)}
+        database._build(table, indexes, bitmaps, histograms, partitions)
+        database.use_engine(engine)
+        return database
+
+    def _build(
+        self,
+        table: ApproachTable,
+        indexes: Mapping[str, SortedIndex] | None = None,
+        bitmaps: Mapping[str, Bitmap] | None = None,
+        histograms: Mapping[str, Histogram] | None = None,
+        partitions: Sequence[Partition] = (),
+    ) -> None:
+        """Build the indexes, bitmaps and planner over a table, unless given."""
+        self._table = table
+        if indexes is None:
+            indexes = {
+                column: SortedIndex(self._table.column(column))
+                for column in ("neo", "epoch", "distance", "velocity")
+            }
+        self._indexes = dict(indexes)
+        self._bitmaps = self._build_bitmaps() if bitmaps is None else dict(bitmaps)
+        self._planner = QueryPlanner(
+            self._table, self._indexes, self._bitmaps, histograms, partitions
+        )
+        self._name_indexes: Dict[str, NameIndex] = {}
+        self._sharded: ShardedExecutor | None = None
+        self._ordered = True
+
+    def _link(self, neo: NearEarthObject | None) -> NearEarthObject | None:
+        """Fill in the approaches of an NEO of a database built `from_table`."""
+        if neo is not None and neo.designation in self._unlinked:
+            position = self._unlinked.pop(neo.designation)
+            start, stop = self._indexes["neo"].span(position, position)
+            rows = sorted(self._indexes["neo"].rows[start:stop])
+            neo.approaches = [self._table.row(row) for row in rows]
+        return neo
+
+    def use_engine(self, engine: str) -> None:
+        """Choose the engine that evaluates queries.
+
+        The `"python"` engine drives each query from the planner's access path.
+        The `"numpy"` engine evaluates every query as a vectorized scan of the
+        table, and needs NumPy to be installed.
+
+        :param engine: One of `ENGINES`.
+        :raises ValueError: If the engine is unknown.
+        """
+        if engine not in ENGINES:
+            raise ValueError(
+                f"Unknown query engine {engine!r}; expected one of {', '.join(ENGINES)}."
+            )
+        self._vectorized = None
+        if engine == "numpy":
+            from vectorized import NumpyEngine
+
+            self._vectorized = NumpyEngine(self._table)
+        self._engine = engine
+
+    def use_workers(self, workers: int, ordered: bool = True) -> None:
+        """Choose how many worker processes scan the table for broad queries.
+
+        With more than one worker, queries on the Python engine whose access
+        path would read more than one worker's share of the table are scanned
+        in shards across a pool of processes instead. The pool is kept until
+        the number of workers changes.
+
+        :param workers: The number of worker processes; 1 to scan serially.
+        :param ordered: Whether the matches of a query that isn't ordered by a
+            column must come out in the same order as a serial scan, rather
+            than as soon as each shard is done.
+        :raises ValueError: If the number of workers isn't positive.
+        """
+        if workers < 1:
+            raise ValueError(f"Expected a positive number of workers, not {workers}.")
+        self._ordered = ordered
+        if self._sharded is not None and self._sharded.workers == workers:
+            return
+        if self._sharded is not None:
+            self._sharded.close()
+            self._sharded = None
+        if workers > 1:
+            self._sharded = ShardedExecutor(self._table, workers)
+
+    def share(self, name: str | None = None) -> "SharedDatabase":
+        """Copy the database's columns, indexes and statistics into shared memory.
+
+        Other processes attach to the copy with `shared.attach_database`.
+
+        :param name: The name of the shared memory segment; a random one if None.
+        :return: The owning `SharedDatabase`, which unlinks the segment when closed.
+        """
+        from shared import export_database
+
+        return export_database(
+            self._table,
+            self._indexes,
+            self._bitmaps,
+            self._planner.histograms,
+            name,
+        )
+
+    def to_columnar(
+        self, directory: str | os.PathLike, sources: Sequence[Dict[str, Any]] = ()
+    ) -> None:
+        """Write the database's columns, indexes and statistics as column files.
+
+        `columnar.open_columnar` maps the files back into a database.
+
+        :param directory: The directory to write, replacing any existing one.
+        :param sources: Fingerprints of the data files the database was built from.
+        """
+        from columnar import write_columnar
+
+        write_columnar(
+            self._table,
+            self._indexes,
+            self._bitmaps,
+            self._planner.histograms,
+            directory,
+            sources,
+        )
+
+    @property
+    def engine(self) -> str:
+        """Return the name of the engine that evaluates queries."""
+        return self._engine
+
+    def __getstate__(self) -> Dict[str, Any]:
+        """Return the pickled state, without the engine's arrays, workers or name indexes."""
+        state = self.__dict__.copy()
+        state["_engine"] = "python"
+        state["_vectorized"] = None
+        state["_sharded"] = None
+        state["_ordered"] = True
+        state["_name_indexes"] = {}
+        return state
+
+    def _build_bitmaps(self) -> Dict[str, Bitmap]:
+        """Build bitmaps of the approaches by the hazard flag, diameter and name of their NEO."""
+        table = self._table
+        flags = {
+            "hazardous": [neo.hazardous for neo in table.neos],
+            "not_hazardous": [not neo.hazardous for neo in table.neos],
+            "diameter_known": [neo.diameter == neo.diameter for neo in table.neos],
+            "named": [neo.name is not None for neo in table.neos],
+            "unnamed": [neo.name is None for neo in table.neos],
+        }
+        bitmaps = {}
+        for name, flag in flags.items():
+            # Unlinked approaches point past the last NEO and are in no bitmap.
+            flag.append(False)
+            rows = (i for i, position in enumerate(table.neo_index) if flag[position])
+            bitmaps[name] = Bitmap.from_rows(rows, len(table))
+        return bitmaps
+
+    def bitmap(self, name: str) -> Bitmap:
+        """Return a bitmap of the approaches whose NEO has a property.
+
+        :param name: One of 'hazardous', 'not_hazardous', 'diameter_known', 'named' and 'unnamed'.
+        :return: The `Bitmap` of the matching row ids.
+        """
+        return self._bitmaps[name]
+
     def get_neo_by_designation(self, designation: str) -> NearEarthObject | None:
         """Find and return an NEO by its primary designation.
 
@@ -75,7 +352,7 @@ class NEODatabase:
         :param designation: The primary designation of the NEO to search for.
         :return: The `NearEarthObject` with the desired primary designation, or `None`.
         """
-        return self._neos_by_designation.get(designation)
+        return self._link(self._neos_by_designation.get(designation))
 
     def get_neo_by_name(self, name: str) -> NearEarthObject | None:
         """Find and return an NEO by its name.
@@ -92,9 +369,48 @@ class NEODatabase:
         :return: The `NearEarthObject` with the desired name, or `None`.
         """
         if name in self._neos_by_name:
-            return self._neos_by_name[name]
+            return self._link(self._neos_by_name[name])
         return None
 
+    def _name_index(self, kind: str) -> NameIndex:
+        """Return the index of NEO names or designations, building it on first use."""
+        if kind not in self._name_indexes:
+            if kind == "name":
+                strings = self._neos_by_name.keys()
+            elif kind == "designation":
+                strings = self._neos_by_designation.keys()
+            else:
+                raise ValueError(
+                    f"Unknown kind {kind!r}; expected 'name' or 'designation'."
+                )
+            self._name_indexes[kind] = NameIndex(strings)
+        return self._name_indexes[kind]
+
+    def complete(
+        self, prefix: str, kind: str = "name", limit: int | None = None
+    ) -> List[str]:
+        """List the NEO names or designations that start with a prefix, ignoring case.
+
+        :param prefix: The start of a name or designation.
+        :param kind: Either 'name' or 'designation'.
+        :param limit: The maximum number of completions, or `None` for all.
+        :return: The matching names or designations, in alphabetical order.
+        """
+        return self._name_index(kind).prefix(prefix, limit)
+
+    def suggest(self, text: str, kind: str = "name", limit: int = 5) -> List[str]:
+        """Suggest the NEO names or designations closest to a possibly misspelled one.
+
+        Names that only differ in case come first, then those within one edit,
+        then those within two edits.
+
+        :param text: A name or designation that may be misspelled.
+        :param kind: Either 'name' or 'designation'.
+        :param limit: The maximum number of suggestions.
+        :return: Up to `limit` names or designations, nearest first.
+        """
+        return self._name_index(kind).suggest(text, limit=limit)
+
     def query(
         self,
         filters: Dict[
@@ -105,6 +421,10 @@ class NEODatabase:
             | fls.DateFilter
             | fls.DistanceFilter,
         ] = {},
+        limit: int | None = None,
+        offset: int = 0,
+        order_by: str | None = None,
+        descending: bool = False,
     ) -> Generator:
         """Query close approaches to generate those that match a collection of filters.
 
@@ -114,15 +434,271 @@ class NEODatabase:
         If no arguments are provided, generate all known close approaches.
 
         The `CloseApproach` objects are generated in internal order, which isn't
-        guaranteed to be sorted meaninfully, although is often sorted by time.
+        guaranteed to be sorted meaninfully, although is often sorted by time,
+        unless an `order_by` column is given.
+
+        With a `limit`, the query stops looking for matches as soon as enough
+        have been found, and skipped matches are never built into objects. An
+        ordered query with a `limit` only holds that many matches at a time.
 
         :param filters: A collection of filters capturing user-specified criteria.
+        :param limit: The maximum number of approaches to generate; 0 or None for all.
+        :param offset: The number of matching approaches to skip first.
+        :param order_by: One of 'time', 'distance', 'velocity' and 'diameter', or
+            `None` for internal order. Approaches of NEOs without a known
+            diameter come last when ordering by diameter.
+        :param descending: Whether to generate larger values first.
         :return: A stream of matching `CloseApproach` objects.
         """
-        for approach in self._approaches:
-            boolean_dict = {}
-            for filtr_name, filtr in filters.items():
-                if filtr.value is not None:
-                    boolean_dict[filtr_name] = filtr(approach)
-            if all(boolean_dict.values()):
-                yield approach
+        yield from self.fetch(
+            self.query_rows(filters, limit, offset, order_by, descending)
+        )
+
+    def query_rows(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        limit: int | None = None,
+        offset: int = 0,
+        order_by: str | None = None,
+        descending: bool = False,
+    ) -> Iterator[int]:
+        """Query close approaches to generate the row ids of those that match.
+
+        The arguments are the same as those of `query`; pass the row ids to
+        `fetch` to obtain their `CloseApproach` objects.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param limit: The maximum number of row ids to generate; 0 or None for all.
+        :param offset: The number of matching rows to skip first.
+        :param order_by: The column to order matches by, as for `query`.
+        :param descending: Whether to generate larger values first.
+        :return: A stream of the ids of matching rows.
+        """
+        plan = self.plan(
+            filters, order_by, descending, offset + limit if limit else None
+        )
+        return self.execute(plan, limit, offset)
+
+    def fetch(self, rows: Iterable[int]) -> Iterator[CloseApproach]:
+        """Generate the close approaches of a collection of row ids.
+
+        :param rows: Row ids, as generated by `query_rows`.
+        :yield: The `CloseApproach` of each row, in the same order.
+        """
+        for row in rows:
+            approach = self._table.row(row)
+            if self._unlinked:
+                self._link(approach.neo)
+            yield approach
+
+    def plan(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        order_by: str | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> Plan:
+        """Choose how to evaluate a query, without evaluating it.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param order_by: The column to order matches by, as for `query`.
+        :param descending: Whether to generate larger values first.
+        :param limit: The number of leading matches that will be read, if known.
+        :return: The `Plan` that `query` would execute for these filters.
+        """
+        plan = self._planner.plan(filters, self._engine)
+        if order_by is not None:
+            plan = self._planner.order(plan, order_by, descending, limit)
+        if self._sharded is not None:
+            plan = self._planner.parallelize(plan, self._sharded.workers)
+        return plan
+
+    def execute(
+        self, plan: Plan, limit: int | None = None, offset: int = 0
+    ) -> Iterator[int]:
+        """Execute a plan to generate the row ids of matching close approaches.
+
+        The plan's actual counts of examined and matched rows are updated as
+        rows are generated.
+
+        :param plan: A `Plan` from `plan`.
+        :param limit: The maximum number of row ids to generate; 0 or None for all.
+        :param offset: The number of matching rows to skip first.
+        :yield: The ids of matching rows, in internal order or in the plan's order.
+        """
+        if plan.compiled.empty:
+            return
+        stop = offset + limit if limit else None
+        rows: Iterable[int]
+        if plan.engine == "numpy" and self._vectorized is not None:
+            plan.examined = len(self._table)
+            matches = self._vectorized.select(plan.bounds)
+            plan.matched = len(matches)
+            if plan.order_by is not None:
+                matches = self._vectorized.order(
+                    matches, ORDERINGS[plan.order_by], plan.descending, stop
+                )
+            yield from matches[offset:stop].tolist()
+            return
+        if plan.engine == "parallel" and self._sharded is not None:
+            plan.examined = len(self._table)
+            column = None if plan.order_by is None else ORDERINGS[plan.order_by]
+            shards = self._sharded.select(
+                plan.bounds, column, plan.descending, stop, self._ordered
+            )
+            for row in itertools.islice(shards, offset, stop):
+                plan.matched += 1
+                yield row
+            return
+        if plan.sort == "index":
+            rows = self._walk(plan)
+        elif plan.order_by is not None:
+            key = self._table.sort_key(ORDERINGS[plan.order_by], plan.descending)
+            if stop is None:
+                rows = sorted(self._scan(plan), key=key)
+            else:
+                rows = heapq.nsmallest(stop, self._scan(plan), key=key)
+        else:
+            rows = self._scan(plan)
+        yield from itertools.islice(rows, offset, stop)
+
+    def _walk(self, plan: Plan) -> Iterator[int]:
+        """Generate the row ids matching a plan in the order of its access index."""
+        index = self._indexes[str(plan.access)]
+        positions = range(*plan.span)
+        if plan.descending:
+            positions = positions[::-1]
+        matches = self._table.predicate(plan.residuals)
+        for position in positions:
+            row = index.rows[position]
+            plan.examined += 1
+            if matches(row):
+                plan.matched += 1
+                yield row
+
+    def _candidates(self, plan: Plan, ordered: bool = True) -> Collection[int] | None:
+        """Collect the row ids that a plan's access path yields.
+
+        :param plan: A `Plan` from `plan`.
+        :param ordered: Whether the rows must be in internal order.
+        :return: The candidate row ids, or `None` for every row of the table.
+        """
+        rows: Collection[int] | None = None
+        if plan.access == "neo":
+            by_neo = self._indexes["neo"]
+            neo_rows: List[int] = []
+            for position in self._table.select_neos(plan.neo_bounds):
+                plan.neos_matched += 1
+                start, stop = by_neo.span(position, position)
+                neo_rows.extend(by_neo.rows[start:stop])
+            rows = sorted(neo_rows) if ordered else neo_rows
+        elif plan.access is not None:
+            start, stop = plan.span
+            rows = self._indexes[plan.access].rows[start:stop]
+            if ordered and not plan.bitmaps:
+                # Sorting the index's matches restores the internal order of a scan.
+                rows = sorted(rows)
+        elif plan.ranges is not None:
+            rows = RowRanges(plan.ranges)
+        if plan.bitmaps:
+            candidates = self._bitmaps[next(iter(plan.bitmaps))]
+            for name in plan.bitmaps:
+                candidates &= self._bitmaps[name]
+            if isinstance(rows, RowRanges):
+                candidates &= Bitmap.from_ranges(rows.ranges, len(self._table))
+            elif rows is not None:
+                candidates &= Bitmap.from_rows(rows, len(self._table))
+            # A bitmap generates its rows in internal order.
+            rows = candidates
+        plan.examined = len(self._table) if rows is None else len(rows)
+        return rows
+
+    def _scan(self, plan: Plan) -> Iterator[int]:
+        """Generate the row ids matching a plan on the Python engine."""
+        for row in self._table.select(plan.residuals, self._candidates(plan)):
+            plan.matched += 1
+            yield row
+
+    def count(
+        self, filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {}
+    ) -> int:
+        """Count the close approaches that match a collection of filters.
+
+        The count is read off the widths of index ranges and the cardinalities
+        of bitmaps whenever the plan's access path covers every criterion, and
+        is otherwise the number of candidate rows passing the residual
+        predicate, counted without generating or building any rows.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: The number of matching close approaches.
+        """
+        plan = self.plan(filters)
+        if plan.compiled.empty:
+            return 0
+        if plan.engine == "numpy" and self._vectorized is not None:
+            return self._vectorized.count(plan.bounds)
+        if plan.engine == "parallel" and self._sharded is not None:
+            return self._sharded.count(plan.bounds)
+        if plan.bounds.keys() == {"hazardous"}:
+            low, high = plan.bounds["hazardous"]
+            if low == high and low in (True, False):
+                return len(self._bitmaps["hazardous" if low else "not_hazardous"])
+        if plan.access == "neo" and not plan.residuals:
+            by_neo = self._indexes["neo"]
+            spans = (
+                by_neo.span(position, position)
+                for position in self._table.select_neos(plan.neo_bounds)
+            )
+            return sum(stop - start for start, stop in spans)
+        if plan.access not in (None, "neo") and not plan.bitmaps and not plan.residuals:
+            start, stop = plan.span
+            return stop - start
+        rows = self._candidates(plan, ordered=False)
+        if not plan.residuals:
+            return len(self._table) if rows is None else len(rows)
+        if rows is None:
+            rows = range(len(self._table))
+        return sum(map(self._table.predicate(plan.residuals), rows))
+
+    def aggregate(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        group_by: str | None = None,
+        metrics: Sequence[str] = ("count",),
+    ) -> Dict[Any, Dict[str, Any]]:
+        """Summarize the close approaches that match a collection of filters.
+
+        The matches are folded into the metrics as they are found, straight from
+        the columns of the database's table, without a `CloseApproach` object.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param group_by: One of 'year', 'month', 'neo' and 'hazardous', or `None`.
+        :param metrics: Metric names, such as 'count' or 'mean_distance'; see
+            the `aggregate` module.
+        :return: A dictionary from each group's key (`None` without a grouping) to
+            a dictionary from metric name to value.
+        :raises ValueError: If the grouping or a metric is unknown.
+        """
+        return agg.aggregate(
+            self._table, self.execute(self.plan(filters)), group_by, metrics
+        )
+
+    def explain(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        limit: int | None = None,
+        order_by: str | None = None,
+        descending: bool = False,
+    ) -> Plan:
+        """Plan and execute a query to completion, only counting its matches.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param limit: The maximum number of matches to read, as for `query`.
+        :param order_by: The column to order matches by, as for `query`.
+        :param descending: Whether to generate larger values first.
+        :return: The executed `Plan`, with actual row counts filled in.
+        """
+        plan = self.plan(filters, order_by, descending, limit)
+        for _ in self.execute(plan, limit):
+            pass
+        return plan
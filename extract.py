@@ -5,7 +5,9 @@ described in the project instructions, into a collection of `NearEarthObject`s.
 
 The `load_approaches` function extracts close approach data from a JSON file,
 formatted as described in the project instructions, into a collection of
-`CloseApproach` objects.
+`CloseApproach` objects. It is built on `iter_approaches`, which walks the
+file's `"data"` array one record at a time, so the decoded document is never
+held in memory next to the `CloseApproach` objects built from it.
 
 The main module calls these functions with the arguments provided at the command
 line, and uses the resulting collections to build an `NEODatabase`.
@@ -15,12 +17,16 @@ You'll edit this file in Task 2.
 
 import csv
 import json
-from typing import List
+import os
+import re
+from typing import Any, Dict, Iterator, List, TextIO
 
 from models import CloseApproach, NearEarthObject
 
 
-def load_neos(neo_csv_path: str = "data/neos.csv") -> List[NearEarthObject]:
+def load_neos(
+    neo_csv_path: str | os.PathLike = "data/neos.csv",
+) -> List[NearEarthObject]:
     """Read near-Earth object information from a CSV file.
 
     :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
@@ -43,22 +49,203 @@ def load_neos(neo_csv_path: str = "data/neos.csv") -> List[NearEarthObject]:
     return list_of_neos
 
 
-def load_approaches(cad_json_path: str = "data/cad.json") -> List[CloseApproach]:
+# The `"fields"` header of NASA's close approach data API, version 1.1. It is
+# assumed for files that don't carry a header of their own.
+DEFAULT_CAD_FIELDS = [
+    "des",
+    "orbit_id",
+    "jd",
+    "cd",
+    "dist",
+    "dist_min",
+    "dist_max",
+    "v_rel",
+    "v_inf",
+    "t_sigma_f",
+    "h",
+]
+
+# Size of the blocks read from a close approach data file while streaming it.
+_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_FIELDS_KEY = re.compile(r'"fields"\s*:\s*\[')
+
+
+class _JSONStream:
+    """An incremental reader of a JSON document from a text file.
+
+    Values are decoded one at a time with `json.JSONDecoder.raw_decode` from a
+    buffer that holds at most a few blocks of the file, so a huge array can be
+    walked element by element instead of being decoded at once.
+    """
+
+    def __init__(self, infile: TextIO) -> None:
+        """Create a new `_JSONStream` reading from an open text file."""
+        self.infile = infile
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+
+    def _fill(self) -> bool:
+        """Read another block from the file, dropping the consumed part of the buffer."""
+        if self.eof:
+            return False
+        chunk = self.infile.read(_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos :] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it, or '' at the end."""
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()  # type: ignore
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Consume the next non-whitespace character, which must be `char`."""
+        found = self.peek()
+        if found != char:
+            raise ValueError(
+                f"Malformed JSON: expected {char!r} but found {found or 'end of file'!r}."
+            )
+        self.pos += 1
+
+    def decode(self) -> Any:
+        """Decode and consume the next complete JSON value."""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the very end of the buffer may continue in the next block.
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _separator(self, closing: str) -> bool:
+        """Consume a ',' or the closing character; return whether more members follow."""
+        found = self.peek()
+        if found == ",":
+            self.pos += 1
+            return True
+        self.expect(closing)
+        return False
+
+    def iter_object(self) -> Iterator[str]:
+        """Generate the keys of an object; the caller must consume each value."""
+        self.expect("{")
+        if self.peek() == "}":
+            self.pos += 1
+            return
+        while True:
+            key = self.decode()
+            self.expect(":")
+            yield key
+            if not self._separator("}"):
+                return
+
+    def iter_array(self) -> Iterator[Any]:
+        """Generate the decoded elements of an array, one at a time."""
+        self.expect("[")
+        if self.peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self.decode()
+            if not self._separator("]"):
+                return
+
+
+def _find_trailing_fields(cad_json_path: str | os.PathLike) -> List[str] | None:
+    """Find a `"fields"` header that follows the `"data"` array in the file.
+
+    The file is searched backwards from its end in growing blocks, so only the
+    tail of the file is read when the header is stored after the data.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :return: The list of field names, or `None` if the file has no such header.
+    """
+    with open(cad_json_path, "r") as infile:
+        size = infile.seek(0, os.SEEK_END)
+        block = _CHUNK_SIZE
+        while True:
+            offset = max(0, size - block)
+            infile.seek(offset)
+            tail = infile.read()
+            matches = list(_FIELDS_KEY.finditer(tail))
+            if matches:
+                fields, _ = json.JSONDecoder().raw_decode(tail, matches[-1].end() - 1)
+                return fields
+            if offset == 0:
+                return None
+            block *= 4
+
+
+def _column_positions(fields: List[str]) -> Dict[str, int]:
+    """Map the columns needed to build a `CloseApproach` to their record positions."""
+    try:
+        return {name: fields.index(name) for name in ("des", "cd", "dist", "v_rel")}
+    except ValueError as err:
+        raise ValueError(f"Close approach data is missing a field: {err}") from None
+
+
+def iter_approaches(
+    cad_json_path: str | os.PathLike = "data/cad.json",
+) -> Iterator[CloseApproach]:
+    """Stream close approach data from a JSON file, one `CloseApproach` at a time.
+
+    The `"data"` array is decoded record by record, and the column of each
+    attribute is looked up in the file's `"fields"` header - which may come
+    before or after the data. Files without a header are read with the
+    `DEFAULT_CAD_FIELDS` layout.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :yield: The `CloseApproach`es in the order of the file.
+    """
+    with open(cad_json_path, "r") as infile:
+        stream = _JSONStream(infile)
+        fields = None
+        for key in stream.iter_object():
+            if key == "fields":
+                fields = stream.decode()
+            elif key == "data":
+                if fields is None:
+                    fields = _find_trailing_fields(cad_json_path) or DEFAULT_CAD_FIELDS
+                columns = _column_positions(fields)
+                des, cd = columns["des"], columns["cd"]
+                dist, v_rel = columns["dist"], columns["v_rel"]
+                for record in stream.iter_array():
+                    yield CloseApproach(
+                        designation=record[des],
+                        time=record[cd],
+                        distance=record[dist],
+                        velocity=record[v_rel],
+                    )
+            else:
+                stream.decode()
+
+
+def load_approaches(
+    cad_json_path: str | os.PathLike = "data/cad.json",
+) -> List[CloseApproach]:
     """Read close approach data from a JSON file.
 
-    :param neo_csv_path: A path to a JSON file containing data about close approaches.
+    The file is streamed with `iter_approaches`, so only the resulting
+    `CloseApproach` objects are kept in memory.
+
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
     :return: A collection of `CloseApproach`es.
     """
-    list_of_ca = []
-    with open(cad_json_path, "r") as infile:
-        contents = json.load(infile)
-    for data in contents["data"]:
-        list_of_ca.append(
-            CloseApproach(
-                designation=data[0],
-                time=data[3],
-                distance=data[4],
-                velocity=data[7],
-            )
-        )
-    return list_of_ca
+    return list(iter_approaches(cad_json_path))
@@ -9,7 +9,16 @@ This function can be thought to return a collection of instances of subclasses
 of `AttributeFilter` - a 1-argument callable (on a `CloseApproach`) constructed
 from a comparator (from the `operator` module), a reference value, and a class
 method `get` that subclasses can override to fetch an attribute of interest from
-the supplied `CloseApproach`.
+the supplied `CloseApproach`. Each filter also names the `ApproachTable` column
+that holds its attribute and can express itself as a closed interval over that
+column with `interval`, so that a database can evaluate it without touching
+`CloseApproach` objects.
+
+The `compile_filters` function prepares such a collection for evaluation: it
+drops the filters whose value is `None`, merges the bounds of filters on the same
+attribute into one closed interval per column, and generates a single fused
+predicate for the whole query with `fuse_intervals`. Date bounds are converted
+once, so no `.date()` call is made per close approach.
 
 The `limit` function simply limits the maximum number of values produced by an
 iterator.
@@ -20,8 +29,10 @@ You'll edit this file in Tasks 3a and 3c.
 import datetime
 import itertools
 import operator
-from typing import Any, Callable, Dict, Generator, List
+import types
+from typing import Any, Callable, Dict, Generator, List, Mapping, Tuple
 
+from helpers import date_to_minutes, minutes_to_datetime
 from models import CloseApproach
 
 
@@ -42,9 +53,12 @@ class AttributeFilter:
     infix notation).
 
     Concrete subclasses can override the `get` classmethod to provide custom
-    behavior to fetch a desired attribute from the given `CloseApproach`.
+    behavior to fetch a desired attribute from the given `CloseApproach`, and set
+    `column` to the name of the `ApproachTable` column holding that attribute.
     """
 
+    column = ""
+
     def __init__(
         self,
         op: Callable,
@@ -79,6 +93,23 @@ class AttributeFilter:
         """
         raise UnsupportedCriterionError
 
+    def interval(self) -> Tuple[Any, Any]:
+        """Express this filter as a closed interval over its table column.
+
+        A row matches when `low <= value <= high`, where a bound of `None` is
+        unbounded. Subclasses whose column doesn't store `get`'s values directly
+        override this to translate the reference value.
+
+        :return: A (low, high) tuple of bounds.
+        """
+        if self.op is operator.eq:
+            return self.value, self.value
+        if self.op is operator.ge:
+            return self.value, None
+        if self.op is operator.le:
+            return None, self.value
+        raise UnsupportedCriterionError
+
     def __repr__(self) -> str:
         """Return `repr(self)`, a computer-readable string representation of this object."""
         return f"{self.__class__.__name__}(op=operator.{self.op.__name__}, value={self.value})"
@@ -87,15 +118,31 @@ class AttributeFilter:
 class DateFilter(AttributeFilter):
     """Children class of AttributeFilter to adress comparison of date CloseApproach attribute."""
 
+    column = "epoch"
+
     @classmethod
     def get(cls, approach: CloseApproach) -> datetime.date:
         """Get the instance attribute of CloseApproach."""
         return approach.time.date()
 
+    def interval(self) -> Tuple[int | None, int | None]:
+        """Express this filter as a closed interval of epoch minutes.
+
+        A date covers the minutes from its midnight up to the minute before the
+        next midnight.
+        """
+        low, high = super().interval()
+        return (
+            date_to_minutes(low) if low is not None else None,
+            date_to_minutes(high) + 24 * 60 - 1 if high is not None else None,
+        )
+
 
 class DistanceFilter(AttributeFilter):
     """Children class of AttributeFilter to adress comparison of distance CloseApproach attribute."""
 
+    column = "distance"
+
     @classmethod
     def get(cls, approach: CloseApproach) -> float:
         """Get the instance attribute of CloseApproach."""
@@ -105,6 +152,8 @@ class DistanceFilter(AttributeFilter):
 class VelocityFilter(AttributeFilter):
     """Children class of AttributeFilter to adress comparison of velocity CloseApproach attribute."""
 
+    column = "velocity"
+
     @classmethod
     def get(cls, approach: CloseApproach) -> float:
         """Get the instance attribute of CloseApproach."""
@@ -114,6 +163,8 @@ class VelocityFilter(AttributeFilter):
 class DiameterFilter(AttributeFilter):
     """Children class of AttributeFilter to adress comparison of diameter NearEarthObject attribute."""
 
+    column = "diameter"
+
     @classmethod
     def get(cls, ca: CloseApproach) -> float:
         """Get the instance attribute of NearEarthObject linked to CloseApproach."""
@@ -123,6 +174,8 @@ class DiameterFilter(AttributeFilter):
 class HazardousFilter(AttributeFilter):
     """Children class of AttributeFilter to adress comparison of hazardous NearEarthObject attribute."""
 
+    column = "hazardous"
+
     @classmethod
     def get(cls, ca: CloseApproach) -> bool:
         """Get the instance attribute of NearEarthObject linked to CloseApproach."""
@@ -186,6 +239,127 @@ def create_filters(
     }
 
 
+# How `CompiledFilters` reads the value of each column from a `CloseApproach`.
+# An approach without a linked NEO reads the NEO attributes of `_UNLINKED`,
+# which - like the sentinel entries of an `ApproachTable` - match no criterion.
+_APPROACH_ATTRIBUTES = {
+    "epoch": "approach.time",
+    "distance": "approach.distance",
+    "velocity": "approach.velocity",
+    "diameter": "(approach.neo or unlinked).diameter",
+    "hazardous": "(approach.neo or unlinked).hazardous",
+}
+_UNLINKED = types.SimpleNamespace(diameter=float("nan"), hazardous=-1)
+
+
+def fuse_intervals(
+    bounds: Mapping[str, Tuple[Any, Any]],
+    accessors: Mapping[str, str],
+    argument: str,
+    namespace: Dict[str, Any] | None = None,
+) -> Callable[[Any], bool]:
+    """Generate one predicate that checks every interval of a query.
+
+    The predicate is compiled from source, so each check is an inline chained
+    comparison against a constant - there's no per-row loop over filters and no
+    method dispatch. NaN values fail every comparison and so never match.
+
+    :param bounds: The closed (low, high) interval of each constrained column.
+    :param accessors: For each column, a Python expression of its value in terms of `argument`.
+    :param argument: The name of the predicate's single argument.
+    :param namespace: Globals that the accessor expressions refer to.
+    :return: A 1-argument callable returning whether its argument matches.
+    """
+    namespace = dict(namespace or {})
+    terms = []
+    for column, (low, high) in bounds.items():
+        value = accessors[column]
+        namespace[f"low_{column}"] = low
+        namespace[f"high_{column}"] = high
+        if low is not None and low == high:
+            terms.append(f"{value} == low_{column}")
+        elif low is not None and high is not None:
+            terms.append(f"low_{column} <= {value} <= high_{column}")
+        elif low is not None:
+            terms.append(f"low_{column} <= {value}")
+        elif high is not None:
+            terms.append(f"{value} <= high_{column}")
+    return eval(f"lambda {argument}: {' and '.join(terms) or 'True'}", namespace)
+
+
+class CompiledFilters:
+    """A collection of filters merged and compiled into one predicate.
+
+    The `bounds` attribute holds one closed interval per constrained column, in
+    the units of an `ApproachTable` (date bounds in epoch minutes). Calling a
+    `CompiledFilters` on a `CloseApproach` evaluates every criterion at once.
+    """
+
+    def __init__(self, bounds: Dict[str, Tuple[Any, Any]]) -> None:
+        """Compile a predicate for a collection of merged intervals.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        """
+        self.bounds = bounds
+        self.empty = any(
+            low is not None and high is not None and low > high
+            for low, high in bounds.values()
+        )
+
+        # Compare approach times against datetimes: the last matching minute is
+        # extended to its final microsecond, so the check is exact at any precision.
+        approach_bounds = dict(bounds)
+        if "epoch" in bounds:
+            low, high = bounds["epoch"]
+            approach_bounds["epoch"] = (
+                minutes_to_datetime(low) if low is not None else None,
+                (
+                    minutes_to_datetime(high + 1) - datetime.timedelta(microseconds=1)
+                    if high is not None
+                    else None
+                ),
+            )
+        self._matches = fuse_intervals(
+            approach_bounds, _APPROACH_ATTRIBUTES, "approach", {"unlinked": _UNLINKED}
+        )
+
+    def __call__(self, approach: CloseApproach) -> bool:
+        """Invoke `self(approach)`."""
+        return self._matches(approach)
+
+    def __repr__(self) -> str:
+        """Return `repr(self)`, a computer-readable string representation of this object."""
+        return f"{self.__class__.__name__}(bounds={self.bounds!r})"
+
+
+def compile_filters(
+    filters: Mapping[str, AttributeFilter] | CompiledFilters,
+) -> CompiledFilters:
+    """Compile a collection of filters into a single predicate.
+
+    Filters whose value is `None` are dropped, and the intervals of filters on
+    the same column are intersected. Already compiled filters are returned as-is.
+
+    :param filters: A collection of filters, as returned by `create_filters`.
+    :return: The compiled filters.
+    """
+    if isinstance(filters, CompiledFilters):
+        return filters
+    bounds: Dict[str, Tuple[Any, Any]] = {}
+    for filtr in filters.values():
+        if filtr.value is None:
+            continue
+        low, high = filtr.interval()
+        if filtr.column in bounds:
+            old_low, old_high = bounds[filtr.column]
+            if old_low is not None and (low is None or old_low > low):
+                low = old_low
+            if old_high is not None and (high is None or old_high < high):
+                high = old_high
+        bounds[filtr.column] = (low, high)
+    return CompiledFilters(bounds)
+
+
 def limit(iterator: Generator, n: int | None = None) -> List[Any]:
     """Produce a limited stream of values from an iterator.
 
@@ -3,7 +3,15 @@
 NASA's dataset provides timestamps as naive datetimes (corresponding to UTC).
 
 The `cd_to_datetime` function converts a string, formatted as the `cd` field of
-NASA's close approach data, into a Python `datetime`
+NASA's close approach data, into a Python `datetime`. It is called once per close
+approach while loading, so rather than going through `datetime.strptime` it
+slices the fixed-width string and looks the month up in a table, memoizing the
+date part - approaches cluster on the same days.
+
+The `datetime_to_minutes` and `minutes_to_datetime` functions convert between
+naive datetimes and integer "epoch minutes" (minutes since 1970-01-01 00:00),
+the representation used by the columns of an `ApproachTable`, and
+`date_to_minutes` gives the epoch minute at which a date starts.
 
 The `datetime_to_str` function converts a Python `datetime` into a string.
 Although `datetime`s already have human-readable string representations, those
@@ -12,6 +20,47 @@ provide that level of resolution, so the output format also will not.
 """
 
 import datetime
+import functools
+from typing import Tuple
+
+_MONTHS = {
+    "Jan": 1,
+    "Feb": 2,
+    "Mar": 3,
+    "Apr": 4,
+    "May": 5,
+    "Jun": 6,
+    "Jul": 7,
+    "Aug": 8,
+    "Sep": 9,
+    "Oct": 10,
+    "Nov": 11,
+    "Dec": 12,
+}
+
+_EPOCH_ORDINAL = datetime.date(1970, 1, 1).toordinal()
+_MINUTES_PER_DAY = 24 * 60
+
+
+@functools.lru_cache(maxsize=1 << 16)
+def _parse_cd_date(date: str) -> Tuple[int, int, int]:
+    """Parse the `YYYY-bb-DD` part of a NASA calendar date into numbers.
+
+    The result is validated by constructing a `datetime.date`, so impossible
+    days such as `2021-Feb-30` are rejected.
+
+    :param date: The first 11 characters of a NASA calendar date.
+    :return: A (year, month, day) tuple.
+    :raises ValueError: If `date` is not a valid date in this format.
+    """
+    if date[4] != "-" or date[8] != "-":
+        raise ValueError
+    month = _MONTHS[date[5:8]]
+    year, day = date[:4], date[9:]
+    if not (year.isdigit() and day.isdigit()):
+        raise ValueError
+    datetime.date(int(year), month, int(day))
+    return int(year), month, int(day)
 
 
 def cd_to_datetime(calendar_date: str) -> datetime.datetime:
@@ -26,8 +75,51 @@ def cd_to_datetime(calendar_date: str) -> datetime.datetime:
 
     :param calendar_date: A calendar date in YYYY-bb-DD hh:mm format.
     :return: A naive `datetime` corresponding to the given calendar date and time.
+    :raises ValueError: If `calendar_date` is not in this format.
+    """
+    try:
+        if len(calendar_date) != 17 or calendar_date[11] != " ":
+            raise ValueError
+        if calendar_date[14] != ":":
+            raise ValueError
+        hour, minute = calendar_date[12:14], calendar_date[15:]
+        if not (hour.isdigit() and minute.isdigit()):
+            raise ValueError
+        year, month, day = _parse_cd_date(calendar_date[:11])
+        return datetime.datetime(year, month, day, int(hour), int(minute))
+    except (ValueError, KeyError):
+        raise ValueError(
+            f"time data {calendar_date!r} does not match format '%Y-%b-%d %H:%M'"
+        ) from None
+
+
+def date_to_minutes(date: datetime.date) -> int:
+    """Return the epoch minute at which a date starts.
+
+    :param date: A Python date.
+    :return: The number of minutes between 1970-01-01 00:00 and midnight of `date`.
+    """
+    return (date.toordinal() - _EPOCH_ORDINAL) * _MINUTES_PER_DAY
+
+
+def datetime_to_minutes(dt: datetime.datetime) -> int:
+    """Convert a naive Python datetime into epoch minutes, dropping any seconds.
+
+    :param dt: A naive Python datetime.
+    :return: The number of whole minutes between 1970-01-01 00:00 and `dt`.
+    """
+    return date_to_minutes(dt) + dt.hour * 60 + dt.minute
+
+
+def minutes_to_datetime(minutes: int) -> datetime.datetime:
+    """Convert epoch minutes back into a naive Python datetime.
+
+    :param minutes: A number of minutes since 1970-01-01 00:00.
+    :return: The corresponding naive `datetime`.
     """
-    return datetime.datetime.strptime(calendar_date, "%Y-%b-%d %H:%M")
+    days, minutes = divmod(minutes, _MINUTES_PER_DAY)
+    date = datetime.date.fromordinal(_EPOCH_ORDINAL + days)
+    return datetime.datetime(date.year, date.month, date.day, *divmod(minutes, 60))
 
 
 def datetime_to_str(dt: datetime.datetime) -> str:
@@ -0,0 +1,141 @@
+"""Index the columns of an `ApproachTable` to answer range criteria without a scan.
+
+A `SortedIndex` is a permutation of row ids ordered by one column, alongside the
+column's values in that order. A closed interval over the column is answered
+with two binary searches, which yield the contiguous run of matching row ids.
+
+A `Bitmap` is a set of row ids - for example, the rows of all potentially
+hazardous NEOs - held as the bits of one Python integer, so that sets of rows
+from several indexes are combined by bitwise AND and OR before any row is read.
+"""
+
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Iterable, Iterator, Sequence, Tuple
+
+
+class SortedIndex:
+    """Row ids of a table ordered by the values of one of its columns."""
+
+    def __init__(self, values: Sequence) -> None:
+        """Build an index over a column.
+
+        Rows with equal values keep their relative order.
+
+        :param values: An `array` column, indexed by row id.
+        """
+        self.rows = array("i", sorted(range(len(values)), key=values.__getitem__))
+        self.keys = array(values.typecode, (values[i] for i in self.rows))  # type: ignore
+
+    @classmethod
+    def from_sorted(cls, rows: Sequence[int], keys: Sequence) -> "SortedIndex":
+        """Wrap row ids and values that are already in the order of an index.
+
+        :param rows: The row ids, ordered by their values.
+        :param keys: The values of those rows, in the same order.
+        :return: A `SortedIndex` over the given sequences, which aren't copied.
+        """
+        index = cls.__new__(cls)
+        index.rows = rows  # type: ignore
+        index.keys = keys  # type: ignore
+        return index
+
+    def __len__(self) -> int:
+        """Return the number of indexed rows."""
+        return len(self.rows)
+
+    def span(self, low: Any, high: Any) -> Tuple[int, int]:
+        """Locate the run of index positions whose values fall in a closed interval.
+
+        :param low: The smallest matching value, or `None` for no lower bound.
+        :param high: The largest matching value, or `None` for no upper bound.
+        :return: A (start, stop) slice of index positions.
+        """
+        start = 0 if low is None else bisect_left(self.keys, low)
+        stop = len(self.keys) if high is None else bisect_right(self.keys, high)
+        return start, max(start, stop)
+
+    def lookup(self, low: Any, high: Any) -> array:
+        """Return the ids of the rows whose values fall in a closed interval, in value order.
+
+        :param low: The smallest matching value, or `None` for no lower bound.
+        :param high: The largest matching value, or `None` for no upper bound.
+        :return: An array of row ids.
+        """
+        start, stop = self.span(low, high)
+        return self.rows[start:stop]
+
+
+class Bitmap:
+    """A set of row ids stored as the bits of a Python integer.
+
+    Intersections, unions and cardinalities run over the integer's machine
+    words in C, so combining bitmaps over hundreds of thousands of rows costs
+    microseconds. Row ids are generated in ascending order.
+    """
+
+    __slots__ = ("bits", "size")
+
+    def __init__(self, bits: int, size: int) -> None:
+        """Create a new `Bitmap`.
+
+        :param bits: An integer whose bit `i` is set when row `i` is a member.
+        :param size: The number of rows of the table the bitmap is over.
+        """
+        self.bits = bits
+        self.size = size
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[int], size: int) -> "Bitmap":
+        """Build a bitmap from row ids, in any order.
+
+        :param rows: The member row ids.
+        :param size: The number of rows of the table the bitmap is over.
+        :return: A new `Bitmap`.
+        """
+        buffer = bytearray((size + 7) // 8)
+        for row in rows:
+            buffer[row >> 3] |= 1 << (row & 7)
+        return cls(int.from_bytes(buffer, "little"), size)
+
+    @classmethod
+    def from_ranges(cls, ranges: Iterable[Tuple[int, int]], size: int) -> "Bitmap":
+        """Build a bitmap of runs of consecutive row ids.
+
+        :param ranges: The (start, stop) row ids of each run.
+        :param size: The number of rows of the table the bitmap is over.
+        :return: A new `Bitmap`.
+        """
+        bits = 0
+        for start, stop in ranges:
+            bits |= ((1 << (stop - start)) - 1) << start
+        return cls(bits, size)
+
+    def __and__(self, other: "Bitmap") -> "Bitmap":
+        """Return the intersection `self & other`."""
+        return Bitmap(self.bits & other.bits, self.size)
+
+    def __or__(self, other: "Bitmap") -> "Bitmap":
+        """Return the union `self | other`."""
+        return Bitmap(self.bits | other.bits, self.size)
+
+    def __len__(self) -> int:
+        """Return the number of member rows."""
+        return self.bits.bit_count()
+
+    def __contains__(self, row: object) -> bool:
+        """Return whether a row id is a member."""
+        return isinstance(row, int) and row >= 0 and bool(self.bits >> row & 1)
+
+    def __iter__(self) -> Iterator[int]:
+        """Generate the member row ids in ascending order."""
+        words = array("Q", self.bits.to_bytes((self.size + 63) // 64 * 8, "little"))
+        if sys.byteorder == "big":
+            words.byteswap()
+        for position, word in enumerate(words):
+            base = position * 64
+            while word:
+                lowest = word & -word
+                yield base + lowest.bit_length() - 1
+                word ^= lowest
@@ -5,7 +5,7 @@ See `README.md` for a detailed discussion of this project.
 
 This script can be invoked from the command line::
 
-    $ python3 main.py {inspect,query,interactive} [args]
+    $ python3 main.py {inspect,query,aggregate,interactive,convert} [args]
 
 The `inspect` subcommand looks up an NEO by name or by primary designation, and
 optionally lists all of that NEO's known close approaches:
@@ -14,6 +14,9 @@ optionally lists all of that NEO's known close approaches:
     $ python3 main.py inspect --name Halley
     $ python3 main.py inspect --verbose --name Halley
 
+A misspelled name or designation prints the closest matches instead, and the
+interactive shell completes names and designations with the TAB key.
+
 The `query` subcommand searches for close approaches that match given criteria:
 
     $ python3 main.py query --date 1969-07-29
@@ -23,7 +26,34 @@ The `query` subcommand searches for close approaches that match given criteria:
     $ python3 main.py query --start-date 2000-01-01 --max-diameter 0.1 --not-hazardous
     $ python3 main.py query --hazardous --max-distance 0.05 --min-velocity 30
 
-The set of results can be limited in size and/or saved to an output file in CSV
+Matches can be ordered by time, distance, velocity or diameter, for example to
+find the ten closest approaches since 2000:
+
+    $ python3 main.py query --start-date 2000-01-01 --sort-by distance --limit 10
+    $ python3 main.py query --hazardous --sort-by velocity --desc --limit 5
+
+Pass `--count` to only print how many close approaches match, and the top-level
+`--timings` flag to see how long loading and querying take:
+
+    $ python3 main.py --timings query --count --hazardous --max-distance 0.1
+
+Add `--explain` to see which index drives a query and how many rows it touches:
+
+    $ python3 main.py query --explain --date 2020-03-14 --max-distance 0.05
+
+Broad queries can be split across several processes with `--workers`. Matches
+come out in the same order as with one process, unless `--unordered` is given:
+
+    $ python3 main.py query --workers 8 --min-velocity 30 --outfile fast.csv
+
+The `aggregate` subcommand takes the same filters, and summarizes the matching
+close approaches instead of listing them, optionally per year, month, NEO or
+hazard flag:
+
+    $ python3 main.py aggregate --start-date 2020-01-01 --max-distance 0.05
+    $ python3 main.py aggregate --hazardous --group-by year -m count -m min_distance
+
+The set of results of a query can be limited in size and/or saved to an output file in CSV
 or JSON format:
 
     $ python3 main.py query --limit 5 --outfile results.csv
@@ -32,22 +62,77 @@ or JSON format:
 The `interactive` subcommand loads the NEO database and spawns an interactive
 command shell that can repeatedly execute `inspect` and `query` commands without
 having to wait to reload the database each time. However, it doesn't hot-reload.
+Repeated queries in a session are answered from a cache of their results, whose
+use is shown by the shell's `cache stats` command.
 
 If needed, the script can load data from data files other than the default with
 `--neofile` or `--cadfile`.
+
+The linked database is cached on disk as a snapshot, which is rebuilt whenever
+one of the data files changes. Pass `--no-cache` to bypass the snapshot, or
+`--rebuild-cache` to force a fresh one:
+
+    $ python3 main.py --rebuild-cache inspect --name Halley
+
+The `convert` subcommand writes the data files once more as a directory of
+column files (`data/columnar` unless `--columnar` says otherwise). While that
+directory is up to date with the data files, it is opened in place of the data
+files and the snapshot, with each column mapped into memory rather than read:
+
+    $ python3 main.py convert
+    $ python3 main.py query --start-date 2020-01-01 --max-distance 0.01
+
+Pass `--result-cache` to also keep the results of queries on disk, so that
+running the same query again skips the search. Cached results are discarded
+whenever one of the data files changes, are kept apart for the snapshot, the
+column files and the SQLite file, and the least recently used ones are deleted
+once they take up more than `--result-cache-mb` megabytes:
+
+    $ python3 main.py --result-cache query --hazardous --sort-by distance --limit 10
+
+Data sets too large to load can be queried in one streaming pass with
+`--memory-limit`, which reads the data files - or the column files, while they
+are up to date - in chunks that fit in the given budget, without building a
+database. Matches are written out as they're found:
+
+    $ python3 main.py query --memory-limit 256M --min-velocity 30 --outfile fast.json
+    $ python3 main.py query --memory-limit 64M --sort-by distance --limit 10
+
+Queries can be evaluated as vectorized scans with NumPy, if it is installed:
+
+    $ python3 main.py --engine numpy query --hazardous --min-velocity 30
+
+With `--engine sqlite`, the data is instead stored in an indexed SQLite file
+(`data/neos.sqlite` unless `--sqlite` says otherwise), built on first use and
+rebuilt whenever one of the data files changes. Later runs query the file
+without reading the data files, and each query runs as a single SQL statement:
+
+    $ python3 main.py --engine sqlite query --explain --date 2020-03-14 --max-distance 0.05
 """
 import argparse
 import cmd
 import datetime
 import pathlib
-import pickle
+import re
 import shlex
 import sys
 import time
 
-from database import NEODatabase
-from extract import load_approaches, load_neos
-from filters import create_filters, limit
+from aggregate import GROUPINGS, parse_metric
+from cache import (
+    DEFAULT_MAX_BYTES,
+    DEFAULT_MAX_ENTRIES,
+    QueryCache,
+    ResultCache,
+    query_key,
+)
+from columnar import convert, is_current, load_columnar
+from database import ENGINES
+from filters import create_filters
+from snapshot import load_database
+from sqlite import ENGINE as SQLITE_ENGINE
+from sqlite import load_sqlite
+from stream import parse_size, stream_matches, stream_query
 from write import write_to_csv, write_to_json
 
 # Paths to the root of the project and the `data` subfolder.
@@ -57,6 +142,11 @@ DATA_ROOT = PROJECT_ROOT / "data"
 # The current time, for use with the kill-on-change feature of the interactive shell.
 _START = time.time()
 
+# The value being typed after an `inspect` option that names an NEO.
+_INSPECT_VALUE = re.compile(
+    r"(?:^|\s)(?P<option>-n|--name|-p|--pdes)\s+(?P<quote>[\"']?)(?P<value>[^\"']*)$"
+)
+
 
 def date_fromisoformat(date_string):
     """Return a `datetime.date` corresponding to a string in YYYY-MM-DD format.
@@ -75,56 +165,54 @@ def date_fromisoformat(date_string):
         )
 
 
-def make_parser():
-    """Create an ArgumentParser for this script.
+def metric_name(metric):
+    """Validate the name of an aggregate metric given at the command line.
 
-    :return: A tuple of the top-level, inspect, and query parsers.
+    :param metric: A metric name, such as 'count' or 'mean_distance'.
+    :return: The metric name.
     """
-    parser = argparse.ArgumentParser(
-        description="Explore past and future close approaches of near-Earth objects."
-    )
+    try:
+        parse_metric(metric)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err))
+    return metric
 
-    # Add arguments for custom data files.
-    parser.add_argument(
-        "--neofile",
-        default=(DATA_ROOT / "neos.csv"),
-        type=pathlib.Path,
-        help="Path to CSV file of near-Earth objects.",
-    )
-    parser.add_argument(
-        "--cadfile",
-        default=(DATA_ROOT / "cad.json"),
-        type=pathlib.Path,
-        help="Path to JSON file of close approach data.",
-    )
-    subparsers = parser.add_subparsers(dest="cmd")
 
-    # Add the `inspect` subcommand parser.
-    inspect = subparsers.add_parser(
-        "inspect", description="Inspect an NEO by primary designation or by name."
-    )
-    inspect.add_argument(
-        "-v",
-        "--verbose",
-        action="store_true",
-        help="Additionally, print all known close approaches of this NEO.",
-    )
-    inspect_id = inspect.add_mutually_exclusive_group(required=True)
-    inspect_id.add_argument(
-        "-p",
-        "--pdes",
-        help="The primary designation of the NEO to inspect (e.g. '433').",
-    )
-    inspect_id.add_argument(
-        "-n", "--name", help="The IAU name of the NEO to inspect (e.g. 'Halley')."
-    )
+def worker_count(value):
+    """Validate a number of worker processes given at the command line.
 
-    # Add the `query` subcommand parser.
-    query = subparsers.add_parser(
-        "query",
-        description="Query for close approaches that " "match a collection of filters.",
-    )
-    filters = query.add_argument_group(
+    :param value: The number of workers, as a string.
+    :return: The number of workers, as a positive integer.
+    """
+    try:
+        workers = int(value)
+    except ValueError:
+        workers = 0
+    if workers < 1:
+        raise argparse.ArgumentTypeError(
+            f"'{value}' is not a valid number of workers. Use a positive integer."
+        )
+    return workers
+
+
+def memory_size(value):
+    """Validate a memory budget given at the command line.
+
+    :param value: A size in bytes, optionally followed by K, M, G or T (e.g. '512M').
+    :return: The size in bytes.
+    """
+    try:
+        return parse_size(value)
+    except ValueError as err:
+        raise argparse.ArgumentTypeError(str(err))
+
+
+def add_filter_arguments(parser):
+    """Add the arguments of `create_filters` to a subcommand parser.
+
+    :param parser: The `argparse.ArgumentParser` of a subcommand.
+    """
+    filters = parser.add_argument_group(
         "Filters",
         description="Filter close approaches by their attributes "
         "or the attributes of their NEOs.",
@@ -210,6 +298,128 @@ def make_parser():
         help="If specified, only return close approaches of NEOs that "
         "are not potentially hazardous.",
     )
+
+
+def filters_from_args(args):
+    """Create a collection of filters from the filter arguments of a subcommand.
+
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    :return: A collection of filters, as returned by `create_filters`.
+    """
+    return create_filters(
+        date=args.date,
+        start_date=args.start_date,
+        end_date=args.end_date,
+        distance_min=args.distance_min,
+        distance_max=args.distance_max,
+        velocity_min=args.velocity_min,
+        velocity_max=args.velocity_max,
+        diameter_min=args.diameter_min,
+        diameter_max=args.diameter_max,
+        hazardous=args.hazardous,
+    )
+
+
+def make_parser():
+    """Create an ArgumentParser for this script.
+
+    :return: A tuple of the top-level, inspect, and query parsers.
+    """
+    parser = argparse.ArgumentParser(
+        description="Explore past and future close approaches of near-Earth objects."
+    )
+
+    # Add arguments for custom data files.
+    parser.add_argument(
+        "--neofile",
+        default=(DATA_ROOT / "neos.csv"),
+        type=pathlib.Path,
+        help="Path to CSV file of near-Earth objects.",
+    )
+    parser.add_argument(
+        "--cadfile",
+        default=(DATA_ROOT / "cad.json"),
+        type=pathlib.Path,
+        help="Path to JSON file of close approach data.",
+    )
+    cache = parser.add_mutually_exclusive_group()
+    cache.add_argument(
+        "--no-cache",
+        dest="use_cache",
+        action="store_false",
+        help="Load the data files directly, without reading or writing a snapshot, "
+        "and without the column files.",
+    )
+    cache.add_argument(
+        "--rebuild-cache",
+        action="store_true",
+        help="Ignore any existing snapshot of the data files and write a fresh one.",
+    )
+    parser.add_argument(
+        "--columnar",
+        default=(DATA_ROOT / "columnar"),
+        type=pathlib.Path,
+        help="Path to the directory of column files written by `convert`, "
+        "which is preferred to the data files while it is up to date.",
+    )
+    parser.add_argument(
+        "--result-cache",
+        action="store_true",
+        help="Keep the results of queries on disk, and reuse them for repeated queries.",
+    )
+    parser.add_argument(
+        "--result-cache-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1 << 20),
+        help="The total size of the query results to keep on disk, in megabytes.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=(*ENGINES, SQLITE_ENGINE),
+        default="python",
+        help="Engine to evaluate queries with; 'numpy' requires NumPy, and "
+        "'sqlite' queries the SQLite file given by --sqlite.",
+    )
+    parser.add_argument(
+        "--sqlite",
+        default=(DATA_ROOT / "neos.sqlite"),
+        type=pathlib.Path,
+        help="Path to the SQLite file used by `--engine sqlite`, which is "
+        "rebuilt from the data files whenever one of them changes.",
+    )
+    parser.add_argument(
+        "--timings",
+        action="store_true",
+        help="Report how long loading the data and running the command take, on stderr.",
+    )
+    subparsers = parser.add_subparsers(dest="cmd")
+
+    # Add the `inspect` subcommand parser.
+    inspect = subparsers.add_parser(
+        "inspect", description="Inspect an NEO by primary designation or by name."
+    )
+    inspect.add_argument(
+        "-v",
+        "--verbose",
+        action="store_true",
+        help="Additionally, print all known close approaches of this NEO.",
+    )
+    inspect_id = inspect.add_mutually_exclusive_group(required=True)
+    inspect_id.add_argument(
+        "-p",
+        "--pdes",
+        help="The primary designation of the NEO to inspect (e.g. '433').",
+    )
+    inspect_id.add_argument(
+        "-n", "--name", help="The IAU name of the NEO to inspect (e.g. 'Halley')."
+    )
+
+    # Add the `query` subcommand parser.
+    query = subparsers.add_parser(
+        "query",
+        description="Query for close approaches that " "match a collection of filters.",
+    )
+    add_filter_arguments(query)
     query.add_argument(
         "-l",
         "--limit",
@@ -224,6 +434,71 @@ def make_parser():
         help="File in which to save structured results. "
         "If omitted, results are printed to standard output.",
     )
+    query.add_argument(
+        "--sort-by",
+        choices=("time", "distance", "velocity", "diameter"),
+        help="Return matches ordered by this attribute instead of in internal order. "
+        "Approaches of NEOs without a known diameter come last by diameter.",
+    )
+    query.add_argument(
+        "--desc",
+        action="store_true",
+        help="With --sort-by, return the largest values first.",
+    )
+    query.add_argument(
+        "-c",
+        "--count",
+        action="store_true",
+        help="Only print the number of matching close approaches.",
+    )
+    query.add_argument(
+        "--explain",
+        action="store_true",
+        help="Before the results, print the chosen query plan "
+        "with its estimated and actual row counts.",
+    )
+    query.add_argument(
+        "--workers",
+        type=worker_count,
+        default=1,
+        help="The number of processes that scan the data in parallel for broad queries.",
+    )
+    query.add_argument(
+        "--unordered",
+        action="store_true",
+        help="With --workers, print unsorted matches as soon as they're found, "
+        "rather than in the same order as a single process.",
+    )
+    query.add_argument(
+        "--memory-limit",
+        type=memory_size,
+        help="Stream the data through a memory budget of this size (e.g. 512M) "
+        "instead of loading the database, for data sets larger than memory. "
+        "With --sort-by, --limit must fit in the budget.",
+    )
+
+    # Add the `aggregate` subcommand parser.
+    aggregate = subparsers.add_parser(
+        "aggregate",
+        description="Summarize the close approaches that match a collection of filters.",
+    )
+    add_filter_arguments(aggregate)
+    aggregate.add_argument(
+        "-g",
+        "--group-by",
+        choices=GROUPINGS,
+        help="Report the metrics for each year, month, NEO or hazard flag.",
+    )
+    aggregate.add_argument(
+        "-m",
+        "--metric",
+        dest="metrics",
+        action="append",
+        type=metric_name,
+        help="A metric to report: 'count', or one of min/max/mean/sum followed "
+        "by '_' and one of distance/velocity/diameter (e.g. 'mean_distance'). "
+        "May be repeated. Defaults to 'count'.",
+    )
 
     repl = subparsers.add_parser(
         "interactive",
@@ -236,6 +511,26 @@ def make_parser():
         action="store_true",
         help="If specified, kill the session whenever a project file is modified.",
     )
+    repl.add_argument(
+        "--cache-entries",
+        type=int,
+        default=DEFAULT_MAX_ENTRIES,
+        help="The number of query results to keep in the session's cache.",
+    )
+    repl.add_argument(
+        "--cache-mb",
+        type=float,
+        default=DEFAULT_MAX_BYTES / (1 << 20),
+        help="The total size of the query results to keep in the session's cache, "
+        "in megabytes.",
+    )
+
+    # Add the `convert` subcommand parser.
+    subparsers.add_parser(
+        "convert",
+        description="Write the data files as a directory of column files, "
+        "for fast loading with `mmap`.",
+    )
     return parser, inspect, query
 
 
@@ -262,9 +557,15 @@ def inspect(database, pdes=None, name=None, verbose=False):
     else:
         neo = database.get_neo_by_name(name)
 
-    # Ensure that we have received an NEO.
+    # Ensure that we have received an NEO, or suggest similar ones.
     if not neo:
         print("No matching NEOs exist in the database.", file=sys.stderr)
+        if pdes:
+            suggestions = database.suggest(pdes, kind="designation")
+        else:
+            suggestions = database.suggest(name, kind="name")
+        if suggestions:
+            print(f"Did you mean: {', '.join(suggestions)}?", file=sys.stderr)
         return None
 
     # Display information about this NEO, and optionally its close approaches if verbose.
@@ -275,11 +576,13 @@ def inspect(database, pdes=None, name=None, verbose=False):
     return neo
 
 
-def query(database, args):
+def query(database, args, cache=None):
     """Perform the `query` subcommand.
 
     Create a collection of filters with `create_filters` and supply them to the
-    database's `query` method to produce a stream of matching results.
+    database's `query` method to produce a stream of matching results. With a
+    `cache`, the row ids of the results are looked up there first, and stored
+    there after a miss.
 
     If an output file wasn't given, print these results to stdout, limiting to
     10 entries if no limit was specified. If an output file was given, use the
@@ -288,33 +591,96 @@ def query(database, args):
 
     :param database: The `NEODatabase` containing data on NEOs and their close approaches.
     :param args: All arguments from the command line, as parsed by the top-level parser.
+    :param cache: A `QueryCache` or `ResultCache` of the row ids of earlier results, or None.
     """
     # Construct a collection of filters from arguments supplied at the command line.
-    filters = create_filters(
-        date=args.date,
-        start_date=args.start_date,
-        end_date=args.end_date,
-        distance_min=args.distance_min,
-        distance_max=args.distance_max,
-        velocity_min=args.velocity_min,
-        velocity_max=args.velocity_max,
-        diameter_min=args.diameter_min,
-        diameter_max=args.diameter_max,
-        hazardous=args.hazardous,
+    filters = filters_from_args(args)
+    database.use_workers(args.workers, ordered=not args.unordered)
+    if args.unordered:
+        # Matches in a different order aren't the ones a cache expects.
+        cache = None
+
+    # Print 10 entries to stdout if no limit was specified.
+    count = args.limit if args.outfile or args.count else args.limit or 10
+    if args.explain:
+        print(
+            database.explain(
+                filters, limit=count, order_by=args.sort_by, descending=args.desc
+            ).explain()
+        )
+
+    if args.count:
+        # Only print the number of matches.
+        print(database.count(filters))
+        return
+
+    # Query the database with the collection of filters, stopping at the limit.
+    rows = None
+    if cache is not None:
+        key = query_key(filters, args.sort_by, args.desc, count)
+        rows = cache.get(key)
+    if rows is None:
+        rows = database.query_rows(
+            filters, limit=count, order_by=args.sort_by, descending=args.desc
+        )
+        if cache is not None:
+            rows = cache.put(key, rows)
+    output(database.fetch(rows), args)
+
+
+def stream(args):
+    """Perform the `query` subcommand in one streaming pass, within `--memory-limit`.
+
+    No database is loaded: the close approaches are read from the data files -
+    or from the column files written by `convert`, while they're up to date -
+    a chunk at a time, and the matches are printed or written as they're found.
+
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
+    filters = filters_from_args(args)
+    directory = None
+    if args.use_cache and is_current(args.columnar, args.neofile, args.cadfile):
+        directory = args.columnar
+
+    if args.count:
+        # Only print the number of matches.
+        matches = stream_matches(
+            filters, args.neofile, args.cadfile, args.memory_limit, directory
+        )
+        print(sum(1 for _ in matches))
+        return
+
+    # Print 10 entries to stdout if no limit was specified.
+    count = args.limit if args.outfile else args.limit or 10
+    results = stream_query(
+        filters,
+        args.neofile,
+        args.cadfile,
+        args.memory_limit,
+        limit=count,
+        order_by=args.sort_by,
+        descending=args.desc,
+        directory=directory,
     )
-    # Query the database with the collection of filters.
-    results = database.query(filters)
+    output(results, args)
+
+
+def output(results, args):
+    """Print the results of a query, or write them to the `--outfile` of the command line.
 
+    :param results: An iterable of matching `CloseApproach`es.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
     if not args.outfile:
-        # Write the results to stdout, limiting to 10 entries if not specified.
-        for result in limit(results, args.limit or 10):
+        # Write the results to stdout.
+        for result in results:
             print(result)
     else:
         # Write the results to a file.
         if args.outfile.suffix == ".csv":
-            write_to_csv(limit(results, args.limit), args.outfile)
+            write_to_csv(results, args.outfile)
         elif args.outfile.suffix == ".json":
-            write_to_json(limit(results, args.limit), args.outfile)
+            write_to_json(results, args.outfile)
         else:
             print(
                 "Please use an output file that ends with `.csv` or `.json`.",
@@ -322,6 +688,42 @@ def query(database, args):
             )
 
 
+def aggregate(database, args):
+    """Perform the `aggregate` subcommand.
+
+    Summarize the close approaches matching the filters supplied at the command
+    line, and print one row of metrics per group.
+
+    :param database: The `NEODatabase` containing data on NEOs and their close approaches.
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    """
+    metrics = args.metrics or ["count"]
+    results = database.aggregate(
+        filters_from_args(args), group_by=args.group_by, metrics=metrics
+    )
+
+    def cell(value):
+        if value is None:
+            return "-"
+        if isinstance(value, float):
+            return f"{value:.3f}"
+        return str(value)
+
+    header = [args.group_by or "", *metrics]
+    rows = [
+        [cell(group) if args.group_by else "all", *map(cell, values.values())]
+        for group, values in results.items()
+    ]
+    widths = [max(len(row[i]) for row in [header, *rows]) for i in range(len(header))]
+    for row in [header, *rows]:
+        print(
+            "  ".join(
+                value.ljust(width) if i == 0 else value.rjust(width)
+                for i, (value, width) in enumerate(zip(row, widths))
+            ).rstrip()
+        )
+
+
 class NEOShell(cmd.Cmd):
     """Perform the `interactive` subcommand.
 
@@ -342,7 +744,13 @@ class NEOShell(cmd.Cmd):
     prompt = "(neo) "
 
     def __init__(
-        self, database, inspect_parser, query_parser, aggressive=False, **kwargs
+        self,
+        database,
+        inspect_parser,
+        query_parser,
+        aggressive=False,
+        cache=None,
+        **kwargs,
     ):
         """Create a new `NEOShell`.
 
@@ -352,6 +760,7 @@ class NEOShell(cmd.Cmd):
         :param inspect_parser: The subparser for the `inspect` subcommand.
         :param query_parser: The subparser for the `query` subcommand.
         :param aggressive: Whether to kill the session whenever a project file is changed.
+        :param cache: The `QueryCache` for query results; a default-sized one if None.
         :param kwargs: A dictionary of excess keyword arguments passed to the superclass.
         """
         super().__init__(**kwargs)
@@ -359,6 +768,7 @@ class NEOShell(cmd.Cmd):
         self.inspect = inspect_parser
         self.query = query_parser
         self.aggressive = aggressive
+        self.cache = cache if cache is not None else QueryCache()
 
     @classmethod
     def parse_arg_with(cls, arg, parser):
@@ -410,6 +820,29 @@ class NEOShell(cmd.Cmd):
         # Run the `inspect` subcommand.
         inspect(self.db, pdes=args.pdes, name=args.name, verbose=args.verbose)
 
+    def complete_inspect(self, text, line, begidx, endidx):
+        """Complete NEO names after `--name` and primary designations after `--pdes`.
+
+        A name or designation containing spaces is completed within quotes:
+
+            (neo) inspect --pdes "2020 Q<TAB>
+        """
+        match = _INSPECT_VALUE.search(line[:endidx])
+        if not match or (not match["quote"] and " " in match["value"]):
+            return [
+                option
+                for option in ("--pdes", "--name", "--verbose")
+                if option.startswith(text)
+            ]
+        kind = "name" if match["option"] in ("-n", "--name") else "designation"
+        completions = self.db.complete(match["value"], kind, limit=100)
+        if not match["quote"]:
+            # Quote completions with spaces, so they stay one argument.
+            return [f'"{c}"' if " " in c else c for c in completions]
+        # Readline replaces only `text`, the part after the last space or quote.
+        skip = len(match["value"]) - len(text)
+        return [completion[skip:] for completion in completions]
+
     def do_q(self, arg):
         """Shorthand for `query`."""
         self.do_query(arg)
@@ -440,8 +873,31 @@ class NEOShell(cmd.Cmd):
         if not args:
             return
 
-        # Run the `inspect` subcommand.
-        query(self.db, args)
+        # Run the `query` subcommand. Options the database can't honor, such
+        # as `--workers` on a SQLite file, are reported like parsing errors.
+        try:
+            query(self.db, args, self.cache)
+        except ValueError as err:
+            print(err, file=sys.stderr)
+
+    def do_cache(self, arg):
+        """Inspect or empty the cache of query results.
+
+        Repeated queries are answered from a cache of their results, which is
+        shared by queries with the same criteria given in any order:
+
+            (neo) cache stats
+            (neo) cache clear
+        """
+        if arg.strip() == "stats":
+            for name, value in self.cache.stats().items():
+                if isinstance(value, float):
+                    value = f"{value:.1%}"
+                print(f"{name.replace('_', ' ')}: {value}")
+        elif arg.strip() == "clear":
+            self.cache.clear()
+        else:
+            print("Usage: cache {stats,clear}", file=sys.stderr)
 
     def do_EOF(self, _arg):
         """Exit the interactive session."""
@@ -474,24 +930,112 @@ class NEOShell(cmd.Cmd):
         return line
 
 
+def load(args):
+    """Load the database that the command line asks for.
+
+    With `--engine sqlite`, this is the SQLite file. Otherwise, it is the
+    column files while they're up to date, or else the snapshot or the data
+    files.
+
+    :param args: All arguments from the command line, as parsed by the top-level parser.
+    :return: An `NEODatabase`, or a `SQLiteDatabase`.
+    """
+    if args.engine == SQLITE_ENGINE:
+        return load_sqlite(
+            args.sqlite,
+            args.neofile,
+            args.cadfile,
+            use_cache=args.use_cache,
+            rebuild=args.rebuild_cache,
+        )
+    database = None
+    if args.use_cache and not args.rebuild_cache:
+        database = load_columnar(args.columnar, args.neofile, args.cadfile)
+    if database is None:
+        database = load_database(
+            args.neofile,
+            args.cadfile,
+            use_cache=args.use_cache,
+            rebuild=args.rebuild_cache,
+        )
+    return database
+
+
 def main():
     """Run the main script."""
     parser, inspect_parser, query_parser = make_parser()
     args = parser.parse_args()
 
-    # Extract data from the data files into structured Python objects.
-    database = NEODatabase(load_neos(args.neofile), load_approaches(args.cadfile))
+    if args.cmd == "convert":
+        convert(args.neofile, args.cadfile, args.columnar)
+        print(
+            f"Wrote the columns of {args.neofile} and {args.cadfile} to {args.columnar}"
+        )
+        return
+
+    if args.cmd == "query" and args.memory_limit is not None:
+        if args.explain or args.workers > 1:
+            query_parser.error(
+                "--memory-limit can't be combined with --explain or --workers."
+            )
+        if args.engine == SQLITE_ENGINE:
+            query_parser.error("--memory-limit can't be combined with --engine sqlite.")
+        started = time.perf_counter()
+        try:
+            stream(args)
+        except ValueError as err:
+            query_parser.error(str(err))
+        if args.timings:
+            print(
+                f"Streamed `query` in {(time.perf_counter() - started) * 1e3:.1f} ms",
+                file=sys.stderr,
+            )
+        return
+
+    if args.engine == SQLITE_ENGINE and args.cmd == "query" and args.workers > 1:
+        query_parser.error("--workers can't be combined with --engine sqlite.")
+
+    # Extract data from the data files into structured Python objects, or map
+    # up-to-date column files.
+    started = time.perf_counter()
+    database = load(args)
+    database.use_engine(args.engine)
+    loaded = time.perf_counter()
 
     # Run the chosen subcommand.
     if args.cmd == "inspect":
         inspect(database, pdes=args.pdes, name=args.name, verbose=args.verbose)
     elif args.cmd == "query":
-        query(database, args)
+        cache: QueryCache | ResultCache | None = None
+        if args.result_cache:
+            cache = ResultCache(
+                (args.neofile, args.cadfile),
+                database.layout,
+                max_bytes=int(args.result_cache_mb * (1 << 20)),
+            )
+        query(database, args, cache)
+    elif args.cmd == "aggregate":
+        aggregate(database, args)
     elif args.cmd == "interactive":
+        cache = QueryCache(args.cache_entries, int(args.cache_mb * (1 << 20)))
         NEOShell(
-            database, inspect_parser, query_parser, aggressive=args.aggressive
+            database,
+            inspect_parser,
+            query_parser,
+            aggressive=args.aggressive,
+            cache=cache,
         ).cmdloop()
 
+    if args.timings:
+        print(
+            f"Loaded the database in {(loaded - started) * 1e3:.1f} ms",
+            file=sys.stderr,
+        )
+        print(
+            f"Ran `{args.cmd}` in {(time.perf_counter() - loaded) * 1e3:.1f} ms",
+            file=sys.stderr,
+        )
+
 
 if __name__ == "__main__":
     main()
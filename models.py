@@ -15,9 +15,14 @@ The functions that construct these objects use information extracted from the
 data files from NASA, so these objects should be able to handle all of the
 quirks of the data set, such as missing names and unknown diameters.
 
+Both classes declare `__slots__`: the data set holds hundreds of thousands of
+close approaches, and a per-instance `__dict__` would cost more memory than the
+attributes themselves.
+
 You'll edit this file in Task 1.
 """
 
+import datetime
 from typing import Any, Dict, List
 
 from helpers import cd_to_datetime, datetime_to_str
@@ -36,6 +41,8 @@ class NearEarthObject:
     `NEODatabase` constructor.
     """
 
+    __slots__ = ("designation", "name", "diameter", "hazardous", "approaches")
+
     def __init__(
         self, designation: str, name: str, diameter: str, hazardous: str
     ) -> None:
@@ -48,6 +55,26 @@ class NearEarthObject:
         # Create an empty initial collection of linked approaches.
         self.approaches: List[CloseApproach] = []
 
+    @classmethod
+    def from_values(
+        cls, designation: str, name: str | None, diameter: float, hazardous: bool
+    ) -> "NearEarthObject":
+        """Create a `NearEarthObject` from already-decoded values.
+
+        :param designation: The primary designation of the NEO.
+        :param name: The IAU name of the NEO, or `None`.
+        :param diameter: The diameter in kilometers, or NaN if unknown.
+        :param hazardous: Whether the NEO is potentially hazardous.
+        :return: A new `NearEarthObject` without approaches.
+        """
+        neo = cls.__new__(cls)
+        neo.designation = designation
+        neo.name = name
+        neo.diameter = diameter
+        neo.hazardous = hazardous
+        neo.approaches = []
+        return neo
+
     @property
     def fullname(self) -> str:
         """Return a representation of the full name of this NEO."""
@@ -101,6 +128,8 @@ class CloseApproach:
     `NEODatabase` constructor.
     """
 
+    __slots__ = ("_designation", "time", "distance", "velocity", "neo")
+
     def __init__(
         self, designation: str, time: str, distance: str, velocity: str
     ) -> None:
@@ -116,6 +145,35 @@ class CloseApproach:
         # Create an attribute for the referenced NEO, originally None.
         self.neo: None | NearEarthObject = None
 
+    @classmethod
+    def from_values(
+        cls,
+        designation: str,
+        time: datetime.datetime,
+        distance: float,
+        velocity: float,
+        neo: "NearEarthObject | None" = None,
+    ) -> "CloseApproach":
+        """Create a `CloseApproach` from already-decoded values.
+
+        Unlike the constructor, this doesn't parse strings, so it is cheap enough
+        to materialize rows of an `ApproachTable` on demand.
+
+        :param designation: The primary designation of the approaching NEO.
+        :param time: The naive `datetime` of closest approach.
+        :param distance: The nominal approach distance, in astronomical units.
+        :param velocity: The relative approach velocity, in kilometers per second.
+        :param neo: The linked `NearEarthObject`, if any.
+        :return: A new `CloseApproach`.
+        """
+        approach = cls.__new__(cls)
+        approach._designation = designation
+        approach.time = time
+        approach.distance = distance
+        approach.velocity = velocity
+        approach.neo = neo
+        return approach
+
     @property
     def time_str(self) -> str:
         """Return a formatted representation of this `CloseApproach`'s approach time.
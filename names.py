@@ -0,0 +1,122 @@
+"""Look up NEO names and designations by prefix and by approximate spelling.
+
+A `NameIndex` holds a collection of strings - such as the names, or the primary
+designations, of every NEO - folded to lower case. Prefix searches run two
+binary searches over the sorted folded strings, which play the part of a trie:
+the strings sharing a prefix are one contiguous run.
+
+Suggestions for a misspelled string use symmetric deletion: the index maps each
+string, and each string with any one character deleted, back to the original.
+Looking up the query's own one-character deletions then finds every string
+within one insertion, deletion or substitution of it - as well as transposed
+neighbours and many strings two edits away - with a dozen dictionary lookups,
+and only those candidates are ranked by their Levenshtein distance.
+
+Matching is case-insensitive, and results are reported in their original case.
+"""
+
+from bisect import bisect_left
+from typing import Dict, Iterable, List, Set
+
+
+def _deletions(string: str) -> Set[str]:
+    """Return a string and every string made by deleting one of its characters."""
+    return {string, *(string[:i] + string[i + 1 :] for i in range(len(string)))}
+
+
+def _edit_distance(a: str, b: str, bound: int) -> int:
+    """Return the Levenshtein distance between two strings, capped at `bound + 1`.
+
+    The rows of the dynamic program are computed one character of `a` at a
+    time, and the computation stops as soon as a whole row exceeds the bound,
+    since later rows can only be larger.
+    """
+    if abs(len(a) - len(b)) > bound:
+        return bound + 1
+    previous = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        current = [i]
+        for j, y in enumerate(b, 1):
+            current.append(
+                min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (x != y))
+            )
+        if min(current) > bound:
+            return bound + 1
+        previous = current
+    return min(previous[-1], bound + 1)
+
+
+class NameIndex:
+    """A case-insensitive prefix and edit-distance index over a collection of strings."""
+
+    def __init__(self, strings: Iterable[str]) -> None:
+        """Build an index.
+
+        :param strings: The strings to index, in their original case.
+        """
+        self.originals: Dict[str, List[str]] = {}
+        for string in strings:
+            self.originals.setdefault(string.casefold(), []).append(string)
+        self.keys = sorted(self.originals)
+
+        # Each folded string, and each string with one character deleted, maps
+        # to the folded strings it was derived from.
+        self.neighbours: Dict[str, List[str]] = {}
+        for key in self.keys:
+            for variant in _deletions(key):
+                self.neighbours.setdefault(variant, []).append(key)
+
+    def __len__(self) -> int:
+        """Return the number of distinct folded strings."""
+        return len(self.keys)
+
+    def lookup(self, string: str) -> List[str]:
+        """Return the indexed strings equal to `string`, ignoring case.
+
+        :param string: The string to look up.
+        :return: The matching strings, in their original case.
+        """
+        return list(self.originals.get(string.casefold(), []))
+
+    def prefix(self, prefix: str, limit: int | None = None) -> List[str]:
+        """Return the indexed strings that start with a prefix, ignoring case.
+
+        :param prefix: The prefix to search for.
+        :param limit: The maximum number of strings to return, or `None` for all.
+        :return: The matching strings in their original case, in folded order.
+        """
+        folded = prefix.casefold()
+        matches: List[str] = []
+        for position in range(bisect_left(self.keys, folded), len(self.keys)):
+            key = self.keys[position]
+            if not key.startswith(folded) or (limit and len(matches) >= limit):
+                break
+            matches.extend(self.originals[key])
+        return matches[:limit] if limit else matches
+
+    def suggest(self, string: str, max_distance: int = 2, limit: int = 5) -> List[str]:
+        """Suggest the indexed strings closest to a possibly misspelled string.
+
+        :param string: The string to find neighbours of.
+        :param max_distance: The largest edit distance of a suggestion, counting
+            insertions, deletions and substitutions of single characters. The
+            candidates found by symmetric deletion are never more than two
+            edits away.
+        :param limit: The maximum number of suggestions.
+        :return: Up to `limit` strings in their original case, nearest first.
+        """
+        folded = string.casefold()
+        candidates: Set[str] = set()
+        for variant in _deletions(folded):
+            candidates.update(self.neighbours.get(variant, ()))
+        found = sorted(
+            (distance, key)
+            for key, distance in (
+                (key, _edit_distance(folded, key, max_distance)) for key in candidates
+            )
+            if distance <= max_distance
+        )
+        suggestions: List[str] = []
+        for _, key in found:
+            suggestions.extend(self.originals[key])
+        return suggestions[:limit]
@@ -0,0 +1,150 @@
+"""Scan an `ApproachTable` in shards across a pool of worker processes.
+
+A `ShardedExecutor` splits the rows of a table into contiguous shards and checks
+each shard against a query's intervals in a `ProcessPoolExecutor`. Workers are
+forked where the platform allows it, so that they share the parent's table
+without copying or pickling it; elsewhere, each worker unpickles the table once
+when it starts.
+
+Each shard sends back an `array` of its matching row ids - ordered by a column
+and cut to a limit within the shard when the query asks for it - and the shards
+are streamed back as they are needed. By default the shards are read in table
+order, or merged by the ordering column, so that the matches come out exactly
+as a serial scan would produce them. Without that guarantee, the shards of an
+unordered query are yielded as soon as each one finishes.
+"""
+
+import heapq
+import itertools
+import math
+import multiprocessing
+from array import array
+from concurrent.futures import Future, ProcessPoolExecutor, as_completed
+from typing import Any, Iterable, Iterator, List, Mapping, Tuple
+
+from table import ApproachTable
+
+# Each worker is given this many shards, so that one slow shard doesn't leave
+# the other workers idle, and the first matches arrive early.
+_SHARDS_PER_WORKER = 4
+
+# The table of the current worker process, set when the worker starts.
+_table: ApproachTable | None = None
+
+
+def _attach(table: ApproachTable) -> None:
+    """Keep the table in a worker process for the shards it evaluates."""
+    global _table
+    _table = table
+
+
+def _select(
+    bounds: Mapping[str, Tuple[Any, Any]],
+    start: int,
+    stop: int,
+    column: str | None,
+    descending: bool,
+    limit: int | None,
+) -> array:
+    """Find the matching rows of one shard, in a worker process."""
+    assert _table is not None
+    rows: Iterable[int] = _table.select(bounds, range(start, stop))
+    if column is not None:
+        key = _table.sort_key(column, descending)
+        if limit is None:
+            rows = sorted(rows, key=key)
+        else:
+            rows = heapq.nsmallest(limit, rows, key=key)
+    elif limit is not None:
+        rows = itertools.islice(rows, limit)
+    return array("i", rows)
+
+
+def _count(bounds: Mapping[str, Tuple[Any, Any]], start: int, stop: int) -> int:
+    """Count the matching rows of one shard, in a worker process."""
+    assert _table is not None
+    if not bounds:
+        return stop - start
+    return sum(map(_table.predicate(bounds), range(start, stop)))
+
+
+class ShardedExecutor:
+    """A pool of worker processes that scan the shards of a table."""
+
+    def __init__(
+        self, table: ApproachTable, workers: int, shards: int | None = None
+    ) -> None:
+        """Start a pool of workers over a table.
+
+        :param table: The table to scan.
+        :param workers: The number of worker processes.
+        :param shards: The number of shards to split the table into; by default,
+            a few per worker.
+        """
+        self.table = table
+        self.workers = workers
+        context = None
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        self._pool = ProcessPoolExecutor(
+            workers, mp_context=context, initializer=_attach, initargs=(table,)
+        )
+        size = len(table)
+        step = max(1, math.ceil(size / (shards or workers * _SHARDS_PER_WORKER)))
+        self.shards = [
+            (start, min(start + step, size)) for start in range(0, size, step)
+        ]
+
+    def select(
+        self,
+        bounds: Mapping[str, Tuple[Any, Any]],
+        column: str | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+        ordered: bool = True,
+    ) -> Iterator[int]:
+        """Generate the ids of rows whose columns fall within every interval.
+
+        Shards that haven't started yet are cancelled once the caller stops
+        reading.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :param column: The column to order the matches by, as for
+            `ApproachTable.sort_key`, or `None` for table order.
+        :param descending: Whether larger values come first.
+        :param limit: The number of leading matches wanted, or `None` for all.
+        :param ordered: Whether unordered matches must come out in table order,
+            rather than shard by shard as the shards finish.
+        :yield: The ids of the matching rows.
+        """
+        futures: List[Future] = [
+            self._pool.submit(_select, bounds, start, stop, column, descending, limit)
+            for start, stop in self.shards
+        ]
+        try:
+            if column is not None:
+                key = self.table.sort_key(column, descending)
+                results = [future.result() for future in as_completed(futures)]
+                yield from heapq.merge(*results, key=key)
+            else:
+                for future in futures if ordered else as_completed(futures):
+                    yield from future.result()
+        finally:
+            for future in futures:
+                future.cancel()
+
+    def count(self, bounds: Mapping[str, Tuple[Any, Any]]) -> int:
+        """Count the rows whose columns fall within every interval.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :return: The number of matching rows.
+        """
+        futures = [
+            self._pool.submit(_count, bounds, start, stop)
+            for start, stop in self.shards
+        ]
+        return sum(future.result() for future in futures)
+
+    def close(self) -> None:
+        """Shut the workers down, abandoning any shards not yet started."""
+        self._pool.shutdown(cancel_futures=True)
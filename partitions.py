@@ -0,0 +1,173 @@
+"""Split a table into year partitions, and rule partitions out with zone maps.
+
+A `Partition` is a contiguous run of rows of an `ApproachTable` whose approaches
+all happen in the same calendar year. Alongside its rows, it keeps a zone map:
+the smallest and largest approach time, distance, velocity and NEO diameter of
+those rows. A query whose interval over one of these columns doesn't overlap a
+partition's range can't match any of its rows, so a scan skips the partition
+without reading it.
+
+`partition_by_year` finds the partitions of any table, but they are only whole
+years - and pruning only pays off - when the rows are ordered by time, as they
+are in the close approach data file and so in the column files written by
+`columnar.convert`.
+"""
+
+import datetime
+import math
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+from helpers import date_to_minutes, minutes_to_datetime
+from table import ApproachTable
+
+# The columns that a zone map keeps the range of.
+ZONE_COLUMNS = ("epoch", "distance", "velocity", "diameter")
+
+# Tables split into more runs than this aren't ordered by time, and are left
+# unpartitioned.
+_MAX_PARTITIONS = 4096
+
+
+class Partition:
+    """A contiguous run of rows from one year, with the range of each column."""
+
+    def __init__(
+        self,
+        year: int,
+        start: int,
+        stop: int,
+        ranges: Mapping[str, Tuple[Any, Any] | None],
+    ) -> None:
+        """Create a new `Partition`.
+
+        :param year: The year of every approach in the partition.
+        :param start: The first row id of the partition.
+        :param stop: The row id after the last one of the partition.
+        :param ranges: The (smallest, largest) value of each of `ZONE_COLUMNS`,
+            or `None` for a column without any known value.
+        """
+        self.year = year
+        self.start = start
+        self.stop = stop
+        self.ranges = dict(ranges)
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return self.stop - self.start
+
+    def may_match(self, bounds: Mapping[str, Tuple[Any, Any]]) -> bool:
+        """Return whether any row could fall within every interval.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :return: False if the zone map rules every row of the partition out.
+        """
+        for column, (low, high) in bounds.items():
+            if column not in self.ranges:
+                continue
+            known = self.ranges[column]
+            if known is None:
+                # NaN values, such as unknown diameters, match no interval.
+                return False
+            smallest, largest = known
+            if low is not None and largest < low:
+                return False
+            if high is not None and smallest > high:
+                return False
+        return True
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Describe the partition with plain values, for a JSON manifest."""
+        return {
+            "year": self.year,
+            "start": self.start,
+            "stop": self.stop,
+            "ranges": self.ranges,
+        }
+
+    @classmethod
+    def from_dict(cls, values: Mapping[str, Any]) -> "Partition":
+        """Recreate a partition described by `to_dict`."""
+        return cls(
+            values["year"],
+            values["start"],
+            values["stop"],
+            {
+                column: None if known is None else tuple(known)
+                for column, known in values["ranges"].items()
+            },
+        )
+
+
+def _range(values: Sequence[float]) -> Tuple[float, float] | None:
+    """Return the smallest and largest of some values, ignoring NaN."""
+    known = [value for value in values if not math.isnan(value)]
+    return (min(known), max(known)) if known else None
+
+
+def partition_by_year(table: ApproachTable) -> List[Partition]:
+    """Split a table into runs of rows from the same year, with their zone maps.
+
+    :param table: The table to partition.
+    :return: The partitions in row order, or no partitions at all if the rows
+        aren't grouped by year.
+    """
+    epochs = table.epochs
+    runs: List[Tuple[int, int, int]] = []
+    start = 0
+    year = low = high = 0
+    for row, epoch in enumerate(epochs):
+        if low <= epoch < high:
+            continue
+        if row:
+            runs.append((year, start, row))
+            if len(runs) > _MAX_PARTITIONS:
+                return []
+        year = minutes_to_datetime(epoch).year
+        low = date_to_minutes(datetime.date(year, 1, 1))
+        high = date_to_minutes(datetime.date(year + 1, 1, 1))
+        start = row
+    if len(epochs):
+        runs.append((year, start, len(epochs)))
+
+    diameters, neo_index = table.diameters, table.neo_index
+    partitions = []
+    for year, start, stop in runs:
+        rows = slice(start, stop)
+        partitions.append(
+            Partition(
+                year,
+                start,
+                stop,
+                {
+                    "epoch": (min(epochs[rows]), max(epochs[rows])),
+                    "distance": _range(table.distances[rows]),
+                    "velocity": _range(table.velocities[rows]),
+                    "diameter": _range([diameters[i] for i in neo_index[rows]]),
+                },
+            )
+        )
+    return partitions
+
+
+class RowRanges:
+    """The row ids of several runs of rows, in order, as one collection."""
+
+    def __init__(self, ranges: Sequence[Tuple[int, int]]) -> None:
+        """Create a new `RowRanges`.
+
+        :param ranges: The (start, stop) row ids of each run, in ascending order.
+        """
+        self.ranges = list(ranges)
+
+    def __len__(self) -> int:
+        """Return the number of row ids."""
+        return sum(stop - start for start, stop in self.ranges)
+
+    def __iter__(self) -> Iterator[int]:
+        """Generate the row ids in ascending order."""
+        for start, stop in self.ranges:
+            yield from range(start, stop)
+
+    def __contains__(self, row: object) -> bool:
+        """Return whether a row id is in one of the runs."""
+        return any(start <= row < stop for start, stop in self.ranges)  # type: ignore
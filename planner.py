@@ -0,0 +1,477 @@
+"""Plan how an `NEODatabase` evaluates the filters of a query.
+
+The `QueryPlanner` turns the collection of filters from `create_filters` into a
+`Plan`: the filters are compiled with `compile_filters` into one closed interval
+per column, the
+number of rows matching each interval is estimated from a `Histogram` of that
+column built when the database is loaded, and the cheapest access path is
+chosen - a range scan of the sorted index over the most selective column, a
+prefilter of the NEOs on their diameter and hazard flag that expands only the
+surviving NEOs' approaches, or a full scan of the table when no criterion is
+selective enough. Every other interval is checked as a residual predicate on the
+rows the access path produces.
+
+When the access path still yields many rows, the hazard criterion is answered by
+intersecting them with a precomputed `Bitmap` of hazardous (or not hazardous)
+approaches, and any diameter criterion first intersects them with the bitmap of
+approaches whose NEO has a known diameter.
+
+When the matches are ordered by a column, `QueryPlanner.order` picks between
+walking that column's sorted index until enough matches are found and keeping
+the best matches of the chosen access path in a bounded heap.
+
+With a pool of worker processes, `QueryPlanner.parallelize` replaces a plan that
+reads more rows than one worker's share of the table with a sharded full scan.
+
+Over a table split into year partitions, a full scan only reads the partitions
+whose zone maps don't rule the query out, and is costed accordingly.
+
+A `Plan` records its estimates next to the actual number of rows examined and
+matched once it has been executed, and describes itself with `explain`.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
+
+import filters as fls
+from helpers import datetime_to_str, minutes_to_datetime
+from index import Bitmap, SortedIndex
+from partitions import Partition
+from table import NEO_COLUMNS, ApproachTable
+
+# The number of buckets of a histogram. A column with at most this many distinct
+# values gets an exact count per value instead.
+_BUCKETS = 64
+
+# The columns a query can be ordered by, by the name of the ordering.
+ORDERINGS = {
+    "time": "epoch",
+    "distance": "distance",
+    "velocity": "velocity",
+    "diameter": "diameter",
+}
+
+# Rows are intersected with bitmaps when the access path yields more than one
+# row for every this many rows of the table - about one per bitmap word.
+_BITMAP_ROWS_PER_WORD = 64
+
+
+class Histogram:
+    """An equi-depth histogram of a column, for estimating interval selectivity.
+
+    The histogram keeps the values found at evenly spaced ranks of the sorted
+    column and interpolates linearly between them. A column with few distinct
+    values (such as a flag) keeps an exact count per value instead. NaN values
+    are only counted, since they match no interval.
+    """
+
+    def __init__(self, values: Sequence[Any], buckets: int = _BUCKETS) -> None:
+        """Build a histogram.
+
+        :param values: The column's values, in any order.
+        :param buckets: The number of equi-depth buckets.
+        """
+        ordered = sorted(value for value in values if value == value)
+        self.rows = len(values)
+        self.nan_count = self.rows - len(ordered)
+        self.frequencies: Dict[Any, int] | None = None
+        self.points: List[Any] = []
+        self.ranks: List[int] = []
+
+        distinct: Dict[Any, int] = {}
+        for value in ordered:
+            distinct[value] = distinct.get(value, 0) + 1
+            if len(distinct) > buckets:
+                break
+        else:
+            self.frequencies = distinct
+            return
+
+        n = len(ordered)
+        for bucket in range(buckets + 1):
+            rank = min(n - 1, n * bucket // buckets)
+            self.points.append(ordered[rank])
+            self.ranks.append(rank)
+        self.ranks[-1] = n
+
+    def _rank(self, value: Any) -> float:
+        """Estimate how many (non-NaN) values are smaller than `value`."""
+        points, ranks = self.points, self.ranks
+        if value <= points[0]:
+            return 0.0
+        if value > points[-1]:
+            return float(ranks[-1])
+        j = bisect_left(points, value)
+        low, high = points[j - 1], points[j]
+        fraction = (value - low) / (high - low) if high > low else 1.0
+        return ranks[j - 1] + fraction * (ranks[j] - ranks[j - 1])
+
+    def estimate(self, low: Any, high: Any) -> float:
+        """Estimate how many rows fall in a closed interval.
+
+        :param low: The smallest matching value, or `None` for no lower bound.
+        :param high: The largest matching value, or `None` for no upper bound.
+        :return: The estimated number of matching rows.
+        """
+        if self.frequencies is not None:
+            return float(
+                sum(
+                    count
+                    for value, count in self.frequencies.items()
+                    if (low is None or low <= value) and (high is None or value <= high)
+                )
+            )
+        if not self.points:
+            return 0.0
+        start = 0.0 if low is None else self._rank(low)
+        stop = float(self.ranks[-1]) if high is None else self._rank(high)
+        if high is not None and high >= self.points[-1]:
+            stop = float(self.ranks[-1])
+        return max(0.0, stop - start)
+
+
+def _combine(total: int, estimates: Iterable[float]) -> float:
+    """Estimate the rows matching several criteria, assuming they are independent."""
+    rows = float(total)
+    for estimate in estimates:
+        rows *= estimate / total if total else 0.0
+    return rows
+
+
+class Plan:
+    """A chosen way of evaluating a query, with estimated and actual row counts."""
+
+    def __init__(
+        self,
+        total: int,
+        compiled: fls.CompiledFilters,
+        estimates: Dict[str, float],
+        access: str | None,
+        span: Tuple[int, int],
+        bitmaps: Mapping[str, int] = {},
+        engine: str = "python",
+        ranges: Sequence[Tuple[int, int]] | None = None,
+        partitions: int = 0,
+    ) -> None:
+        """Create a new `Plan`.
+
+        :param total: The number of rows in the table.
+        :param compiled: The compiled filters of the query.
+        :param estimates: The estimated number of rows matching each interval.
+        :param access: The indexed column driving the scan, `"neo"` for a NEO
+            prefilter, or `None` for a full scan.
+        :param span: The slice of the driving index's positions to read.
+        :param bitmaps: The cardinality of each `Bitmap` that the rows are intersected with.
+        :param engine: The engine evaluating the query. The `"numpy"` engine
+            always scans the whole table, checking every interval at once, and
+            the `"parallel"` engine scans shards of it in worker processes.
+        :param ranges: The (start, stop) row ids of the partitions that a full
+            scan reads, or `None` to read every row.
+        :param partitions: The number of partitions of the table.
+        """
+        self.total = total
+        self.compiled = compiled
+        self.bounds = compiled.bounds
+        self.estimates = estimates
+        self.access = access
+        self.span = span
+        self.bitmaps = dict(bitmaps)
+        self.engine = engine
+        self.workers = 1
+        self.ranges = None if ranges is None else list(ranges)
+        self.partitions = partitions
+        covered = NEO_COLUMNS if access == "neo" else {access}
+        if self.bitmaps.keys() & {"hazardous", "not_hazardous"}:
+            covered = covered | {"hazardous"}
+        self.residuals = {
+            column: interval
+            for column, interval in self.bounds.items()
+            if column not in covered
+        }
+        self.neo_bounds = {
+            column: interval
+            for column, interval in self.bounds.items()
+            if column in NEO_COLUMNS
+        }
+
+        self.estimated_examined = float(total)
+        if self.ranges is not None:
+            self.estimated_examined = float(
+                sum(stop - start for start, stop in self.ranges)
+            )
+        if access == "neo":
+            self.estimated_examined = _combine(
+                total, (estimates[column] for column in self.neo_bounds)
+            )
+        elif access is not None:
+            self.estimated_examined = estimates.get(access, float(total))
+        if self.bitmaps:
+            self.estimated_examined = _combine(
+                total, [self.estimated_examined, *self.bitmaps.values()]
+            )
+        self.estimated_rows = _combine(total, estimates.values())
+
+        # Set by `QueryPlanner.order` when the matches are ordered by a column:
+        # "index" walks the column's sorted index, "heap" keeps the top rows of
+        # a bounded heap and "sort" sorts every match.
+        self.order_by: str | None = None
+        self.descending = False
+        self.limit: int | None = None
+        self.sort: str | None = None
+
+        # Filled in as the plan is executed.
+        self.examined = 0
+        self.matched = 0
+        self.neos_matched = 0
+
+    def explain(self) -> str:
+        """Describe the plan, its estimates, and - once executed - its actual counts."""
+
+        def interval(column: str) -> str:
+            low, high = self.bounds[column]
+            if column == "epoch":
+                low = None if low is None else datetime_to_str(minutes_to_datetime(low))
+                high = (
+                    None if high is None else datetime_to_str(minutes_to_datetime(high))
+                )
+            return (
+                f"{column} in [{'-inf' if low is None else low}, "
+                f"{'inf' if high is None else high}]"
+            )
+
+        direction = "descending" if self.descending else "ascending"
+        if self.sort == "index":
+            lines = [f"Ordered index scan on {self.access}, {direction}"]
+            if self.access in self.bounds:
+                lines[0] += f", within {interval(self.access)}"
+        elif self.engine == "numpy":
+            lines = [f"Vectorized scan of {self.total} close approaches (numpy)"]
+        elif self.engine == "parallel":
+            lines = [
+                f"Parallel scan of {self.total} close approaches "
+                f"across {self.workers} workers"
+            ]
+        elif self.access is None and self.ranges is not None:
+            lines = [
+                f"Partition scan of {len(self.ranges)} of {self.partitions} "
+                f"year partitions, pruned by their zone maps"
+            ]
+        elif self.access is None:
+            lines = [f"Full scan of {self.total} close approaches"]
+        elif self.access == "neo":
+            criteria = ", ".join(interval(column) for column in self.neo_bounds)
+            lines = [
+                f"NEO prefilter on {criteria}",
+                f"  NEOs matched: actual {self.neos_matched}",
+            ]
+        else:
+            lines = [f"Index range scan on {interval(self.access)}"]
+        for name, rows in self.bitmaps.items():
+            lines.append(f"  bitmap AND {name} ({rows} rows)")
+        lines.append(
+            f"  rows examined: estimated {self.estimated_examined:.0f}, actual {self.examined}"
+        )
+        if self.sort == "heap":
+            lines.append(f"  top-{self.limit} heap on {self.order_by}, {direction}")
+        elif self.sort == "sort":
+            lines.append(f"  sort on {self.order_by}, {direction}")
+        kind = "vectorized" if self.engine == "numpy" else "residual"
+        for column in self.residuals:
+            lines.append(
+                f"  {kind} filter {interval(column)} (estimated {self.estimates[column]:.0f} rows)"
+            )
+        lines.append(
+            f"  rows matched: estimated {self.estimated_rows:.0f}, actual {self.matched}"
+        )
+        return "\n".join(lines)
+
+
+class QueryPlanner:
+    """Choose access paths for queries over an `ApproachTable`."""
+
+    def __init__(
+        self,
+        table: ApproachTable,
+        indexes: Mapping[str, SortedIndex],
+        bitmaps: Mapping[str, Bitmap],
+        histograms: Mapping[str, Histogram] | None = None,
+        partitions: Sequence[Partition] = (),
+    ) -> None:
+        """Build the per-column histograms of a table.
+
+        :param table: The table to plan queries for.
+        :param indexes: The sorted indexes available, by column name.
+        :param bitmaps: The bitmaps of row ids available, by name.
+        :param histograms: Histograms already built over the same table, by
+            column name, to use instead of building them again.
+        :param partitions: The year partitions of the table, if it has any.
+        """
+        self.table = table
+        self.indexes = indexes
+        self.bitmaps = bitmaps
+        self.partitions = list(partitions)
+        self.histograms: Dict[str, Histogram] = {}
+        if histograms is not None:
+            self.histograms.update(histograms)
+            return
+        for column in ("epoch", "distance", "velocity", "diameter", "hazardous"):
+            values = table.column(column)
+            if column in NEO_COLUMNS:
+                values = [values[i] for i in table.neo_index]
+            self.histograms[column] = Histogram(values)
+
+    def plan(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters,
+        engine: str = "python",
+    ) -> Plan:
+        """Plan a query.
+
+        :param filters: A collection of filters, as returned by `create_filters`.
+        :param engine: The engine that will evaluate the query.
+        :return: The cheapest `Plan` for these filters.
+        """
+        compiled = fls.compile_filters(filters)
+        bounds = compiled.bounds
+        estimates = {
+            column: self.histograms[column].estimate(*interval)
+            for column, interval in bounds.items()
+        }
+        if engine == "numpy":
+            # A vectorized scan checks every interval over every row in one pass.
+            return Plan(
+                len(self.table),
+                compiled,
+                estimates,
+                None,
+                (0, len(self.table)),
+                engine=engine,
+            )
+        # A full scan only reads the partitions that the zone maps can't rule out.
+        ranges = None
+        cost = float(len(self.table))
+        if self.partitions:
+            kept = [
+                (partition.start, partition.stop)
+                for partition in self.partitions
+                if partition.may_match(bounds)
+            ]
+            if len(kept) < len(self.partitions):
+                ranges = kept
+                cost = float(sum(stop - start for start, stop in kept))
+
+        access = None
+        for column in bounds:
+            if column in self.indexes and estimates[column] < cost:
+                access, cost = column, estimates[column]
+
+        # A NEO prefilter evaluates the NEO criteria once per NEO, then reads
+        # the approaches of the surviving NEOs.
+        neo_columns = [column for column in bounds if column in NEO_COLUMNS]
+        if neo_columns:
+            neo_cost = len(self.table.neos) + _combine(
+                len(self.table), (estimates[column] for column in neo_columns)
+            )
+            if neo_cost < cost:
+                access, cost = "neo", neo_cost
+
+        span = (0, len(self.table))
+        if access is not None and access != "neo":
+            span = self.indexes[access].span(*bounds[access])
+
+        # Intersecting bitmaps costs a pass over their machine words, which only
+        # pays off when the access path yields many rows.
+        bitmaps: Dict[str, int] = {}
+        if access != "neo" and cost * _BITMAP_ROWS_PER_WORD > len(self.table):
+            if "hazardous" in bounds and bounds["hazardous"][0] in (True, False):
+                name = "hazardous" if bounds["hazardous"][0] else "not_hazardous"
+                bitmaps[name] = len(self.bitmaps[name])
+            if "diameter" in bounds:
+                bitmaps["diameter_known"] = len(self.bitmaps["diameter_known"])
+        return Plan(
+            len(self.table),
+            compiled,
+            estimates,
+            access,
+            span,
+            bitmaps,
+            ranges=ranges if access is None else None,
+            partitions=len(self.partitions),
+        )
+
+    def order(
+        self,
+        plan: Plan,
+        order_by: str,
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> Plan:
+        """Plan the ordering of a query's matches by a column.
+
+        A small `limit` is served by walking the sorted index over the ordering
+        column from the end that comes first, stopping at the `limit`-th match,
+        when the matches are expected to be dense enough along the index for the
+        walk to beat the plan's own access path. Otherwise, the matches found by
+        the access path are kept in a bounded heap of `limit` rows, or sorted in
+        full without a limit.
+
+        :param plan: The `Plan` of the query, from `plan`.
+        :param order_by: One of the keys of `ORDERINGS`.
+        :param descending: Whether larger values come first.
+        :param limit: The number of leading matches wanted, or `None` for all.
+        :return: A `Plan` producing the matches in order.
+        """
+        column = ORDERINGS[order_by]
+        if limit and plan.engine == "python" and column in self.indexes:
+            start, stop = self.indexes[column].span(
+                *plan.bounds.get(column, (None, None))
+            )
+            # Matches are assumed to be spread evenly along the index.
+            walk = float(stop - start)
+            if plan.estimated_rows >= 1:
+                walk = min(walk, limit * walk / plan.estimated_rows)
+            if walk < plan.estimated_examined:
+                plan = Plan(
+                    plan.total, plan.compiled, plan.estimates, column, (start, stop)
+                )
+                plan.estimated_examined = walk
+                plan.sort = "index"
+        if plan.sort is None:
+            plan.sort = "heap" if limit and plan.engine == "python" else "sort"
+        plan.order_by = order_by
+        plan.descending = descending
+        plan.limit = limit or None
+        return plan
+
+    def parallelize(self, plan: Plan, workers: int) -> Plan:
+        """Plan a query as a scan of the table's shards across worker processes.
+
+        Every worker checks each interval over its share of the rows, so a
+        sharded scan only replaces an access path expected to read more rows
+        than that share. Ordered index walks are kept, as they stop early.
+
+        :param plan: The `Plan` of the query, from `plan` or `order`.
+        :param workers: The number of worker processes.
+        :return: A `Plan` for the pool, or the original plan.
+        """
+        if (
+            workers <= 1
+            or plan.engine != "python"
+            or plan.sort == "index"
+            or plan.estimated_examined * workers <= plan.total
+        ):
+            return plan
+        parallel = Plan(
+            plan.total,
+            plan.compiled,
+            plan.estimates,
+            None,
+            (0, plan.total),
+            engine="parallel",
+        )
+        parallel.workers = workers
+        parallel.order_by = plan.order_by
+        parallel.descending = plan.descending
+        parallel.limit = plan.limit
+        parallel.sort = plan.sort
+        return parallel
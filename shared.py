@@ -0,0 +1,246 @@
+"""Share one copy of an `NEODatabase` between processes through shared memory.
+
+`NEODatabase.share` copies everything a query reads into one
+`multiprocessing.shared_memory` segment: the approach columns of the database's
+`ApproachTable`, the row ids and values of its sorted indexes, and a pickled
+manifest holding the NEOs' names, bitmaps and planner histograms, which are small next
+to the columns. `attach_database` maps the segment into another process and
+builds an `NEODatabase` over `memoryview`s of the columns and indexes, so that
+attaching neither copies nor sorts any per-approach data. Only the NEOs and the
+manifest are unpickled, and close approaches are created as queries yield them.
+
+The segment is laid out as a fixed header giving the position and length of the
+manifest, then each array at an 8-byte aligned offset, then the manifest:
+
+    | header | epochs | distances | ... | index keys | manifest |
+
+The process that exports a database owns its segment and unlinks it when the
+returned `SharedDatabase` is closed; attached processes only unmap it. A
+segment must outlive the processes attached to it, and an attached database
+must not be used once its `SharedDatabase` is closed.
+
+Before Python 3.13, every process that attaches to a segment registers it with
+the resource tracker of its process tree, which unlinks the segments still
+registered when the tree exits. Worker processes started with `multiprocessing`
+share the tracker of the process that exported the database, so this only
+matters for unrelated processes, which must outlive the others.
+"""
+
+import pickle
+import struct
+from multiprocessing import shared_memory
+from typing import Any, Dict, List, Mapping, Sequence, Tuple
+
+from database import NEODatabase
+from index import Bitmap, SortedIndex
+from models import CloseApproach, NearEarthObject
+from planner import Histogram
+from table import ApproachTable
+
+# Bump whenever the layout of a segment changes.
+SHARED_VERSION = 1
+
+# The header holds the layout version, and the offset and length of the manifest.
+_HEADER = struct.Struct("<QQQ")
+_ALIGNMENT = 8
+
+
+class SharedDatabase:
+    """A shared memory segment holding a database, and the database over it."""
+
+    def __init__(
+        self,
+        segment: shared_memory.SharedMemory,
+        owner: bool,
+        database: NEODatabase | None = None,
+        views: Sequence[memoryview] = (),
+    ) -> None:
+        """Wrap a segment created by `export_database` or opened by `attach_database`.
+
+        :param segment: The shared memory segment.
+        :param owner: Whether closing should also unlink the segment.
+        :param database: The database attached to the segment, if any.
+        :param views: The memoryviews of the segment held by the database.
+        """
+        self.segment = segment
+        self.owner = owner
+        self.database = database
+        self._views = list(views)
+
+    @property
+    def name(self) -> str:
+        """Return the name that other processes attach to."""
+        return self.segment.name
+
+    def close(self) -> None:
+        """Release the segment, unlinking it if this process exported it."""
+        self.database = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self.segment.close()
+        if self.owner:
+            self.segment.unlink()
+            self.owner = False
+
+    def __enter__(self) -> "SharedDatabase":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+def export_database(
+    table: ApproachTable,
+    indexes: Mapping[str, SortedIndex],
+    bitmaps: Mapping[str, Bitmap],
+    histograms: Mapping[str, Histogram],
+    name: str | None = None,
+) -> SharedDatabase:
+    """Copy the parts of a database into a new shared memory segment.
+
+    This is the implementation of `NEODatabase.share`.
+
+    :param table: The database's table.
+    :param indexes: The database's sorted indexes, by column.
+    :param bitmaps: The database's bitmaps, by name.
+    :param histograms: The database's planner histograms, by column.
+    :param name: The name of the segment; a random one if None.
+    :return: The owning `SharedDatabase`.
+    """
+    arrays: Dict[str, Any] = {
+        "epochs": table.epochs,
+        "distances": table.distances,
+        "velocities": table.velocities,
+        "neo_index": table.neo_index,
+        "diameters": table.diameters,
+        "hazardous": table.hazardous,
+    }
+    for column, index in indexes.items():
+        arrays[f"{column}.rows"] = index.rows
+        arrays[f"{column}.keys"] = index.keys
+
+    # Approaches without an NEO can't be recreated from the columns alone.
+    unlinked = len(table.neos)
+    orphans = {
+        row: (
+            approach._designation,
+            approach.time,
+            approach.distance,
+            approach.velocity,
+        )
+        for row, position in enumerate(table.neo_index)
+        if position == unlinked and (approach := table.rows.get(row)) is not None
+    }
+
+    layout: Dict[str, Tuple[str, int, int]] = {}
+    offset = _HEADER.size
+    for key, values in arrays.items():
+        offset = -(-offset // _ALIGNMENT) * _ALIGNMENT
+        view = memoryview(values)
+        layout[key] = (view.format, offset, view.nbytes)
+        offset += view.nbytes
+        view.release()
+    manifest = pickle.dumps(
+        {
+            "layout": layout,
+            "designations": [neo.designation for neo in table.neos],
+            "names": [neo.name for neo in table.neos],
+            "orphans": orphans,
+            "bitmaps": {
+                key: (bitmap.bits, bitmap.size) for key, bitmap in bitmaps.items()
+            },
+            "histograms": dict(histograms),
+        },
+        protocol=pickle.HIGHEST_PROTOCOL,
+    )
+
+    segment = shared_memory.SharedMemory(
+        name=name, create=True, size=offset + len(manifest)
+    )
+    try:
+        buffer = segment.buf
+        assert buffer is not None
+        _HEADER.pack_into(buffer, 0, SHARED_VERSION, offset, len(manifest))
+        for key, values in arrays.items():
+            _, start, nbytes = layout[key]
+            buffer[start : start + nbytes] = memoryview(values).cast("B")
+        buffer[offset : offset + len(manifest)] = manifest
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    return SharedDatabase(segment, owner=True)
+
+
+def attach_database(name: str, engine: str = "python") -> SharedDatabase:
+    """Attach to a database exported by another process, without copying it.
+
+    :param name: The name of the segment, from `SharedDatabase.name`.
+    :param engine: The query engine to use, one of `database.ENGINES`.
+    :return: A `SharedDatabase` whose `database` reads the shared segment.
+    :raises ValueError: If the segment wasn't written by this version of `share`.
+    """
+    try:
+        # Only the exporting process should unlink the segment.
+        segment = shared_memory.SharedMemory(name=name, track=False)  # type: ignore
+    except TypeError:
+        # Python before 3.13 always tracks the segment; see the module docstring.
+        segment = shared_memory.SharedMemory(name=name)
+
+    views: List[memoryview] = []
+    try:
+        buffer = segment.buf
+        assert buffer is not None
+        version, offset, length = _HEADER.unpack_from(buffer, 0)
+        if version != SHARED_VERSION:
+            raise ValueError(
+                f"Shared database {name!r} has layout version {version}, "
+                f"expected {SHARED_VERSION}."
+            )
+        manifest = pickle.loads(buffer[offset : offset + length])
+
+        columns: Dict[str, memoryview] = {}
+        for key, (typecode, start, nbytes) in manifest["layout"].items():
+            raw = buffer[start : start + nbytes]
+            columns[key] = raw.cast(typecode)
+            views += [raw, columns[key]]
+
+        diameters, hazardous = columns["diameters"], columns["hazardous"]
+        neos = [
+            NearEarthObject.from_values(
+                designation, name, diameters[i], hazardous[i] == 1
+            )
+            for i, (designation, name) in enumerate(
+                zip(manifest["designations"], manifest["names"])
+            )
+        ]
+        table = ApproachTable(
+            neos,
+            columns["epochs"],  # type: ignore
+            columns["distances"],  # type: ignore
+            columns["velocities"],  # type: ignore
+            columns["neo_index"],  # type: ignore
+            diameters=diameters,  # type: ignore
+            hazardous=hazardous,  # type: ignore
+        )
+        for row, values in manifest["orphans"].items():
+            table.rows[row] = CloseApproach.from_values(*values)
+        indexes = {
+            column: SortedIndex.from_sorted(
+                columns[f"{column}.rows"], columns[f"{column}.keys"]
+            )
+            for column in ("neo", "epoch", "distance", "velocity")
+        }
+        bitmaps = {
+            key: Bitmap(bits, size) for key, (bits, size) in manifest["bitmaps"].items()
+        }
+        database = NEODatabase.from_table(
+            table, engine, indexes, bitmaps, manifest["histograms"]
+        )
+    except BaseException:
+        for view in reversed(views):
+            view.release()
+        segment.close()
+        raise
+    return SharedDatabase(segment, owner=False, database=database, views=views)
@@ -0,0 +1,225 @@
+"""Persist a fully linked `NEODatabase` on disk between runs of the main module.
+
+Building an `NEODatabase` means parsing both data files and linking every
+close approach to its NEO, which dominates the cost of a short command such as
+`inspect`. The `load_database` function stores the linked database as a pickled
+snapshot and reuses it on later runs for as long as the data files are
+unchanged. The database is built over an `ApproachTable` streamed from the
+close approach file, so neither it nor its snapshot holds a `CloseApproach`
+object per row: rows are materialized when a query yields them, and an NEO's
+approaches when the NEO is looked up or one of them is yielded.
+
+A snapshot records a fingerprint of each source file - its size, modification
+time and SHA-256 content hash. A snapshot is stale as soon as a size differs. A
+changed modification time alone only triggers a rehash, so touching a file
+without editing it doesn't force a rebuild, and the snapshot then records the
+new time so that later runs don't hash the file again.
+"""
+
+import gc
+import hashlib
+import os
+import pathlib
+import pickle
+import shutil
+from typing import Any, BinaryIO, Callable, Dict, List
+
+from database import NEODatabase
+from extract import iter_approaches, load_neos
+from table import ApproachTable
+
+# Bump whenever the pickled layout of the models or the database changes.
+SNAPSHOT_VERSION = 13
+
+DEFAULT_CACHE_DIR = pathlib.Path(__file__).parent.resolve() / ".cache" / "snapshots"
+
+_HASH_BLOCK_SIZE = 1 << 20
+
+
+def _hash_file(path: pathlib.Path) -> str:
+    """Return the hex SHA-256 digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        for block in iter(lambda: infile.read(_HASH_BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def fingerprint(path: str | os.PathLike) -> Dict[str, Any]:
+    """Describe a source file by its resolved path, size, modification time and hash.
+
+    :param path: A path to a data file.
+    :return: A dictionary that identifies the current contents of the file.
+    """
+    resolved = pathlib.Path(path).resolve()
+    stat = resolved.stat()
+    return {
+        "path": str(resolved),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": _hash_file(resolved),
+    }
+
+
+def is_fresh(recorded: Dict[str, Any]) -> bool:
+    """Return whether a recorded fingerprint still describes its file.
+
+    If only the file's modification time changed and its contents still match,
+    the new time is set in `recorded`, for the caller to store.
+
+    :param recorded: A fingerprint returned by `fingerprint`.
+    :return: Whether the file still has the same size and contents.
+    """
+    path = pathlib.Path(recorded["path"])
+    try:
+        stat = path.stat()
+    except OSError:
+        return False
+    if stat.st_size != recorded["size"]:
+        return False
+    if stat.st_mtime_ns == recorded["mtime_ns"]:
+        return True
+    if _hash_file(path) != recorded["sha256"]:
+        return False
+    recorded["mtime_ns"] = stat.st_mtime_ns
+    return True
+
+
+def snapshot_path(
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+    cache_dir: str | os.PathLike = DEFAULT_CACHE_DIR,
+) -> pathlib.Path:
+    """Return the location of the snapshot built from a pair of data files.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param cache_dir: The directory holding snapshots.
+    :return: The path of the snapshot file for these sources.
+    """
+    sources = f"{pathlib.Path(neo_csv_path).resolve()}\0{pathlib.Path(cad_json_path).resolve()}"
+    key = hashlib.sha1(sources.encode()).hexdigest()[:16]
+    return pathlib.Path(cache_dir) / f"neodb-{key}.pickle"
+
+
+def read_snapshot(path: pathlib.Path) -> NEODatabase | None:
+    """Load a database from a snapshot file if it is current.
+
+    :param path: The path of the snapshot file.
+    :return: The stored `NEODatabase`, or `None` if the snapshot is missing or stale.
+    """
+    try:
+        infile = open(path, "rb")
+    except OSError:
+        return None
+    with infile:
+        try:
+            header = pickle.load(infile)
+        except Exception:
+            return None
+        if header.get("version") != SNAPSHOT_VERSION:
+            return None
+        sources: List[Dict[str, Any]] = header["sources"]
+        mtimes = [recorded["mtime_ns"] for recorded in sources]
+        if not all(is_fresh(recorded) for recorded in sources):
+            return None
+        offset = infile.tell()
+        # The database is a large graph of small objects; collecting while
+        # unpickling it only walks objects that can't be garbage yet.
+        gc.disable()
+        try:
+            database = pickle.load(infile)
+        except Exception:
+            return None
+        finally:
+            gc.enable()
+        if mtimes != [recorded["mtime_ns"] for recorded in sources]:
+            infile.seek(offset)
+            try:
+                _store(
+                    path, header, lambda outfile: shutil.copyfileobj(infile, outfile)
+                )
+            except OSError:
+                # A read-only cache directory only costs the rehash next time.
+                pass
+    return database
+
+
+def _store(
+    path: pathlib.Path, header: Dict[str, Any], write: Callable[[BinaryIO], Any]
+) -> None:
+    """Write a snapshot file from its header and a function that writes its body.
+
+    The file is written next to its final location and moved into place, so a
+    concurrent reader never observes a partial snapshot.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as outfile:
+            pickle.dump(header, outfile, protocol=pickle.HIGHEST_PROTOCOL)
+            write(outfile)
+        os.replace(tmp_path, path)
+    finally:
+        tmp_path.unlink(missing_ok=True)
+
+
+def write_snapshot(
+    database: NEODatabase,
+    path: pathlib.Path,
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+) -> None:
+    """Store a database in a snapshot file, together with fingerprints of its sources.
+
+    :param database: The linked `NEODatabase` to store.
+    :param path: The path of the snapshot file.
+    :param neo_csv_path: A path to the CSV file the database was built from.
+    :param cad_json_path: A path to the JSON file the database was built from.
+    """
+    header = {
+        "version": SNAPSHOT_VERSION,
+        "sources": [fingerprint(neo_csv_path), fingerprint(cad_json_path)],
+    }
+    _store(
+        path,
+        header,
+        lambda outfile: pickle.dump(
+            database, outfile, protocol=pickle.HIGHEST_PROTOCOL
+        ),
+    )
+
+
+def load_database(
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+    cache_dir: str | os.PathLike = DEFAULT_CACHE_DIR,
+    use_cache: bool = True,
+    rebuild: bool = False,
+) -> NEODatabase:
+    """Build an `NEODatabase` from the data files, reusing a snapshot when possible.
+
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param cache_dir: The directory holding snapshots.
+    :param use_cache: Whether to read and write snapshots at all.
+    :param rebuild: Whether to ignore an existing snapshot and write a fresh one.
+    :return: A linked `NEODatabase`.
+    """
+    path = snapshot_path(neo_csv_path, cad_json_path, cache_dir)
+    if use_cache and not rebuild:
+        database = read_snapshot(path)
+        if database is not None:
+            return database
+
+    neos = load_neos(neo_csv_path)
+    table = ApproachTable.from_stream(neos, iter_approaches(cad_json_path))
+    database = NEODatabase.from_table(table)
+    database.layout = f"snapshot-{SNAPSHOT_VERSION}"
+    if use_cache:
+        try:
+            write_snapshot(database, path, neo_csv_path, cad_json_path)
+        except OSError:
+            # A read-only cache directory only costs the speedup.
+            pass
+    return database
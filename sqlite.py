@@ -0,0 +1,707 @@
+"""Store NEOs and close approaches in an SQLite file, and query them with SQL.
+
+A `SQLiteDatabase` answers the same lookups and queries as an `NEODatabase`, but
+keeps its data in a local SQLite database - in memory, or in a file that later
+runs reopen instead of reading the data files. The `neos` and `approaches`
+tables are indexed on every column a criterion can constrain, and `ANALYZE`
+gives SQLite's planner the statistics to choose between those indexes.
+
+Each query compiles its `create_filters` criteria with `compile_filters` - so it
+matches exactly the close approaches an `NEODatabase` would - and pushes the
+resulting intervals down into the `WHERE` clause of a single parameterized
+`SELECT`, along with any ordering, limit and offset. Matching rows are read back
+through the cursor as the query is iterated, and become `CloseApproach` objects
+one at a time. Row ids are the positions of the close approaches in the data
+files, as in an `NEODatabase`, and unordered matches - like the ties of ordered
+ones - come out in row order.
+
+A database file records the version of its schema and fingerprints of the data
+files it was built from. `load_sqlite` reopens a file that is current with the
+data files, which reads no NEO or close approach up front: they are only created
+when a lookup or a query returns them.
+"""
+
+import contextlib
+import json
+import math
+import os
+import pathlib
+import sqlite3
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Sequence, Tuple
+
+import filters as fls
+from aggregate import GROUPINGS, parse_metric
+from extract import load_approaches, load_neos
+from helpers import datetime_to_minutes, minutes_to_datetime
+from models import CloseApproach, NearEarthObject
+from names import NameIndex
+from planner import ORDERINGS
+from snapshot import fingerprint, is_fresh
+
+# The name of the engine that selects a `SQLiteDatabase` at the command line.
+ENGINE = "sqlite"
+
+# Bump whenever the schema changes.
+SCHEMA_VERSION = 1
+
+_SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+CREATE TABLE neos (
+    id INTEGER PRIMARY KEY,
+    designation TEXT NOT NULL,
+    name TEXT,
+    diameter REAL,
+    hazardous INTEGER NOT NULL
+);
+CREATE TABLE approaches (
+    id INTEGER PRIMARY KEY,
+    designation TEXT NOT NULL,
+    neo_id INTEGER REFERENCES neos (id),
+    epoch INTEGER NOT NULL,
+    distance REAL NOT NULL,
+    velocity REAL NOT NULL
+);
+"""
+
+# The indexes are created once the rows are in, which is faster than updating
+# them row by row.
+_INDEXES = """
+CREATE UNIQUE INDEX neos_designation ON neos (designation);
+CREATE INDEX neos_name ON neos (name);
+CREATE INDEX neos_diameter ON neos (diameter);
+CREATE INDEX approaches_neo ON approaches (neo_id);
+CREATE INDEX approaches_epoch ON approaches (epoch);
+CREATE INDEX approaches_distance ON approaches (distance);
+CREATE INDEX approaches_velocity ON approaches (velocity);
+ANALYZE;
+"""
+
+# Every query reads the approaches with their NEO, if any. An unlinked approach
+# joins no NEO, so its diameter and hazard flag are NULL, which - like the
+# sentinel entries of an `ApproachTable` - match no criterion.
+_SOURCE = "FROM approaches AS a LEFT JOIN neos AS n ON n.id = a.neo_id"
+
+# The SQL expression of each column of `CompiledFilters.bounds`.
+_COLUMNS = {
+    "epoch": "a.epoch",
+    "distance": "a.distance",
+    "velocity": "a.velocity",
+    "diameter": "n.diameter",
+    "hazardous": "n.hazardous",
+}
+
+# The columns that a close approach and its NEO are created from.
+_NEO_COLUMNS = "n.id, n.designation, n.name, n.diameter, n.hazardous"
+_APPROACH_COLUMNS = (
+    f"a.id, a.designation, a.epoch, a.distance, a.velocity, {_NEO_COLUMNS}"
+)
+
+# The SQL expressions of the groups and metric functions of `aggregate`.
+_GROUP_KEYS = {
+    "year": "CAST(strftime('%Y', a.epoch * 60, 'unixepoch') AS INTEGER)",
+    "month": "strftime('%Y-%m', a.epoch * 60, 'unixepoch')",
+    "neo": "n.designation",
+    "hazardous": "n.hazardous",
+}
+_FUNCTIONS = {"min": "MIN", "max": "MAX", "mean": "AVG", "sum": "SUM"}
+
+
+def _where(bounds: Mapping[str, Tuple[Any, Any]]) -> Tuple[str, List[Any]]:
+    """Translate the intervals of compiled filters into a parameterized WHERE clause."""
+    terms = []
+    parameters: List[Any] = []
+    for column, (low, high) in bounds.items():
+        expression = _COLUMNS[column]
+        if low is not None and low == high:
+            terms.append(f"{expression} = ?")
+            parameters.append(low)
+        elif low is not None and high is not None:
+            terms.append(f"{expression} BETWEEN ? AND ?")
+            parameters.extend((low, high))
+        elif low is not None:
+            terms.append(f"{expression} >= ?")
+            parameters.append(low)
+        elif high is not None:
+            terms.append(f"{expression} <= ?")
+            parameters.append(high)
+    if not terms:
+        return "", parameters
+    return f" WHERE {' AND '.join(terms)}", parameters
+
+
+def _order(order_by: str | None, descending: bool, where: str) -> str:
+    """Return the ORDER BY clause of a query, keeping unordered matches and ties in row order."""
+    if order_by is None:
+        # Without STAT4 histograms, SQLite can't tell a selective range from a
+        # broad one, and would rather scan every row in row order than sort
+        # the matches of an index. The unary plus hides that the rowid scan
+        # is already in order, so a WHERE clause is driven from an index.
+        return " ORDER BY +a.id" if where else " ORDER BY a.id"
+    direction = " DESC" if descending else ""
+    column = ORDERINGS[order_by]
+    expression = _COLUMNS[column]
+    # Approaches of NEOs without a known diameter come last in either direction.
+    nulls = f"{expression} IS NULL, " if column == "diameter" else ""
+    return f" ORDER BY {nulls}{expression}{direction}, a.id{direction}"
+
+
+class SQLPlan:
+    """The SQL statement of a query, with SQLite's plan for it and its actual row count."""
+
+    def __init__(
+        self,
+        compiled: fls.CompiledFilters,
+        where: str,
+        parameters: Sequence[Any],
+        order: str,
+        steps: Sequence[str] = (),
+    ) -> None:
+        """Create a new `SQLPlan`.
+
+        :param compiled: The compiled filters of the query.
+        :param where: The WHERE clause of the statement, if any.
+        :param parameters: The values of the WHERE clause's parameters.
+        :param order: The ORDER BY clause of the statement.
+        :param steps: SQLite's description of how it evaluates the statement.
+        """
+        self.compiled = compiled
+        self.bounds = compiled.bounds
+        self.where = where
+        self.parameters = list(parameters)
+        self.order = order
+        self.steps = list(steps)
+        self.matched = 0
+
+    @property
+    def sql(self) -> str:
+        """Return the statement selecting the ids of the matching rows."""
+        return f"SELECT a.id {_SOURCE}{self.where}{self.order}"
+
+    def explain(self) -> str:
+        """Describe the statement, SQLite's plan, and - once executed - the actual count."""
+        lines = [f"SQLite query: {self.sql}"]
+        if self.parameters:
+            lines.append(f"  parameters: {self.parameters}")
+        lines.extend(f"  {step}" for step in self.steps)
+        lines.append(f"  rows matched: actual {self.matched}")
+        return "\n".join(lines)
+
+
+class SQLiteDatabase:
+    """A database of near-Earth objects and their close approaches, stored in SQLite.
+
+    It provides the lookups, queries, counts and aggregates of an `NEODatabase`,
+    each evaluated by SQLite.
+    """
+
+    # Identifies the storage that the rows come from; see `NEODatabase.layout`.
+    layout = f"{ENGINE}-{SCHEMA_VERSION}"
+
+    def __init__(
+        self,
+        neos: List[NearEarthObject],
+        approaches: List[CloseApproach],
+        path: str | os.PathLike = ":memory:",
+        sources: Sequence[Dict[str, Any]] = (),
+    ) -> None:
+        """Create a new `SQLiteDatabase`, linking NEOs and approaches and storing them.
+
+        The NEOs and close approaches are linked as by the `NEODatabase`
+        constructor, and the database generates these very objects.
+
+        A database file is written next to `path` and then moved into place,
+        replacing any existing file, so a concurrent reader never observes a
+        partial database.
+
+        :param neos: A collection of `NearEarthObject`s.
+        :param approaches: A collection of `CloseApproach`es.
+        :param path: The database file to write, or ":memory:" to keep it in memory.
+        :param sources: Fingerprints of the data files the objects were read from.
+        """
+        neos_by_designation = {neo.designation: neo for neo in neos}
+        for approach in approaches:
+            neo = neos_by_designation.get(approach._designation)
+            if neo:
+                neo.approaches.append(approach)
+                approach.neo = neo
+
+        if str(path) == ":memory:":
+            self._connection = sqlite3.connect(":memory:")
+            _write(self._connection, neos, approaches, sources)
+        else:
+            path = pathlib.Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+            tmp_path.unlink(missing_ok=True)
+            try:
+                with contextlib.closing(sqlite3.connect(tmp_path)) as connection:
+                    _write(connection, neos, approaches, sources)
+                os.replace(tmp_path, path)
+            finally:
+                tmp_path.unlink(missing_ok=True)
+            self._connection = _connect(path)
+
+        self._neos: Dict[int, NearEarthObject] = dict(enumerate(neos))
+        self._rows: Dict[int, CloseApproach] = dict(enumerate(approaches))
+        self._linked = set(self._neos)
+        self._name_indexes: Dict[str, NameIndex] = {}
+
+    @classmethod
+    def open(cls, path: str | os.PathLike) -> "SQLiteDatabase":
+        """Open a database file, read-only, without reading any of its rows.
+
+        :param path: A file written by the `SQLiteDatabase` constructor.
+        :return: The database stored in the file.
+        :raises ValueError: If the file is missing, isn't a database, or was
+            written with another schema.
+        """
+        version = None
+        try:
+            connection = _connect(path)
+        except sqlite3.Error:
+            connection = None
+        if connection is not None:
+            try:
+                version = _meta(connection).get("version")
+            except sqlite3.Error:
+                pass
+        if connection is None or version != str(SCHEMA_VERSION):
+            if connection is not None:
+                connection.close()
+            raise ValueError(f"{path} doesn't hold an NEO database of this version.")
+        database = cls.__new__(cls)
+        database._connection = connection
+        database._neos = {}
+        database._rows = {}
+        database._linked = set()
+        database._name_indexes = {}
+        return database
+
+    def close(self) -> None:
+        """Close the connection to the database."""
+        self._connection.close()
+
+    @property
+    def engine(self) -> str:
+        """Return the name of the engine that evaluates queries."""
+        return ENGINE
+
+    def use_engine(self, engine: str) -> None:
+        """Check the engine chosen for queries, which can only be SQLite's own.
+
+        :param engine: The name of the engine.
+        :raises ValueError: If the engine isn't `ENGINE`.
+        """
+        if engine != ENGINE:
+            raise ValueError(
+                f"A SQLite database evaluates queries with the {ENGINE!r} engine, "
+                f"not {engine!r}."
+            )
+
+    def use_workers(self, workers: int, ordered: bool = True) -> None:
+        """Check the number of worker processes, which can only be one.
+
+        :param workers: The number of worker processes.
+        :param ordered: Ignored; the matches always come out in order.
+        :raises ValueError: If more than one worker is asked for.
+        """
+        if workers != 1:
+            raise ValueError("A SQLite database is queried by a single process.")
+
+    def _neo(self, row: Sequence[Any]) -> NearEarthObject:
+        """Return the NEO of a row of `_NEO_COLUMNS`, creating it on first use."""
+        neo_id, designation, name, diameter, hazardous = row
+        neo = self._neos.get(neo_id)
+        if neo is None:
+            neo = NearEarthObject.from_values(
+                designation,
+                name,
+                math.nan if diameter is None else diameter,
+                bool(hazardous),
+            )
+            self._neos[neo_id] = neo
+        return neo
+
+    def _approach(self, row: Sequence[Any]) -> CloseApproach:
+        """Return the close approach of a row of `_APPROACH_COLUMNS`, creating it on first use."""
+        approach = self._rows.get(row[0])
+        if approach is None:
+            row_id, designation, epoch, distance, velocity = row[:5]
+            approach = CloseApproach.from_values(
+                designation,
+                minutes_to_datetime(epoch),
+                distance,
+                velocity,
+                None if row[5] is None else self._neo(row[5:]),
+            )
+            self._rows[row_id] = approach
+        return approach
+
+    def _lookup(self, column: str, value: str) -> NearEarthObject | None:
+        """Find an NEO by designation or name, and fill in its approaches."""
+        row = self._connection.execute(
+            f"SELECT {_NEO_COLUMNS} FROM neos AS n WHERE n.{column} = ?", (value,)
+        ).fetchone()
+        if row is None:
+            return None
+        neo = self._neo(row)
+        if row[0] not in self._linked:
+            cursor = self._connection.execute(
+                f"SELECT {_APPROACH_COLUMNS} {_SOURCE} WHERE a.neo_id = ? ORDER BY a.id",
+                (row[0],),
+            )
+            neo.approaches = [self._approach(approach) for approach in cursor]
+            self._linked.add(row[0])
+        return neo
+
+    def get_neo_by_designation(self, designation: str) -> NearEarthObject | None:
+        """Find and return an NEO by its primary designation, or `None`.
+
+        :param designation: The primary designation of the NEO to search for.
+        :return: The `NearEarthObject` with the desired primary designation, or `None`.
+        """
+        return self._lookup("designation", designation)
+
+    def get_neo_by_name(self, name: str) -> NearEarthObject | None:
+        """Find and return an NEO by its name, or `None`.
+
+        :param name: The name, as a string, of the NEO to search for.
+        :return: The `NearEarthObject` with the desired name, or `None`.
+        """
+        return self._lookup("name", name)
+
+    def _name_index(self, kind: str) -> NameIndex:
+        """Return the index of NEO names or designations, building it on first use."""
+        if kind not in self._name_indexes:
+            if kind not in ("name", "designation"):
+                raise ValueError(
+                    f"Unknown kind {kind!r}; expected 'name' or 'designation'."
+                )
+            cursor = self._connection.execute(
+                f"SELECT {kind} FROM neos WHERE {kind} IS NOT NULL"
+            )
+            self._name_indexes[kind] = NameIndex(value for value, in cursor)
+        return self._name_indexes[kind]
+
+    def complete(
+        self, prefix: str, kind: str = "name", limit: int | None = None
+    ) -> List[str]:
+        """List the NEO names or designations that start with a prefix, ignoring case.
+
+        :param prefix: The start of a name or designation.
+        :param kind: Either 'name' or 'designation'.
+        :param limit: The maximum number of completions, or `None` for all.
+        :return: The matching names or designations, in alphabetical order.
+        """
+        return self._name_index(kind).prefix(prefix, limit)
+
+    def suggest(self, text: str, kind: str = "name", limit: int = 5) -> List[str]:
+        """Suggest the NEO names or designations closest to a possibly misspelled one.
+
+        :param text: A name or designation that may be misspelled.
+        :param kind: Either 'name' or 'designation'.
+        :param limit: The maximum number of suggestions.
+        :return: Up to `limit` names or designations, nearest first.
+        """
+        return self._name_index(kind).suggest(text, limit=limit)
+
+    def plan(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        order_by: str | None = None,
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> SQLPlan:
+        """Translate a query into SQL, without evaluating it.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param order_by: One of 'time', 'distance', 'velocity' and 'diameter', or
+            `None` for internal order.
+        :param descending: Whether to generate larger values first.
+        :param limit: Unused; SQLite stops at the limit given to `execute`.
+        :return: The `SQLPlan` that `query` would execute for these filters.
+        """
+        compiled = fls.compile_filters(filters)
+        parameters: List[Any]
+        if compiled.empty:
+            where, parameters = " WHERE 0", []
+        else:
+            where, parameters = _where(compiled.bounds)
+        order = _order(order_by, descending, where)
+        steps = [
+            detail
+            for *_, detail in self._connection.execute(
+                f"EXPLAIN QUERY PLAN SELECT a.id {_SOURCE}{where}{order}", parameters
+            )
+        ]
+        return SQLPlan(compiled, where, parameters, order, steps)
+
+    def _select(
+        self, plan: SQLPlan, columns: str, limit: int | None, offset: int
+    ) -> Iterator[Tuple]:
+        """Run a plan's statement for some columns, generating rows from the cursor."""
+        cursor = self._connection.execute(
+            f"SELECT {columns} {_SOURCE}{plan.where}{plan.order} LIMIT ? OFFSET ?",
+            [*plan.parameters, limit or -1, offset],
+        )
+        for row in cursor:
+            plan.matched += 1
+            yield row
+
+    def execute(
+        self, plan: SQLPlan, limit: int | None = None, offset: int = 0
+    ) -> Iterator[int]:
+        """Execute a plan to generate the row ids of matching close approaches.
+
+        :param plan: A `SQLPlan` from `plan`.
+        :param limit: The maximum number of row ids to generate; 0 or None for all.
+        :param offset: The number of matching rows to skip first.
+        :yield: The ids of matching rows, in the plan's order.
+        """
+        for (row_id,) in self._select(plan, "a.id", limit, offset):
+            yield row_id
+
+    def query(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        limit: int | None = None,
+        offset: int = 0,
+        order_by: str | None = None,
+        descending: bool = False,
+    ) -> Iterator[CloseApproach]:
+        """Query close approaches to generate those that match a collection of filters.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param limit: The maximum number of approaches to generate; 0 or None for all.
+        :param offset: The number of matching approaches to skip first.
+        :param order_by: One of 'time', 'distance', 'velocity' and 'diameter', or
+            `None` for internal order. Approaches of NEOs without a known
+            diameter come last when ordering by diameter.
+        :param descending: Whether to generate larger values first.
+        :yield: The matching `CloseApproach` objects.
+        """
+        plan = self.plan(filters, order_by, descending)
+        for row in self._select(plan, _APPROACH_COLUMNS, limit, offset):
+            yield self._approach(row)
+
+    def query_rows(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        limit: int | None = None,
+        offset: int = 0,
+        order_by: str | None = None,
+        descending: bool = False,
+    ) -> Iterator[int]:
+        """Query close approaches to generate the row ids of those that match.
+
+        The arguments are the same as those of `query`; pass the row ids to
+        `fetch` to obtain their `CloseApproach` objects.
+
+        :return: A stream of the ids of matching rows.
+        """
+        return self.execute(self.plan(filters, order_by, descending), limit, offset)
+
+    def fetch(self, rows: Iterable[int]) -> Iterator[CloseApproach]:
+        """Generate the close approaches of a collection of row ids.
+
+        :param rows: Row ids, as generated by `query_rows`.
+        :yield: The `CloseApproach` of each row, in the same order.
+        """
+        for row_id in rows:
+            approach = self._rows.get(row_id)
+            if approach is None:
+                approach = self._approach(
+                    self._connection.execute(
+                        f"SELECT {_APPROACH_COLUMNS} {_SOURCE} WHERE a.id = ?",
+                        (row_id,),
+                    ).fetchone()
+                )
+            yield approach
+
+    def count(
+        self, filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {}
+    ) -> int:
+        """Count the close approaches that match a collection of filters.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :return: The number of matching close approaches.
+        """
+        plan = self.plan(filters)
+        return self._connection.execute(
+            f"SELECT COUNT(*) {_SOURCE}{plan.where}", plan.parameters
+        ).fetchone()[0]
+
+    def aggregate(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        group_by: str | None = None,
+        metrics: Sequence[str] = ("count",),
+    ) -> Dict[Any, Dict[str, Any]]:
+        """Summarize the close approaches that match a collection of filters.
+
+        The metrics are computed by SQLite with one grouped `SELECT`, and are
+        those of `NEODatabase.aggregate`.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param group_by: One of 'year', 'month', 'neo' and 'hazardous', or `None`.
+        :param metrics: Metric names, such as 'count' or 'mean_distance'; see
+            the `aggregate` module.
+        :return: A dictionary from each group's key (`None` without a grouping) to
+            a dictionary from metric name to value.
+        :raises ValueError: If the grouping or a metric is unknown.
+        """
+        expressions = []
+        for function, column in map(parse_metric, metrics):
+            if column is None:
+                expressions.append("COUNT(*)")
+            else:
+                expressions.append(f"{_FUNCTIONS[function]}({_COLUMNS[column]})")
+        if group_by is not None and group_by not in _GROUP_KEYS:
+            raise ValueError(
+                f"Unknown grouping {group_by!r}; expected one of {', '.join(GROUPINGS)}."
+            )
+
+        plan = self.plan(filters)
+        key = "NULL" if group_by is None else _GROUP_KEYS[group_by]
+        sql = f"SELECT {key}, {', '.join(expressions)} {_SOURCE}{plan.where}"
+        if group_by is not None:
+            sql += " GROUP BY 1"
+        groups = {}
+        for group, *values in self._connection.execute(sql, plan.parameters):
+            if group_by == "hazardous" and group is not None:
+                group = bool(group)
+            groups[group] = dict(zip(metrics, values))
+        return {
+            group: groups[group]
+            for group in sorted(groups, key=lambda group: (group is None, group))
+        }
+
+    def explain(
+        self,
+        filters: Mapping[str, fls.AttributeFilter] | fls.CompiledFilters = {},
+        limit: int | None = None,
+        order_by: str | None = None,
+        descending: bool = False,
+    ) -> SQLPlan:
+        """Plan and execute a query to completion, only counting its matches.
+
+        :param filters: A collection of filters capturing user-specified criteria.
+        :param limit: The maximum number of matches to read, as for `query`.
+        :param order_by: The column to order matches by, as for `query`.
+        :param descending: Whether to generate larger values first.
+        :return: The executed `SQLPlan`, with its actual row count filled in.
+        """
+        plan = self.plan(filters, order_by, descending)
+        for _ in self.execute(plan, limit):
+            pass
+        return plan
+
+
+def _connect(path: str | os.PathLike) -> sqlite3.Connection:
+    """Connect to an existing database file, read-only."""
+    uri = pathlib.Path(path).resolve().as_uri()
+    return sqlite3.connect(f"{uri}?mode=ro", uri=True)
+
+
+def _meta(connection: sqlite3.Connection) -> Dict[str, str]:
+    """Read the metadata of a database."""
+    return dict(connection.execute("SELECT key, value FROM meta"))
+
+
+def _record_sources(path: str | os.PathLike, sources: Sequence[Dict[str, Any]]) -> None:
+    """Store new fingerprints of the data files, so touched files aren't hashed again."""
+    try:
+        with contextlib.closing(sqlite3.connect(path)) as connection, connection:
+            connection.execute(
+                "UPDATE meta SET value = ? WHERE key = 'sources'", [json.dumps(sources)]
+            )
+    except sqlite3.Error:
+        # A read-only file only costs the rehash next time.
+        pass
+
+
+def _write(
+    connection: sqlite3.Connection,
+    neos: Sequence[NearEarthObject],
+    approaches: Sequence[CloseApproach],
+    sources: Sequence[Dict[str, Any]],
+) -> None:
+    """Create the tables of a database, fill them in and index them."""
+    positions = {id(neo): i for i, neo in enumerate(neos)}
+    connection.executescript(_SCHEMA)
+    with connection:
+        connection.executemany(
+            "INSERT INTO neos VALUES (?, ?, ?, ?, ?)",
+            (
+                (
+                    i,
+                    neo.designation,
+                    neo.name,
+                    None if math.isnan(neo.diameter) else neo.diameter,
+                    neo.hazardous,
+                )
+                for i, neo in enumerate(neos)
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO approaches VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                (
+                    i,
+                    approach._designation,
+                    positions.get(id(approach.neo)),
+                    datetime_to_minutes(approach.time),
+                    approach.distance,
+                    approach.velocity,
+                )
+                for i, approach in enumerate(approaches)
+            ),
+        )
+        connection.executemany(
+            "INSERT INTO meta VALUES (?, ?)",
+            (("version", str(SCHEMA_VERSION)), ("sources", json.dumps(list(sources)))),
+        )
+    connection.executescript(_INDEXES)
+
+
+def load_sqlite(
+    path: str | os.PathLike,
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+    use_cache: bool = True,
+    rebuild: bool = False,
+) -> SQLiteDatabase:
+    """Open a database file built from the data files, or build it from them.
+
+    :param path: The database file.
+    :param neo_csv_path: A path to a CSV file containing data about near-Earth objects.
+    :param cad_json_path: A path to a JSON file containing data about close approaches.
+    :param use_cache: Whether to read and write the file at all; if not, the
+        database is built in memory.
+    :param rebuild: Whether to ignore an existing file and write a fresh one.
+    :return: A `SQLiteDatabase`.
+    """
+    paths = [
+        str(pathlib.Path(source).resolve()) for source in (neo_csv_path, cad_json_path)
+    ]
+    if use_cache and not rebuild:
+        try:
+            database = SQLiteDatabase.open(path)
+        except ValueError:
+            pass
+        else:
+            sources = json.loads(_meta(database._connection)["sources"])
+            mtimes = [recorded["mtime_ns"] for recorded in sources]
+            if [recorded["path"] for recorded in sources] == paths and all(
+                is_fresh(recorded) for recorded in sources
+            ):
+                if mtimes != [recorded["mtime_ns"] for recorded in sources]:
+                    _record_sources(path, sources)
+                return database
+            database.close()
+
+    neos, approaches = load_neos(neo_csv_path), load_approaches(cad_json_path)
+    if not use_cache:
+        return SQLiteDatabase(neos, approaches)
+    sources = [fingerprint(neo_csv_path), fingerprint(cad_json_path)]
+    return SQLiteDatabase(neos, approaches, path, sources)
@@ -0,0 +1,175 @@
+"""Answer queries over data sets larger than memory, one chunk of rows at a time.
+
+An `NEODatabase` holds every close approach in memory. For catalogs that don't
+fit, `stream_query` evaluates the criteria of `create_filters` in a single pass
+over the data, within a fixed memory budget, and never builds a database or a
+list of every approach:
+
+* from the JSON file of close approaches, which is decoded record by record
+  with `extract.iter_approaches`, in chunks of as many `CloseApproach` objects
+  as fit in the budget; or
+* from a directory of column files written by `columnar.convert`, whose columns
+  are read in chunks of as many rows as fit in the budget by
+  `columnar.scan_columnar`, skipping the year partitions that the query rules
+  out. Only the matching rows become `CloseApproach` objects.
+
+The matches are yielded as they are found, in the order of the data, so they
+can be written straight to a file with `write.write_to_csv` or
+`write.write_to_json`. Ordered queries keep only the `limit` best matches seen
+so far, so they must be limited to as many matches as fit in the budget.
+
+The NEOs are always read in full, since every approach is matched against the
+diameter and hazard flag of its NEO; the budget covers the approaches only.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import re
+from typing import Any, Callable, Iterator, List, Mapping, Tuple
+
+from columnar import scan_columnar
+from extract import iter_approaches, load_neos
+from filters import AttributeFilter, compile_filters
+from helpers import datetime_to_minutes
+from models import CloseApproach
+from planner import ORDERINGS
+
+# The approximate size in memory of a `CloseApproach` decoded from the JSON
+# file, with its `datetime` and floats.
+APPROACH_BYTES = 256
+
+# The size of one row of the approach columns of a converted directory, and of
+# its slot in the chunk's list of materialized rows.
+COLUMN_ROW_BYTES = 8 + 8 + 8 + 4 + 8
+
+_SIZE = re.compile(r"\s*(?P<number>\d+(?:\.\d*)?)\s*(?P<unit>[kmgt]?)i?b?\s*", re.I)
+_UNITS = {"": 1, "k": 1 << 10, "m": 1 << 20, "g": 1 << 30, "t": 1 << 40}
+
+
+def parse_size(text: str) -> int:
+    """Parse a size in bytes with an optional binary unit, such as '512M' or '2GiB'.
+
+    :param text: The size, as a number followed by one of K, M, G or T.
+    :return: The size in bytes.
+    :raises ValueError: If the text isn't a positive size.
+    """
+    match = _SIZE.fullmatch(text)
+    size = int(float(match["number"]) * _UNITS[match["unit"].lower()]) if match else 0
+    if size <= 0:
+        raise ValueError(f"'{text}' is not a valid size. Use e.g. 512M or 2G.")
+    return size
+
+
+def _chunks(approaches: Iterator[CloseApproach], size: int) -> Iterator[List]:
+    """Split a stream of close approaches into lists of at most `size` of them."""
+    while True:
+        chunk = list(itertools.islice(approaches, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def stream_matches(
+    filters: Mapping[str, AttributeFilter],
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+    memory_limit: int,
+    directory: str | os.PathLike | None = None,
+) -> Iterator[CloseApproach]:
+    """Generate the close approaches that match a collection of filters, chunk by chunk.
+
+    :param filters: A collection of filters, as returned by `create_filters`.
+    :param neo_csv_path: A path to the CSV file of NEOs.
+    :param cad_json_path: A path to the JSON file of close approaches.
+    :param memory_limit: The number of bytes of approaches to hold at once.
+    :param directory: A directory of column files converted from the data files,
+        to read instead of them.
+    :yield: The matching close approaches, linked to their NEOs, in data order.
+    """
+    compiled = compile_filters(filters)
+    if compiled.empty:
+        return
+    if directory is not None:
+        chunk_rows = max(1, memory_limit // COLUMN_ROW_BYTES)
+        yield from scan_columnar(directory, compiled.bounds, chunk_rows)
+        return
+
+    # Link approaches to their NEOs without recording them in `neo.approaches`,
+    # which would keep every approach alive.
+    neos = {neo.designation: neo for neo in load_neos(neo_csv_path)}
+    chunk_rows = max(1, memory_limit // APPROACH_BYTES)
+    for chunk in _chunks(iter_approaches(cad_json_path), chunk_rows):
+        for approach in chunk:
+            approach.neo = neos.get(approach._designation)
+        yield from filter(compiled, chunk)
+
+
+def _sort_key(column: str, descending: bool) -> Callable[[Tuple], Tuple]:
+    """Generate a key over numbered approaches that orders them by a column.
+
+    The order is that of `ApproachTable.sort_key`, with the number of each
+    approach standing in for its row id.
+    """
+    sign = -1 if descending else 1
+
+    def value(approach: CloseApproach) -> Any:
+        if column == "epoch":
+            return datetime_to_minutes(approach.time)
+        if column == "diameter":
+            return approach.neo.diameter if approach.neo is not None else math.nan
+        return getattr(approach, column)
+
+    def key(numbered: Tuple[int, CloseApproach]) -> Tuple:
+        i, approach = numbered
+        v = value(approach)
+        if v != v:
+            return (True, 0.0, sign * i)
+        return (False, sign * v, sign * i)
+
+    return key
+
+
+def stream_query(
+    filters: Mapping[str, AttributeFilter],
+    neo_csv_path: str | os.PathLike,
+    cad_json_path: str | os.PathLike,
+    memory_limit: int,
+    limit: int | None = None,
+    order_by: str | None = None,
+    descending: bool = False,
+    directory: str | os.PathLike | None = None,
+) -> Iterator[CloseApproach]:
+    """Query the data files, or column files converted from them, in one streaming pass.
+
+    The matches are those of `NEODatabase.query` over the same data, in the
+    same order.
+
+    :param filters: A collection of filters, as returned by `create_filters`.
+    :param neo_csv_path: A path to the CSV file of NEOs.
+    :param cad_json_path: A path to the JSON file of close approaches.
+    :param memory_limit: The number of bytes of approaches to hold at once.
+    :param limit: The maximum number of matches to generate, or `None` for all.
+    :param order_by: One of 'time', 'distance', 'velocity' and 'diameter', or
+        `None` to generate matches in the order of the data.
+    :param descending: Whether larger values come first, with `order_by`.
+    :param directory: A directory of column files converted from the data files,
+        to read instead of them.
+    :return: An iterator of the matching close approaches.
+    :raises ValueError: If an ordered query's matches don't fit in the budget.
+    """
+    matches = stream_matches(
+        filters, neo_csv_path, cad_json_path, memory_limit, directory
+    )
+    if order_by is None:
+        return itertools.islice(matches, limit or None)
+    if not limit or limit * APPROACH_BYTES > memory_limit:
+        raise ValueError(
+            "An ordered streaming query needs a limit on the number of matches "
+            f"that fits in memory: at most {memory_limit // APPROACH_BYTES}."
+        )
+    best = heapq.nsmallest(
+        limit, enumerate(matches), key=_sort_key(ORDERINGS[order_by], descending)
+    )
+    return (approach for _, approach in best)
@@ -0,0 +1,286 @@
+"""Store close approaches column by column, as a struct of typed arrays.
+
+An `ApproachTable` holds the attributes of close approaches that queries compare
+- the approach time in epoch minutes, the distance, the velocity and the
+position of the approach's NEO - in compact `array` columns, along with the
+diameter and hazard flag of every NEO. A query then scans plain numbers by row
+id - with a single predicate generated per query by `predicate` - and only
+needs a `CloseApproach` object for the rows that it yields.
+
+Rows whose objects already exist (because the table was built from them) are
+returned as-is, so their identity and links are preserved. Rows without an
+object are materialized on first access as a `CloseApproach` view over the
+columns, and kept in a dict by row id, so that opening a table costs nothing
+per row. A table built `from_stream` keeps no objects at all, apart from those
+of approaches without an NEO, which can't be recreated from the columns.
+
+The position of an approach's NEO is `len(neos)` when it has no linked NEO. The
+NEO columns carry one extra entry at that position - a NaN diameter and a hazard
+flag of -1 - so that NEO-level criteria never match such an approach.
+"""
+
+from array import array
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Sequence,
+    Tuple,
+    overload,
+)
+
+from filters import fuse_intervals
+from helpers import datetime_to_minutes, minutes_to_datetime
+from models import CloseApproach, NearEarthObject
+
+# The columns of an `ApproachTable` that are stored per NEO rather than per approach.
+NEO_COLUMNS = frozenset(("diameter", "hazardous"))
+
+# How a predicate generated by `ApproachTable.predicate` reads each column of row `i`.
+_ROW_ACCESSORS = {
+    "epoch": "epochs[i]",
+    "distance": "distances[i]",
+    "velocity": "velocities[i]",
+    "diameter": "diameters[neo_index[i]]",
+    "hazardous": "hazardous[neo_index[i]]",
+}
+
+
+class ApproachTable:
+    """A columnar table of close approaches and the NEOs they belong to."""
+
+    def __init__(
+        self,
+        neos: List[NearEarthObject],
+        epochs: array,
+        distances: array,
+        velocities: array,
+        neo_index: array,
+        rows: Dict[int, CloseApproach] | None = None,
+        diameters: array | None = None,
+        hazardous: array | None = None,
+    ) -> None:
+        """Create a new `ApproachTable` from its approach columns.
+
+        :param neos: The NEOs that `neo_index` refers to.
+        :param epochs: A 'q' array of approach times, in epoch minutes.
+        :param distances: A 'd' array of nominal approach distances, in au.
+        :param velocities: A 'd' array of relative approach velocities, in km/s.
+        :param neo_index: An 'i' array of positions in `neos`.
+        :param rows: The existing `CloseApproach` objects, by row id, if any.
+        :param diameters: A 'd' array of the diameter of each NEO, followed by
+            NaN, if already built; by default, read from `neos`.
+        :param hazardous: A 'b' array of the hazard flag of each NEO, followed
+            by -1, if already built; by default, read from `neos`.
+        """
+        self.neos = neos
+        self.epochs = epochs
+        self.distances = distances
+        self.velocities = velocities
+        self.neo_index = neo_index
+        self.rows: Dict[int, CloseApproach] = rows if rows is not None else {}
+
+        if diameters is None:
+            diameters = array("d", (neo.diameter for neo in neos))
+            diameters.append(float("nan"))
+        if hazardous is None:
+            hazardous = array("b", (neo.hazardous for neo in neos))
+            hazardous.append(-1)
+        self.diameters = diameters
+        self.hazardous = hazardous
+
+    @classmethod
+    def from_approaches(
+        cls, neos: List[NearEarthObject], approaches: List[CloseApproach]
+    ) -> "ApproachTable":
+        """Build a table from linked `NearEarthObject`s and `CloseApproach`es.
+
+        :param neos: A collection of `NearEarthObject`s.
+        :param approaches: A collection of `CloseApproach`es, linked to `neos`.
+        :return: A table whose rows are `approaches`, in order.
+        """
+        positions = {id(neo): i for i, neo in enumerate(neos)}
+        unlinked = len(neos)
+        return cls(
+            neos,
+            array("q", (datetime_to_minutes(ca.time) for ca in approaches)),
+            array("d", (ca.distance for ca in approaches)),
+            array("d", (ca.velocity for ca in approaches)),
+            array("i", (positions.get(id(ca.neo), unlinked) for ca in approaches)),
+            dict(enumerate(approaches)),
+        )
+
+    @classmethod
+    def from_stream(
+        cls, neos: List[NearEarthObject], approaches: Iterable[CloseApproach]
+    ) -> "ApproachTable":
+        """Build a table from a stream of unlinked `CloseApproach`es, without keeping them.
+
+        Each approach is reduced to its columns as it arrives, so that only the
+        approaches without an NEO outlive the stream; every other row is
+        materialized again on access.
+
+        :param neos: A collection of `NearEarthObject`s.
+        :param approaches: `CloseApproach`es, such as those of `extract.iter_approaches`.
+        :return: A table whose rows are the approaches, in order.
+        """
+        positions = {neo.designation: i for i, neo in enumerate(neos)}
+        unlinked = len(neos)
+        epochs, distances, velocities = array("q"), array("d"), array("d")
+        neo_index = array("i")
+        orphans = {}
+        for approach in approaches:
+            position = positions.get(approach._designation, unlinked)
+            if position == unlinked:
+                orphans[len(epochs)] = approach
+            epochs.append(datetime_to_minutes(approach.time))
+            distances.append(approach.distance)
+            velocities.append(approach.velocity)
+            neo_index.append(position)
+        return cls(neos, epochs, distances, velocities, neo_index, orphans)
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.epochs)
+
+    def column(self, name: str) -> Sequence:
+        """Return a column by name, indexed by row id or - for NEO columns - by NEO position.
+
+        :param name: One of 'neo', 'epoch', 'distance', 'velocity', 'diameter' and 'hazardous'.
+        :return: The column's array.
+        """
+        return {
+            "neo": self.neo_index,
+            "epoch": self.epochs,
+            "distance": self.distances,
+            "velocity": self.velocities,
+            "diameter": self.diameters,
+            "hazardous": self.hazardous,
+        }[name]
+
+    def row(self, i: int) -> CloseApproach:
+        """Return the `CloseApproach` of a row, materializing it if necessary.
+
+        :param i: A row id.
+        :return: The row's `CloseApproach`.
+        """
+        approach = self.rows.get(i)
+        if approach is None:
+            neo = self.neos[self.neo_index[i]]
+            approach = CloseApproach.from_values(
+                neo.designation,
+                minutes_to_datetime(self.epochs[i]),
+                self.distances[i],
+                self.velocities[i],
+                neo,
+            )
+            self.rows[i] = approach
+        return approach
+
+    def predicate(self, bounds: Mapping[str, Tuple[Any, Any]]) -> Callable[[int], bool]:
+        """Generate a fused predicate over row ids for a collection of intervals.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :return: A callable returning whether a row id matches every interval.
+        """
+        return fuse_intervals(
+            bounds,
+            _ROW_ACCESSORS,
+            "i",
+            {
+                "epochs": self.epochs,
+                "distances": self.distances,
+                "velocities": self.velocities,
+                "neo_index": self.neo_index,
+                "diameters": self.diameters,
+                "hazardous": self.hazardous,
+            },
+        )
+
+    def sort_key(self, column: str, descending: bool = False) -> Callable[[int], Tuple]:
+        """Generate a key over row ids that orders rows by a column.
+
+        Ties are broken by row id, so a descending order is the exact reverse of
+        the ascending one. Rows whose value is NaN - approaches of NEOs without
+        a known diameter - come last in either direction.
+
+        :param column: One of 'epoch', 'distance', 'velocity' and 'diameter'.
+        :param descending: Whether larger values come first.
+        :return: A callable mapping a row id to a sortable key.
+        """
+        sign = -1 if descending else 1
+        if column in NEO_COLUMNS:
+            values, neo_index = self.column(column), self.neo_index
+
+            def key(i: int) -> Tuple:
+                value = values[neo_index[i]]
+                if value != value:
+                    return (True, 0.0, sign * i)
+                return (False, sign * value, sign * i)
+
+        else:
+            values = self.column(column)
+
+            def key(i: int) -> Tuple:
+                return (False, sign * values[i], sign * i)
+
+        return key
+
+    def select_neos(self, bounds: Mapping[str, Tuple[Any, Any]]) -> Iterator[int]:
+        """Generate the positions of the NEOs whose columns fall within every interval.
+
+        :param bounds: The closed (low, high) interval of each constrained NEO column.
+        :return: An iterator of matching positions in `neos`, in order.
+        """
+        predicate = fuse_intervals(
+            bounds,
+            {"diameter": "diameters[p]", "hazardous": "hazardous[p]"},
+            "p",
+            {"diameters": self.diameters, "hazardous": self.hazardous},
+        )
+        return filter(predicate, range(len(self.neos)))
+
+    def select(
+        self,
+        bounds: Mapping[str, Tuple[Any, Any]],
+        rows: Iterable[int] | None = None,
+    ) -> Iterator[int]:
+        """Generate the ids of rows whose columns fall within every interval.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :param rows: The candidate row ids, in order. Defaults to every row.
+        :return: An iterator of the matching row ids, in the order of `rows`.
+        """
+        if rows is None:
+            rows = range(len(self))
+        if not bounds:
+            return iter(rows)
+        return filter(self.predicate(bounds), rows)
+
+
+class TableRows(Sequence[CloseApproach]):
+    """A read-only sequence of the rows of an `ApproachTable`, materialized on access."""
+
+    def __init__(self, table: ApproachTable) -> None:
+        """Create a new `TableRows` over a table."""
+        self.table = table
+
+    def __len__(self) -> int:
+        """Return the number of rows."""
+        return len(self.table)
+
+    @overload
+    def __getitem__(self, i: int) -> CloseApproach: ...
+
+    @overload
+    def __getitem__(self, i: slice) -> List[CloseApproach]: ...
+
+    def __getitem__(self, i: int | slice) -> CloseApproach | List[CloseApproach]:
+        """Return the `CloseApproach` of a row, or a list of them for a slice."""
+        if isinstance(i, slice):
+            return [self.table.row(j) for j in range(len(self.table))[i]]
+        return self.table.row(range(len(self.table))[i])
@@ -0,0 +1,22 @@
+"""Generate random query criteria, shared by the tests that compare query engines."""
+
+import datetime
+
+
+def random_criteria(rng):
+    """Return random keyword arguments for `create_filters`."""
+    criteria = {}
+    if rng.random() < 0.5:
+        start = datetime.date(2020, 1, 1) + datetime.timedelta(days=rng.randrange(366))
+        key = rng.choice(("date", "start_date", "end_date"))
+        criteria[key] = start
+        if key == "start_date" and rng.random() < 0.5:
+            criteria["end_date"] = start + datetime.timedelta(days=rng.randrange(60))
+    for name, scale in (("distance", 0.5), ("velocity", 40.0), ("diameter", 2.0)):
+        if rng.random() < 0.4:
+            criteria[f"{name}_min"] = rng.random() * scale
+        if rng.random() < 0.4:
+            criteria[f"{name}_max"] = rng.random() * scale
+    if rng.random() < 0.3:
+        criteria["hazardous"] = rng.random() < 0.5
+    return criteria
@@ -0,0 +1,114 @@
+"""Check that `NEODatabase.aggregate` summarizes the matches of a query.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_aggregate
+"""
+
+import datetime
+import math
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestAggregate(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(cls.neos, cls.approaches)
+
+    def test_count_without_grouping(self):
+        filters = create_filters(distance_max=0.05)
+        expected = len(list(self.db.query(filters)))
+        self.assertEqual(self.db.aggregate(filters), {None: {"count": expected}})
+
+    def test_count_of_nothing(self):
+        filters = create_filters(distance_min=0.5, distance_max=0.1)
+        self.assertEqual(
+            self.db.aggregate(
+                filters, metrics=["count", "min_distance", "sum_distance"]
+            ),
+            {None: {"count": 0, "min_distance": None, "sum_distance": None}},
+        )
+
+    def test_diameter_metrics_of_neos_without_a_diameter(self):
+        neo = next(neo for neo in self.neos if math.isnan(neo.diameter))
+        metrics = ["count", "mean_diameter", "sum_diameter"]
+        received = self.db.aggregate(group_by="neo", metrics=metrics)
+        self.assertEqual(
+            received[neo.designation],
+            {"count": len(neo.approaches), "mean_diameter": None, "sum_diameter": None},
+        )
+
+    def test_metrics_by_month(self):
+        filters = create_filters(hazardous=True)
+        metrics = ["count", "min_distance", "max_velocity", "mean_diameter"]
+        received = self.db.aggregate(filters, group_by="month", metrics=metrics)
+
+        groups = {}
+        for approach in self.db.query(filters):
+            groups.setdefault(f"{approach.time:%Y-%m}", []).append(approach)
+        self.assertEqual(list(received), sorted(groups))
+        for month, approaches in groups.items():
+            diameters = [
+                approach.neo.diameter
+                for approach in approaches
+                if not math.isnan(approach.neo.diameter)
+            ]
+            self.assertEqual(received[month]["count"], len(approaches))
+            self.assertEqual(
+                received[month]["min_distance"],
+                min(approach.distance for approach in approaches),
+            )
+            self.assertEqual(
+                received[month]["max_velocity"],
+                max(approach.velocity for approach in approaches),
+            )
+            self.assertAlmostEqual(
+                received[month]["mean_diameter"], sum(diameters) / len(diameters)
+            )
+
+    def test_group_by_year_neo_and_hazard_flag(self):
+        filters = create_filters(start_date=datetime.date(2020, 6, 1))
+        matches = list(self.db.query(filters))
+        self.assertEqual(
+            self.db.aggregate(filters, group_by="year"),
+            {2020: {"count": len(matches)}},
+        )
+
+        by_neo = self.db.aggregate(filters, group_by="neo", metrics=["sum_distance"])
+        self.assertEqual(
+            set(by_neo), {approach.neo.designation for approach in matches}
+        )
+        self.assertAlmostEqual(
+            sum(values["sum_distance"] for values in by_neo.values()),
+            sum(approach.distance for approach in matches),
+        )
+
+        by_flag = self.db.aggregate(filters, group_by="hazardous")
+        self.assertEqual(
+            by_flag[True]["count"],
+            sum(1 for approach in matches if approach.neo.hazardous),
+        )
+        self.assertEqual(by_flag[False]["count"] + by_flag[True]["count"], len(matches))
+
+    def test_unknown_grouping_or_metric(self):
+        with self.assertRaises(ValueError):
+            self.db.aggregate(group_by="decade")
+        with self.assertRaises(ValueError):
+            self.db.aggregate(metrics=["median_distance"])
+        with self.assertRaises(ValueError):
+            self.db.aggregate(metrics=["mean_time"])
+
+
+if __name__ == "__main__":
+    unittest.main()
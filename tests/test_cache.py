@@ -0,0 +1,153 @@
+"""Check that the query caches share entries between equivalent queries and evict old ones.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_cache
+"""
+
+import datetime
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from cache import QueryCache, ResultCache, query_key
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestQueryKey(unittest.TestCase):
+    def test_equivalent_filters_share_a_key(self):
+        day = datetime.date(2020, 3, 2)
+        self.assertEqual(
+            query_key(create_filters(date=day, hazardous=True)),
+            query_key(create_filters(hazardous=True, start_date=day, end_date=day)),
+        )
+        self.assertEqual(
+            query_key(create_filters(distance_min=0.1, velocity_max=20.0)),
+            query_key(create_filters(velocity_max=20, distance_min=0.1)),
+        )
+
+    def test_contradictory_filters_share_a_key(self):
+        self.assertEqual(
+            query_key(create_filters(distance_min=0.5, distance_max=0.1)),
+            query_key(create_filters(velocity_min=30, velocity_max=10)),
+        )
+
+    def test_ordering_and_limit_are_part_of_the_key(self):
+        filters = create_filters(hazardous=False)
+        keys = {
+            query_key(filters),
+            query_key(filters, limit=10),
+            query_key(filters, "distance"),
+            query_key(filters, "distance", True),
+        }
+        self.assertEqual(len(keys), 4)
+        self.assertEqual(query_key(filters, limit=0), query_key(filters))
+
+
+class TestQueryCache(unittest.TestCase):
+    def test_hits_and_misses(self):
+        cache = QueryCache()
+        self.assertIsNone(cache.get("a"))
+        cache.put("a", [3, 1, 2])
+        self.assertEqual(list(cache.get("a")), [3, 1, 2])
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["bytes"], 12)
+
+    def test_least_recently_used_entries_are_evicted_first(self):
+        cache = QueryCache(max_entries=2)
+        cache.put("a", [1])
+        cache.put("b", [2])
+        cache.get("a")
+        cache.put("c", [3])
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.stats()["evictions"], 1)
+
+    def test_size_limit(self):
+        cache = QueryCache(max_bytes=30)
+        cache.put("a", range(5))
+        cache.put("b", range(5))
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.bytes, 20)
+        cache.put("huge", range(100))
+        self.assertIsNone(cache.get("huge"))
+        self.assertEqual(len(cache), 1)
+
+    def test_cached_rows_fetch_the_same_approaches(self):
+        db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+        filters = create_filters(distance_max=0.05)
+        cache = QueryCache()
+        key = query_key(filters, "velocity", limit=5)
+        rows = cache.put(key, db.query_rows(filters, limit=5, order_by="velocity"))
+        self.assertEqual(
+            list(db.fetch(cache.get(key))),
+            list(db.query(filters, limit=5, order_by="velocity")),
+        )
+        self.assertEqual(len(rows), 5)
+
+
+class TestResultCache(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = pathlib.Path(tmp.name)
+        self.neofile = shutil.copy(TEST_NEO_FILE, self.root / "neos.csv")
+        self.cadfile = shutil.copy(TEST_CAD_FILE, self.root / "cad.json")
+        self.directory = self.root / "results"
+
+    def open(self, layout="memory", **kwargs):
+        return ResultCache(
+            (self.neofile, self.cadfile), layout, self.directory, **kwargs
+        )
+
+    def test_results_persist_across_instances(self):
+        key = query_key(create_filters(hazardous=True), "distance", limit=3)
+        cache = self.open()
+        self.assertIsNone(cache.get(key))
+        cache.put(key, [7, 4, 9])
+        reopened = self.open()
+        self.assertEqual(list(reopened.get(key)), [7, 4, 9])
+        self.assertEqual(reopened.stats()["entries"], 1)
+        self.assertIsNone(reopened.get(query_key(create_filters(hazardous=True))))
+
+    def test_changing_a_data_file_invalidates_results(self):
+        key = query_key(create_filters(velocity_min=10))
+        self.open().put(key, [1, 2])
+        stat = os.stat(self.cadfile)
+        os.utime(self.cadfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertIsNone(self.open().get(key))
+
+    def test_results_are_kept_apart_by_layout(self):
+        key = query_key(create_filters(velocity_min=10))
+        self.open("snapshot-1").put(key, [1, 2])
+        self.assertIsNone(self.open("columnar-1").get(key))
+        self.assertEqual(list(self.open("snapshot-1").get(key)), [1, 2])
+
+    def test_least_recently_used_files_are_evicted_first(self):
+        cache = self.open()
+        for i, name in enumerate("abc"):
+            cache.put(name, range(100))
+            # Give each file a distinct time of last use.
+            os.utime(cache._path(name)[0], (i, i))
+        cache.get("a")
+        size = cache.stats()["bytes"] // 3
+        cache.max_bytes = 3 * size
+        cache.put("d", range(100))
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertEqual(cache.evictions, 1)
+        cache.clear()
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
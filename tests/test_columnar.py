@@ -0,0 +1,141 @@
+"""Check that a database written as column files answers queries like the original.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_columnar
+"""
+
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import snapshot
+from columnar import convert, is_current, load_columnar, open_columnar
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestColumnar(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = pathlib.Path(tmp.name)
+        self.neofile = shutil.copy(TEST_NEO_FILE, self.root / "neos.csv")
+        self.cadfile = shutil.copy(TEST_CAD_FILE, self.root / "cad.json")
+        self.directory = self.root / "columnar"
+        self.db = convert(self.neofile, self.cadfile, self.directory)
+
+    def test_queries_match_the_original(self):
+        mapped = open_columnar(self.directory)
+        for criteria, order_by, limit in (
+            ({}, None, None),
+            ({"hazardous": False, "velocity_min": 10}, None, None),
+            ({"distance_max": 0.05}, "velocity", 10),
+            ({"diameter_min": 0.1}, "diameter", None),
+        ):
+            with self.subTest(criteria=criteria, order_by=order_by):
+                filters = create_filters(**criteria)
+                rows = list(mapped.query_rows(filters, limit, 0, order_by))
+                self.assertEqual(
+                    rows, list(self.db.query_rows(filters, limit, 0, order_by))
+                )
+                self.assertEqual(
+                    [str(approach) for approach in mapped.fetch(rows)],
+                    [str(approach) for approach in self.db.fetch(rows)],
+                )
+                self.assertEqual(mapped.count(filters), self.db.count(filters))
+
+    def test_rows_keep_the_order_of_the_data_file(self):
+        with open(self.cadfile) as infile:
+            data = json.load(infile)
+        data["data"].reverse()
+        with open(self.cadfile, "w") as outfile:
+            json.dump(data, outfile)
+        convert(self.neofile, self.cadfile, self.directory)
+        mapped = open_columnar(self.directory)
+        db = NEODatabase(load_neos(self.neofile), load_approaches(self.cadfile))
+        filters = create_filters(hazardous=True)
+        rows = list(db.query_rows(filters, 5))
+        self.assertEqual(list(mapped.query_rows(filters, 5)), rows)
+        self.assertEqual(
+            [str(approach) for approach in mapped.fetch(rows)],
+            [str(approach) for approach in db.fetch(rows)],
+        )
+
+    def test_opening_materializes_only_the_yielded_rows(self):
+        mapped = open_columnar(self.directory)
+        unlinked = len(mapped._table.neos)
+        orphans = [i for i, p in enumerate(mapped._table.neo_index) if p == unlinked]
+        self.assertEqual(sorted(mapped._table.rows), orphans)
+        rows = list(mapped.query_rows(create_filters(distance_max=0.05), 3))
+        list(mapped.fetch(rows))
+        self.assertTrue(set(rows) <= set(mapped._table.rows))
+
+    def test_neos_and_their_approaches(self):
+        mapped = open_columnar(self.directory)
+        for designation in ("2020 AY1", "3360"):
+            with self.subTest(designation=designation):
+                neo = self.db.get_neo_by_designation(designation)
+                mapped_neo = mapped.get_neo_by_designation(designation)
+                self.assertEqual(str(mapped_neo), str(neo))
+                self.assertEqual(mapped_neo.name, neo.name)
+                self.assertEqual(
+                    [str(approach) for approach in mapped_neo.approaches],
+                    [str(approach) for approach in neo.approaches],
+                )
+        self.assertEqual(
+            str(mapped.get_neo_by_name("Syrinx")),
+            str(self.db.get_neo_by_name("Syrinx")),
+        )
+
+    def test_changing_a_data_file_makes_the_columns_stale(self):
+        self.assertIsNotNone(load_columnar(self.directory, self.neofile, self.cadfile))
+        with open(self.neofile, "a") as outfile:
+            outfile.write("\n")
+        self.assertIsNone(load_columnar(self.directory, self.neofile, self.cadfile))
+
+    def test_touched_data_files_are_only_rehashed_once(self):
+        stat = os.stat(self.cadfile)
+        os.utime(self.cadfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with unittest.mock.patch.object(
+            snapshot, "_hash_file", wraps=snapshot._hash_file
+        ) as hasher:
+            self.assertTrue(is_current(self.directory, self.neofile, self.cadfile))
+            self.assertTrue(is_current(self.directory, self.neofile, self.cadfile))
+        self.assertEqual(hasher.call_count, 1)
+
+    def test_columns_of_other_data_files_are_not_loaded(self):
+        other = shutil.copy(self.cadfile, self.root / "other.json")
+        self.assertIsNone(load_columnar(self.directory, self.neofile, other))
+
+    def test_missing_directory(self):
+        self.assertIsNone(
+            load_columnar(self.root / "missing", self.neofile, self.cadfile)
+        )
+        with self.assertRaises(ValueError):
+            open_columnar(self.root / "missing")
+
+    def test_converting_again_replaces_the_directory(self):
+        mapped = open_columnar(self.directory)
+        convert(self.neofile, self.cadfile, self.directory)
+        self.assertEqual(
+            sorted(os.listdir(self.root)), ["cad.json", "columnar", "neos.csv"]
+        )
+        # The columns mapped before remain readable.
+        self.assertEqual(
+            mapped.count(create_filters(velocity_min=10)),
+            self.db.count(create_filters(velocity_min=10)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -13,11 +13,15 @@ These tests should pass when Task 2 is complete.
 
 import collections.abc
 import datetime
+import json
 import math
 import pathlib
+import tempfile
 import unittest
+import unittest.mock
 
-from extract import load_approaches, load_neos
+import extract
+from extract import iter_approaches, load_approaches, load_neos
 from models import CloseApproach, NearEarthObject
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
@@ -118,5 +122,54 @@ class TestLoadApproaches(unittest.TestCase):
         self.assertIsInstance(approach.velocity, float)
 
 
+class TestIterApproaches(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+
+    def write_cad(self, contents):
+        tmp = tempfile.NamedTemporaryFile("w", suffix=".json", delete=False)
+        self.addCleanup(pathlib.Path(tmp.name).unlink)
+        with tmp:
+            json.dump(contents, tmp)
+        return tmp.name
+
+    def test_iter_approaches_is_lazy(self):
+        stream = iter_approaches(TEST_CAD_FILE)
+        self.assertNotIsInstance(stream, collections.abc.Collection)
+        self.assertIsInstance(next(stream), CloseApproach)
+
+    def test_iter_approaches_matches_a_full_decode(self):
+        with open(TEST_CAD_FILE) as infile:
+            data = json.load(infile)["data"]
+        # Use tiny blocks so that values straddle block boundaries.
+        with unittest.mock.patch.object(extract, "_CHUNK_SIZE", 7):
+            approaches = list(iter_approaches(TEST_CAD_FILE))
+        self.assertEqual(len(approaches), len(data))
+        for approach, record in zip(approaches, data):
+            self.assertEqual(approach._designation, record[0])
+            self.assertEqual(approach.distance, float(record[4]))
+            self.assertEqual(approach.velocity, float(record[7]))
+
+    def test_iter_approaches_reads_columns_from_fields_header(self):
+        path = self.write_cad(
+            {
+                "fields": ["v_rel", "cd", "h", "dist", "des"],
+                "count": "1",
+                "data": [["12.5", "2020-Jan-01 00:54", "25.1", "0.02", "2020 AY1"]],
+            }
+        )
+        (approach,) = iter_approaches(path)
+        self.assertEqual(approach._designation, "2020 AY1")
+        self.assertEqual(approach.time, datetime.datetime(2020, 1, 1, 0, 54))
+        self.assertEqual(approach.distance, 0.02)
+        self.assertEqual(approach.velocity, 12.5)
+
+    def test_iter_approaches_rejects_header_without_needed_fields(self):
+        path = self.write_cad({"fields": ["des", "cd"], "data": [["2020 AY1", "x"]]})
+        with self.assertRaises(ValueError):
+            list(iter_approaches(path))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,77 @@
+"""Check that a collection of filters compiles into an equivalent single predicate.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_filters
+"""
+
+import datetime
+import pathlib
+import random
+import unittest
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import CompiledFilters, compile_filters, create_filters
+from helpers import date_to_minutes
+from tests.criteria import random_criteria
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestCompileFilters(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+
+    def test_inactive_filters_are_dropped(self):
+        self.assertEqual(compile_filters(create_filters()).bounds, {})
+        compiled = compile_filters(create_filters(velocity_max=3.0))
+        self.assertEqual(compiled.bounds, {"velocity": (None, 3.0)})
+
+    def test_bounds_on_the_same_attribute_are_merged(self):
+        compiled = compile_filters(
+            create_filters(
+                start_date=datetime.date(2020, 3, 1),
+                date=datetime.date(2020, 3, 2),
+                distance_min=0.1,
+                distance_max=0.2,
+            )
+        )
+        day = date_to_minutes(datetime.date(2020, 3, 2))
+        self.assertEqual(compiled.bounds["epoch"], (day, day + 24 * 60 - 1))
+        self.assertEqual(compiled.bounds["distance"], (0.1, 0.2))
+        self.assertFalse(compiled.empty)
+
+    def test_conflicting_bounds_are_empty(self):
+        compiled = compile_filters(create_filters(distance_min=0.2, distance_max=0.1))
+        self.assertTrue(compiled.empty)
+
+    def test_compiled_filters_pass_through(self):
+        compiled = compile_filters(create_filters(hazardous=True))
+        self.assertIs(compile_filters(compiled), compiled)
+        self.assertIsInstance(compiled, CompiledFilters)
+
+    def test_compiled_predicate_matches_the_filters(self):
+        rng = random.Random(9)
+        for _ in range(100):
+            criteria = random_criteria(rng)
+            filters = create_filters(**criteria)
+            active = [f for f in filters.values() if f.value is not None]
+            compiled = compile_filters(filters)
+            with self.subTest(**criteria):
+                for approach in self.approaches:
+                    expected = all(f(approach) for f in active)
+                    self.assertEqual(compiled(approach), expected)
+
+    def test_unlinked_approaches_fail_neo_criteria(self):
+        approach = load_approaches(TEST_CAD_FILE)[0]
+        self.assertFalse(compile_filters(create_filters(hazardous=False))(approach))
+        self.assertTrue(compile_filters(create_filters(velocity_min=0.0))(approach))
+
+
+if __name__ == "__main__":
+    unittest.main()
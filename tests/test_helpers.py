@@ -0,0 +1,59 @@
+"""Check that NASA calendar dates are converted to and from datetimes.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_helpers
+"""
+
+import datetime
+import json
+import pathlib
+import unittest
+
+from helpers import cd_to_datetime, datetime_to_str
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestCdToDatetime(unittest.TestCase):
+    def test_matches_strptime_on_test_data(self):
+        with open(TEST_CAD_FILE) as infile:
+            dates = [record[3] for record in json.load(infile)["data"]]
+        for date in dates:
+            expected = datetime.datetime.strptime(date, "%Y-%b-%d %H:%M")
+            self.assertEqual(cd_to_datetime(date), expected)
+
+    def test_parses_every_month(self):
+        for month in range(1, 13):
+            dt = datetime.datetime(1900, month, 28, 23, 59)
+            self.assertEqual(cd_to_datetime(dt.strftime("%Y-%b-%d %H:%M")), dt)
+
+    def test_rejects_malformed_dates(self):
+        for bad in (
+            "",
+            "2020-Dec-31",
+            "2020-Dec-31 12:00:00",
+            "2020-dec-31 12:00",
+            "2020-Foo-31 12:00",
+            "2020/Dec/31 12:00",
+            "2020-Dec-31T12:00",
+            "2021-Feb-29 12:00",
+            "2020-Dec-32 12:00",
+            "2020-Dec-31 24:00",
+            "2020-Dec-31 12:60",
+            "2020-Dec- 1 12:00",
+            "20x0-Dec-31 12:00",
+        ):
+            with self.subTest(bad=bad), self.assertRaises(ValueError):
+                cd_to_datetime(bad)
+
+
+class TestDatetimeToStr(unittest.TestCase):
+    def test_omits_seconds(self):
+        dt = datetime.datetime(2020, 12, 31, 12, 0, 59)
+        self.assertEqual(datetime_to_str(dt), "2020-12-31 12:00")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+"""Check that indexes over `ApproachTable` columns answer range lookups exactly.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_index
+"""
+
+import pathlib
+import random
+import unittest
+from array import array
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+from index import SortedIndex
+from tests.criteria import random_criteria
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestSortedIndex(unittest.TestCase):
+    def setUp(self):
+        rng = random.Random(0)
+        self.values = array("d", (rng.choice((0.5, 1.0, 1.5, 2.0)) for _ in range(500)))
+        self.index = SortedIndex(self.values)
+
+    def brute_force(self, low, high):
+        return [
+            i
+            for i, value in enumerate(self.values)
+            if (low is None or low <= value) and (high is None or value <= high)
+        ]
+
+    def test_lookup_matches_a_scan(self):
+        for low, high in (
+            (None, None),
+            (1.0, None),
+            (None, 1.0),
+            (1.0, 1.5),
+            (0.7, 1.2),
+            (1.0, 1.0),
+            (3.0, None),
+            (2.0, 1.0),
+        ):
+            with self.subTest(low=low, high=high):
+                received = sorted(self.index.lookup(low, high))
+                self.assertEqual(received, self.brute_force(low, high))
+
+    def test_equal_values_keep_row_order(self):
+        start, stop = self.index.span(1.5, 1.5)
+        rows = list(self.index.rows[start:stop])
+        self.assertEqual(rows, sorted(rows))
+
+    def test_span_width_counts_matches(self):
+        start, stop = self.index.span(0.5, 1.0)
+        self.assertEqual(stop - start, len(self.brute_force(0.5, 1.0)))
+
+
+class TestIndexedQueries(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), cls.approaches)
+
+    def test_indexed_queries_match_a_full_scan_in_order(self):
+        rng = random.Random(2020)
+        for _ in range(200):
+            criteria = random_criteria(rng)
+            filters = create_filters(**criteria)
+            active = [f for f in filters.values() if f.value is not None]
+            expected = [ca for ca in self.approaches if all(f(ca) for f in active)]
+            with self.subTest(**criteria):
+                self.assertEqual(list(self.db.query(filters)), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Check that a `NameIndex` finds strings by prefix and by approximate spelling.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_names
+"""
+
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from names import NameIndex, _edit_distance
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestNameIndex(unittest.TestCase):
+    def setUp(self):
+        self.index = NameIndex(
+            ["Halley", "Hale", "Eros", "Apophis", "Toro", "Bennu", "Ryugu", "halley"]
+        )
+
+    def test_lookup_ignores_case(self):
+        self.assertEqual(self.index.lookup("HALLEY"), ["Halley", "halley"])
+        self.assertEqual(self.index.lookup("Ceres"), [])
+
+    def test_prefix(self):
+        self.assertEqual(self.index.prefix("ha"), ["Hale", "Halley", "halley"])
+        self.assertEqual(self.index.prefix("HAL", limit=1), ["Hale"])
+        self.assertEqual(self.index.prefix("x"), [])
+        self.assertEqual(len(self.index.prefix("")), 8)
+
+    def test_suggestions_are_nearest_first(self):
+        self.assertEqual(self.index.suggest("haley")[:2], ["Hale", "Halley"])
+        self.assertEqual(self.index.suggest("Erso"), ["Eros"])
+        self.assertEqual(self.index.suggest("Benu"), ["Bennu"])
+        self.assertEqual(self.index.suggest("Ryugu"), ["Ryugu"])
+        self.assertEqual(self.index.suggest("Apophis", max_distance=0), ["Apophis"])
+        self.assertEqual(self.index.suggest("Xyzzy"), [])
+
+    def test_suggestions_respect_the_distance_bound(self):
+        self.assertEqual(self.index.suggest("Bnnu", max_distance=1), ["Bennu"])
+        self.assertEqual(self.index.suggest("Toor", max_distance=1), [])
+        self.assertEqual(self.index.suggest("Toor", max_distance=2), ["Toro"])
+
+
+class TestEditDistance(unittest.TestCase):
+    def test_distances_within_the_bound_are_exact(self):
+        pairs = {
+            ("", ""): 0,
+            ("", "abc"): 3,
+            ("bennu", "bennu"): 0,
+            ("bennu", "benu"): 1,
+            ("eros", "erso"): 2,
+            ("kitten", "sitting"): 3,
+            ("apophis", "ryugu"): 7,
+        }
+        for (a, b), distance in pairs.items():
+            for bound in range(9):
+                with self.subTest(a=a, b=b, bound=bound):
+                    expected = min(distance, bound + 1)
+                    self.assertEqual(_edit_distance(a, b, bound), expected)
+                    self.assertEqual(_edit_distance(b, a, bound), expected)
+
+
+class TestDatabaseNames(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def test_complete_names_and_designations(self):
+        self.assertEqual(self.db.complete("cer"), ["Cerberus"])
+        designations = self.db.complete("2020 q", kind="designation", limit=3)
+        self.assertEqual(len(designations), 3)
+        for designation in designations:
+            self.assertTrue(designation.startswith("2020 Q"))
+            self.assertIsNotNone(self.db.get_neo_by_designation(designation))
+
+    def test_suggest_misspellings(self):
+        self.assertEqual(self.db.suggest("cerbrus"), ["Cerberus"])
+        self.assertEqual(self.db.suggest("2020QH", kind="designation")[0], "2020 QH")
+
+    def test_unknown_kind(self):
+        with self.assertRaises(ValueError):
+            self.db.complete("a", kind="nickname")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,121 @@
+"""Check that year partitions cover their table and prune scans without losing matches.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_partitions
+"""
+
+import random
+import unittest
+
+from benchmarks.synthetic import synthetic_table
+from database import NEODatabase
+from filters import create_filters
+from helpers import minutes_to_datetime
+from partitions import Partition, partition_by_year
+from tests.criteria import random_criteria
+
+
+class TestPartition(unittest.TestCase):
+    def test_zone_maps_rule_out_disjoint_intervals(self):
+        partition = Partition(2020, 0, 10, {"distance": (0.1, 0.2), "diameter": None})
+        self.assertTrue(partition.may_match({}))
+        self.assertTrue(partition.may_match({"distance": (0.15, None)}))
+        self.assertTrue(partition.may_match({"velocity": (100.0, None)}))
+        self.assertFalse(partition.may_match({"distance": (0.3, None)}))
+        self.assertFalse(partition.may_match({"distance": (None, 0.05)}))
+        # No approach of the partition has a known diameter.
+        self.assertFalse(partition.may_match({"diameter": (None, 10.0)}))
+
+    def test_round_trip(self):
+        partition = Partition(1999, 5, 9, {"epoch": (1, 2), "diameter": None})
+        copy = Partition.from_dict(partition.to_dict())
+        self.assertEqual(
+            (copy.year, copy.start, copy.stop, copy.ranges),
+            (1999, 5, 9, partition.ranges),
+        )
+
+
+class TestPartitionByYear(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.table = synthetic_table(20000, seed=3)
+        cls.partitions = partition_by_year(cls.table)
+
+    def test_partitions_cover_the_table_by_year(self):
+        self.assertGreater(len(self.partitions), 250)
+        self.assertEqual(self.partitions[0].start, 0)
+        self.assertEqual(self.partitions[-1].stop, len(self.table))
+        for previous, partition in zip(self.partitions, self.partitions[1:]):
+            self.assertEqual(previous.stop, partition.start)
+            self.assertLess(previous.year, partition.year)
+        for partition in self.partitions:
+            years = {
+                minutes_to_datetime(self.table.epochs[row]).year
+                for row in range(partition.start, partition.stop)
+            }
+            self.assertEqual(years, {partition.year})
+            distances = self.table.distances[partition.start : partition.stop]
+            self.assertEqual(
+                partition.ranges["distance"], (min(distances), max(distances))
+            )
+
+    def test_unordered_tables_are_not_partitioned(self):
+        table = synthetic_table(10000, seed=3)
+        random.Random(0).shuffle(table.epochs)
+        self.assertEqual(partition_by_year(table), [])
+
+
+def skewed_table():
+    """Return a table whose early approaches are close, and whose late ones slow."""
+    table = synthetic_table(20000, seed=3)
+    for row in range(len(table)):
+        if row < 5000:
+            table.distances[row] /= 4
+        elif row >= 10000:
+            table.velocities[row] /= 100
+    return table
+
+
+class TestPartitionPruning(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase.from_table(skewed_table())
+        table = skewed_table()
+        cls.partitioned = NEODatabase.from_table(
+            table, partitions=partition_by_year(table)
+        )
+
+    def test_pruned_scans_find_the_same_matches(self):
+        rng = random.Random(42)
+        for _ in range(200):
+            criteria = random_criteria(rng)
+            with self.subTest(criteria=criteria):
+                filters = create_filters(**criteria)
+                self.assertEqual(
+                    list(self.partitioned.query_rows(filters)),
+                    list(self.db.query_rows(filters)),
+                )
+                self.assertEqual(
+                    self.partitioned.count(filters), self.db.count(filters)
+                )
+
+    def test_partitions_ruled_out_by_zone_maps_are_skipped(self):
+        filters = create_filters(velocity_min=0.5, distance_min=0.2)
+        plan = self.partitioned.explain(filters)
+        self.assertIsNotNone(plan.ranges)
+        self.assertLess(len(plan.ranges), plan.partitions)
+        self.assertEqual(
+            plan.examined, sum(stop - start for start, stop in plan.ranges)
+        )
+        self.assertTrue(plan.explain().startswith("Partition scan"))
+        self.assertEqual(plan.matched, self.db.count(filters))
+
+    def test_contradicting_zone_maps_skip_every_partition(self):
+        plan = self.partitioned.explain(create_filters(velocity_min=100.0))
+        self.assertEqual(plan.ranges, [])
+        self.assertEqual(plan.examined, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Check that the query planner estimates selectivity and picks access paths.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_planner
+"""
+
+import datetime
+import pathlib
+import random
+import unittest
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+from planner import Histogram
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestHistogram(unittest.TestCase):
+    def test_estimates_are_close_for_uniform_values(self):
+        rng = random.Random(0)
+        histogram = Histogram([rng.random() for _ in range(10000)])
+        self.assertAlmostEqual(histogram.estimate(0.25, 0.5), 2500, delta=250)
+        self.assertAlmostEqual(histogram.estimate(None, 0.1), 1000, delta=150)
+        self.assertAlmostEqual(histogram.estimate(0.9, None), 1000, delta=150)
+        self.assertEqual(histogram.estimate(None, None), 10000)
+        self.assertEqual(histogram.estimate(2.0, None), 0)
+
+    def test_few_distinct_values_are_counted_exactly(self):
+        histogram = Histogram([1] * 30 + [0] * 70 + [-1] * 5)
+        self.assertEqual(histogram.estimate(True, True), 30)
+        self.assertEqual(histogram.estimate(False, False), 70)
+
+    def test_nan_values_match_nothing(self):
+        histogram = Histogram([float("nan")] * 10 + [1.0, 2.0])
+        self.assertEqual(histogram.nan_count, 10)
+        self.assertEqual(histogram.estimate(None, None), 2)
+
+
+class TestQueryPlanner(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def test_unfiltered_query_is_a_full_scan(self):
+        plan = self.db.plan(create_filters())
+        self.assertIsNone(plan.access)
+        self.assertEqual(plan.residuals, {})
+
+    def test_most_selective_index_drives_the_query(self):
+        plan = self.db.plan(
+            create_filters(
+                start_date=datetime.date(2020, 1, 1),
+                distance_max=0.001,
+                velocity_min=1.0,
+            )
+        )
+        self.assertEqual(plan.access, "distance")
+        self.assertEqual(set(plan.residuals), {"epoch", "velocity"})
+
+    def test_neo_criteria_prefilter_neos(self):
+        filters = create_filters(diameter_min=1.0, hazardous=True, velocity_max=30)
+        plan = self.db.explain(filters)
+        self.assertEqual(plan.access, "neo")
+        self.assertEqual(set(plan.residuals), {"velocity"})
+        self.assertLess(plan.examined, len(self.db._approaches) // 100)
+        self.assertGreater(plan.neos_matched, 0)
+
+    def test_broad_neo_criteria_use_bitmaps(self):
+        filters = create_filters(hazardous=False, diameter_max=1.0, distance_max=0.1)
+        plan = self.db.explain(filters)
+        self.assertEqual(plan.access, "distance")
+        self.assertEqual(set(plan.bitmaps), {"not_hazardous", "diameter_known"})
+        self.assertEqual(set(plan.residuals), {"diameter"})
+        self.assertEqual(plan.matched, len(list(self.db.query(filters))))
+
+    def test_bitmaps_partition_the_approaches(self):
+        total = len(self.db._approaches)
+        hazardous = self.db.bitmap("hazardous")
+        not_hazardous = self.db.bitmap("not_hazardous")
+        self.assertEqual(len(hazardous) + len(not_hazardous), total)
+        self.assertEqual(len(hazardous & not_hazardous), 0)
+        self.assertEqual(len(hazardous | not_hazardous), total)
+        named, unnamed = self.db.bitmap("named"), self.db.bitmap("unnamed")
+        self.assertEqual(len(named | unnamed), total)
+        for row in named:
+            self.assertIsNotNone(self.db._approaches[row].neo.name)
+
+    def test_explain_reports_actual_counts(self):
+        filters = create_filters(date=datetime.date(2020, 3, 2), distance_max=0.1)
+        plan = self.db.explain(filters)
+        self.assertEqual(plan.matched, len(list(self.db.query(filters))))
+        self.assertGreaterEqual(plan.examined, plan.matched)
+        self.assertIn("actual", plan.explain())
+
+    def test_small_top_k_walks_the_ordering_index(self):
+        plan = self.db.explain(create_filters(velocity_min=5), 10, "distance")
+        self.assertEqual(plan.sort, "index")
+        self.assertEqual(plan.access, "distance")
+        self.assertLess(plan.examined, 100)
+        self.assertTrue(plan.explain().startswith("Ordered index scan on distance"))
+
+    def test_selective_top_k_keeps_a_heap(self):
+        filters = create_filters(date=datetime.date(2020, 3, 2))
+        plan = self.db.plan(filters, "velocity", True, 5)
+        self.assertEqual(plan.sort, "heap")
+        self.assertEqual(plan.access, "epoch")
+        self.assertIn("top-5 heap on velocity, descending", plan.explain())
+
+    def test_unlimited_order_sorts_every_match(self):
+        plan = self.db.plan(create_filters(), "diameter")
+        self.assertEqual(plan.sort, "sort")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -15,11 +15,13 @@ These tests should pass when Tasks 3a and 3b are complete.
 
 import datetime
 import pathlib
+import random
 import unittest
 
 from database import NEODatabase
 from extract import load_approaches, load_neos
 from filters import create_filters
+from tests.criteria import random_criteria
 
 TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
 TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
@@ -631,6 +633,110 @@ class TestQuery(unittest.TestCase):
             expected, received, msg="Computed results do not match expected results."
         )
 
+    ####################
+    # Limit and offset #
+    ####################
+
+    def test_query_with_limit_and_offset(self):
+        filters = create_filters(distance_max=0.2)
+        everything = list(self.db.query(filters))
+        self.assertGreater(len(everything), 10)
+
+        self.assertEqual(list(self.db.query(filters, limit=5)), everything[:5])
+        self.assertEqual(
+            list(self.db.query(filters, limit=5, offset=3)), everything[3:8]
+        )
+        self.assertEqual(list(self.db.query(filters, limit=0)), everything)
+        self.assertEqual(list(self.db.query(filters, offset=len(everything))), [])
+
+    def test_query_with_limit_stops_early(self):
+        plan = self.db.plan(create_filters())
+        rows = list(self.db.execute(plan, limit=3))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(plan.matched, 3)
+
+    ############
+    # Counting #
+    ############
+
+    def test_count_matches_query(self):
+        cases = [
+            {},
+            {"hazardous": True},
+            {"hazardous": False},
+            {"distance_max": 0.1},
+            {"start_date": datetime.date(2020, 3, 1)},
+            {"diameter_min": 1.0, "hazardous": True},
+            {"diameter_max": 0.5},
+            {"distance_max": 0.2, "hazardous": False, "diameter_max": 1.0},
+            {"distance_min": 0.3, "distance_max": 0.1},
+        ]
+        rng = random.Random(16)
+        cases.extend(random_criteria(rng) for _ in range(50))
+        for criteria in cases:
+            with self.subTest(**criteria):
+                filters = create_filters(**criteria)
+                self.assertEqual(
+                    self.db.count(filters), len(list(self.db.query(filters)))
+                )
+
+    ############
+    # Ordering #
+    ############
+
+    def expected_order(self, approaches, attribute, descending=False):
+        # Ties keep the order in which the approaches were loaded, reversed when
+        # descending; approaches of NEOs without a known diameter come last.
+        position = {approach: i for i, approach in enumerate(self.approaches)}
+        sign = -1 if descending else 1
+
+        def key(approach):
+            if attribute == "diameter":
+                value = approach.neo.diameter if approach.neo else float("nan")
+            else:
+                value = getattr(approach, attribute)
+            if value != value:
+                return (True, 0, sign * position[approach])
+            if attribute == "time":
+                value = value.timestamp()
+            return (False, sign * value, sign * position[approach])
+
+        return sorted(approaches, key=key)
+
+    def test_query_ordered_by_each_attribute(self):
+        filters = create_filters(start_date=datetime.date(2020, 6, 1))
+        matches = list(self.db.query(filters))
+        for attribute in ("time", "distance", "velocity", "diameter"):
+            for descending in (False, True):
+                with self.subTest(attribute=attribute, descending=descending):
+                    expected = self.expected_order(matches, attribute, descending)
+                    received = list(
+                        self.db.query(
+                            filters, order_by=attribute, descending=descending
+                        )
+                    )
+                    self.assertEqual(expected, received)
+
+    def test_query_top_k(self):
+        for filters in (create_filters(), create_filters(hazardous=True)):
+            matches = list(self.db.query(filters))
+            for attribute in ("time", "distance", "velocity", "diameter"):
+                for descending in (False, True):
+                    with self.subTest(attribute=attribute, descending=descending):
+                        expected = self.expected_order(matches, attribute, descending)[
+                            2:12
+                        ]
+                        received = list(
+                            self.db.query(
+                                filters,
+                                limit=10,
+                                offset=2,
+                                order_by=attribute,
+                                descending=descending,
+                            )
+                        )
+                        self.assertEqual(expected, received)
+
 
 if __name__ == "__main__":
     unittest.main()
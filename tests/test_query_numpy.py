@@ -0,0 +1,64 @@
+"""Check that the NumPy query engine produces the same close approaches as a scan.
+
+These tests rerun every case of `tests.test_query` against a database whose
+queries are evaluated by `vectorized.NumpyEngine`. They are skipped when NumPy
+isn't installed.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_query_numpy
+"""
+
+import unittest
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+from tests import test_query as base
+
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed")
+class TestQueryNumpy(base.TestQuery):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(base.TEST_NEO_FILE)
+        cls.approaches = load_approaches(base.TEST_CAD_FILE)
+        cls.db = NEODatabase(cls.neos, cls.approaches, engine="numpy")
+
+    def test_engine_is_numpy(self):
+        self.assertEqual(self.db.engine, "numpy")
+
+    def test_explain_describes_a_vectorized_scan(self):
+        filters = create_filters(hazardous=True, velocity_min=20)
+        plan = self.db.explain(filters)
+        self.assertEqual(plan.examined, len(self.approaches))
+        self.assertTrue(plan.explain().startswith("Vectorized scan"))
+        self.assertEqual(plan.matched, len(list(self.db.query(filters))))
+
+    def test_query_with_limit_stops_early(self):
+        # A vectorized scan finds every match before the limit is applied.
+        plan = self.db.plan(create_filters())
+        self.assertEqual(len(list(self.db.execute(plan, limit=3))), 3)
+        self.assertEqual(plan.matched, len(self.approaches))
+
+    def test_switching_engines_preserves_results(self):
+        filters = create_filters(distance_max=0.1, diameter_min=0.1)
+        expected = set(self.db.query(filters))
+        self.db.use_engine("python")
+        try:
+            self.assertEqual(set(self.db.query(filters)), expected)
+        finally:
+            self.db.use_engine("numpy")
+
+    def test_unknown_engine(self):
+        with self.assertRaises(ValueError):
+            self.db.use_engine("fortran")
+
+
+if __name__ == "__main__":
+    unittest.main()
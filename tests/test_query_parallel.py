@@ -0,0 +1,120 @@
+"""Check that scanning shards in worker processes produces the same close approaches.
+
+These tests rerun every case of `tests.test_query` against a database that uses
+a pool of worker processes for broad queries, and check that the matches come
+out in the same order as a serial scan.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_query_parallel
+"""
+
+import unittest
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+from parallel import ShardedExecutor
+from tests import test_query as base
+
+
+class TestQueryParallel(base.TestQuery):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(base.TEST_NEO_FILE)
+        cls.approaches = load_approaches(base.TEST_CAD_FILE)
+        cls.db = NEODatabase(cls.neos, cls.approaches)
+        cls.db.use_workers(3)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.use_workers(1)
+
+    def serially(self, function):
+        self.db.use_workers(1)
+        try:
+            return function()
+        finally:
+            self.db.use_workers(3)
+
+    def test_explain_describes_a_parallel_scan(self):
+        filters = create_filters(velocity_min=5)
+        plan = self.db.explain(filters)
+        self.assertEqual(plan.engine, "parallel")
+        self.assertTrue(plan.explain().startswith("Parallel scan"))
+        self.assertIn("across 3 workers", plan.explain())
+        self.assertEqual(plan.matched, self.db.count(filters))
+
+    def test_selective_queries_stay_serial(self):
+        plan = self.db.plan(create_filters(distance_max=0.001))
+        self.assertEqual(plan.engine, "python")
+        self.assertIsNotNone(plan.access)
+
+    def test_matches_come_out_in_serial_order(self):
+        for criteria, order_by, descending, limit in (
+            ({"velocity_min": 5}, None, False, None),
+            ({"hazardous": False}, None, False, 40),
+            ({"velocity_max": 30}, "distance", False, None),
+            ({}, "diameter", True, 25),
+            ({"distance_min": 0.01}, "time", True, 7),
+        ):
+            with self.subTest(criteria=criteria, order_by=order_by, limit=limit):
+                filters = create_filters(**criteria)
+
+                def run():
+                    return list(
+                        self.db.query_rows(
+                            filters,
+                            limit=limit,
+                            order_by=order_by,
+                            descending=descending,
+                        )
+                    )
+
+                self.assertEqual(run(), self.serially(run))
+
+    def test_unordered_matches_are_the_same_set(self):
+        filters = create_filters(velocity_min=5)
+        expected = list(self.db.query_rows(filters))
+        self.db.use_workers(3, ordered=False)
+        try:
+            self.assertEqual(sorted(self.db.query_rows(filters)), sorted(expected))
+        finally:
+            self.db.use_workers(3)
+
+    def test_count_across_workers(self):
+        filters = create_filters(velocity_min=5, diameter_min=0.01)
+        self.assertEqual(
+            self.db.count(filters),
+            self.serially(lambda: self.db.count(filters)),
+        )
+
+    def test_invalid_number_of_workers(self):
+        with self.assertRaises(ValueError):
+            self.db.use_workers(0)
+
+
+class TestShardedExecutor(unittest.TestCase):
+    def test_shards_cover_the_table(self):
+        db = NEODatabase(
+            load_neos(base.TEST_NEO_FILE), load_approaches(base.TEST_CAD_FILE)
+        )
+        table = db._table
+        executor = ShardedExecutor(table, workers=2, shards=5)
+        self.addCleanup(executor.close)
+        self.assertEqual(len(executor.shards), 5)
+        self.assertEqual(executor.shards[0][0], 0)
+        self.assertEqual(executor.shards[-1][1], len(table))
+        for (_, stop), (start, _) in zip(executor.shards, executor.shards[1:]):
+            self.assertEqual(stop, start)
+        self.assertEqual(list(executor.select({})), list(range(len(table))))
+        self.assertEqual(executor.count({}), len(table))
+        # Each shard stops at the limit; the caller stops reading the merged rows.
+        self.assertEqual(
+            list(executor.select({}, limit=3)),
+            [row for start, _ in executor.shards for row in range(start, start + 3)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Check that a SQLite-backed database produces the same close approaches as a scan.
+
+These tests rerun every case of `tests.test_query` against a `SQLiteDatabase`,
+whose queries are translated into SQL and evaluated by SQLite.
+
+To run these tests from the project root, run::
+
+    $ python3 -m unittest --verbose tests.test_query_sqlite
+"""
+
+import unittest
+
+from extract import load_approaches, load_neos
+from filters import create_filters
+from sqlite import SQLiteDatabase
+from tests import test_query as base
+
+
+class TestQuerySQLite(base.TestQuery):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(base.TEST_NEO_FILE)
+        cls.approaches = load_approaches(base.TEST_CAD_FILE)
+        cls.db = SQLiteDatabase(cls.neos, cls.approaches)
+
+    def test_engine_is_sqlite(self):
+        self.assertEqual(self.db.engine, "sqlite")
+        with self.assertRaises(ValueError):
+            self.db.use_engine("python")
+
+    def test_explain_describes_an_indexed_query(self):
+        filters = create_filters(distance_max=0.001, velocity_min=5)
+        plan = self.db.explain(filters)
+        self.assertIn("a.distance <= ?", plan.sql)
+        self.assertIn("a.velocity >= ?", plan.sql)
+        self.assertIn("USING INDEX", plan.explain())
+        self.assertEqual(plan.matched, self.db.count(filters))
+
+    def test_rows_are_fetched_by_id(self):
+        filters = create_filters(hazardous=True, distance_max=0.1)
+        self.assertEqual(
+            list(self.db.fetch(self.db.query_rows(filters))),
+            list(self.db.query(filters)),
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,95 @@
+"""Check that a database shared through shared memory answers queries like the original.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_shared
+"""
+
+import multiprocessing
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+from shared import attach_database
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+def _query_in_worker(name, queue):
+    with attach_database(name) as shared:
+        rows = shared.database.query_rows(
+            create_filters(velocity_min=10), order_by="distance", limit=5
+        )
+        queue.put([str(approach) for approach in shared.database.fetch(rows)])
+
+
+class TestSharedDatabase(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def setUp(self):
+        self.exported = self.db.share()
+        self.addCleanup(self.exported.close)
+        self.shared = attach_database(self.exported.name)
+        self.addCleanup(self.shared.close)
+
+    def test_queries_match_the_original(self):
+        for criteria, order_by, limit in (
+            ({}, None, None),
+            ({"hazardous": True, "velocity_min": 10}, None, None),
+            ({"distance_max": 0.05}, "velocity", 10),
+            ({"diameter_min": 0.1}, "diameter", None),
+        ):
+            with self.subTest(criteria=criteria, order_by=order_by):
+                filters = create_filters(**criteria)
+                expected = list(self.db.query_rows(filters, limit, 0, order_by))
+                rows = list(
+                    self.shared.database.query_rows(filters, limit, 0, order_by)
+                )
+                self.assertEqual(rows, expected)
+                self.assertEqual(
+                    [str(approach) for approach in self.shared.database.fetch(rows)],
+                    [str(approach) for approach in self.db.fetch(rows)],
+                )
+                self.assertEqual(
+                    self.shared.database.count(filters), self.db.count(filters)
+                )
+
+    def test_neos_are_linked_on_lookup(self):
+        neo = self.db.get_neo_by_designation("2020 AY1")
+        shared_neo = self.shared.database.get_neo_by_designation("2020 AY1")
+        self.assertEqual(str(shared_neo), str(neo))
+        self.assertEqual(
+            [str(approach) for approach in shared_neo.approaches],
+            [str(approach) for approach in neo.approaches],
+        )
+
+    def test_workers_attach_to_the_same_segment(self):
+        context = multiprocessing.get_context("spawn")
+        queue = context.Queue()
+        process = context.Process(
+            target=_query_in_worker, args=(self.exported.name, queue)
+        )
+        process.start()
+        result = queue.get(timeout=60)
+        process.join(timeout=60)
+        rows = self.db.query_rows(
+            create_filters(velocity_min=10), order_by="distance", limit=5
+        )
+        self.assertEqual(result, [str(approach) for approach in self.db.fetch(rows)])
+
+    def test_closing_the_export_unlinks_the_segment(self):
+        name = self.exported.name
+        self.shared.close()
+        self.exported.close()
+        with self.assertRaises(FileNotFoundError):
+            attach_database(name)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+"""Check that a linked `NEODatabase` is cached on disk and rebuilt when stale.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_snapshot
+"""
+
+import os
+import pathlib
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import snapshot
+from database import NEODatabase
+from extract import load_approaches, load_neos
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestSnapshot(unittest.TestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = pathlib.Path(tmp.name)
+        self.cache_dir = self.root / "cache"
+        self.neofile = shutil.copy(TEST_NEO_FILE, self.root / "neos.csv")
+        self.cadfile = shutil.copy(TEST_CAD_FILE, self.root / "cad.json")
+
+    def load(self, **kwargs):
+        return snapshot.load_database(
+            self.neofile, self.cadfile, cache_dir=self.cache_dir, **kwargs
+        )
+
+    def test_first_load_writes_a_snapshot(self):
+        db = self.load()
+        self.assertIsInstance(db, NEODatabase)
+        path = snapshot.snapshot_path(self.neofile, self.cadfile, self.cache_dir)
+        self.assertTrue(path.exists())
+
+    def test_second_load_reads_the_linked_snapshot(self):
+        self.load()
+        with unittest.mock.patch.object(snapshot, "iter_approaches") as loader:
+            db = self.load()
+        loader.assert_not_called()
+        halley = db.get_neo_by_designation("2101")
+        self.assertIsNotNone(halley)
+        for approach in halley.approaches:
+            self.assertIs(approach.neo, halley)
+
+    def test_queried_approaches_are_linked_to_their_neos(self):
+        self.load()
+        db = self.load()
+        expected = NEODatabase(load_neos(self.neofile), load_approaches(self.cadfile))
+        for approach in db.query():
+            if approach.neo is None:
+                continue
+            with self.subTest(neo=approach.neo.designation):
+                self.assertTrue(
+                    any(linked is approach for linked in approach.neo.approaches)
+                )
+                self.assertEqual(
+                    [str(linked) for linked in approach.neo.approaches],
+                    [
+                        str(linked)
+                        for linked in expected.get_neo_by_designation(
+                            approach.neo.designation
+                        ).approaches
+                    ],
+                )
+
+    def test_touching_a_source_keeps_the_snapshot(self):
+        self.load()
+        stat = os.stat(self.cadfile)
+        os.utime(self.cadfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with unittest.mock.patch.object(snapshot, "iter_approaches") as loader:
+            self.load()
+        loader.assert_not_called()
+
+    def test_touched_sources_are_only_rehashed_once(self):
+        self.load()
+        stat = os.stat(self.cadfile)
+        os.utime(self.cadfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with unittest.mock.patch.object(
+            snapshot, "_hash_file", wraps=snapshot._hash_file
+        ) as hasher:
+            self.load()
+            self.assertEqual(hasher.call_count, 1)
+            db = self.load()
+            self.assertEqual(hasher.call_count, 1)
+        self.assertIsNotNone(db.get_neo_by_designation("2101"))
+
+    def test_changing_a_source_rebuilds_the_snapshot(self):
+        self.load()
+        with open(self.neofile, "a") as outfile:
+            outfile.write("a9999999,9999999,x,9999999,,,Y,N,,,,,,,,,,,\n")
+        db = self.load()
+        self.assertIsNotNone(db.get_neo_by_designation("9999999"))
+
+    def test_no_cache_and_rebuild_skip_the_snapshot(self):
+        self.load()
+        for kwargs in ({"use_cache": False}, {"rebuild": True}):
+            with unittest.mock.patch.object(
+                snapshot, "iter_approaches", wraps=snapshot.iter_approaches
+            ) as loader:
+                self.load(**kwargs)
+            loader.assert_called_once()
+
+
+if __name__ == "__main__":
+    unittest.main()
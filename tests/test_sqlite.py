@@ -0,0 +1,163 @@
+"""Check that NEOs and close approaches survive a round trip through an SQLite file.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_sqlite
+"""
+
+import datetime
+import os
+import pathlib
+import random
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+import snapshot
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+from sqlite import SQLiteDatabase, load_sqlite
+from tests import test_database
+from tests.criteria import random_criteria
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestDatabaseSQLite(test_database.TestDatabase):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        cls.db = SQLiteDatabase(cls.neos, cls.approaches)
+
+    def test_complete_and_suggest(self):
+        self.assertIn("Syrinx", self.db.complete("syr"))
+        self.assertEqual(self.db.suggest("Syrnx")[0], "Syrinx")
+
+
+class TestSQLiteFile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.root = pathlib.Path(tmp.name)
+        self.neofile = shutil.copy(TEST_NEO_FILE, self.root / "neos.csv")
+        self.cadfile = shutil.copy(TEST_CAD_FILE, self.root / "cad.json")
+        self.path = self.root / "neos.sqlite"
+
+    def load(self, **kwargs):
+        database = load_sqlite(self.path, self.neofile, self.cadfile, **kwargs)
+        self.addCleanup(database.close)
+        return database
+
+    def test_reopened_file_answers_like_the_original(self):
+        self.load()
+        reopened = SQLiteDatabase.open(self.path)
+        self.addCleanup(reopened.close)
+        rng = random.Random(25)
+        for criteria in [{}] + [random_criteria(rng) for _ in range(40)]:
+            with self.subTest(criteria=criteria):
+                filters = create_filters(**criteria)
+                self.assertEqual(
+                    [str(approach) for approach in reopened.query(filters)],
+                    [str(approach) for approach in self.db.query(filters)],
+                )
+                self.assertEqual(reopened.count(filters), self.db.count(filters))
+                self.assertEqual(
+                    list(reopened.query_rows(filters, limit=3)),
+                    list(self.db.query_rows(filters, limit=3)),
+                )
+                self.assertEqual(
+                    list(reopened.query_rows(filters, limit=5, order_by="diameter")),
+                    list(self.db.query_rows(filters, limit=5, order_by="diameter")),
+                )
+
+    def test_reopened_neos_and_their_approaches(self):
+        self.load()
+        reopened = SQLiteDatabase.open(self.path)
+        self.addCleanup(reopened.close)
+        neo = reopened.get_neo_by_name("Syrinx")
+        expected = self.db.get_neo_by_name("Syrinx")
+        self.assertEqual(str(neo), str(expected))
+        self.assertEqual(
+            [str(approach) for approach in neo.approaches],
+            [str(approach) for approach in expected.approaches],
+        )
+        self.assertIs(reopened.get_neo_by_designation("3360"), neo)
+        # An approach created by a query is the one linked to its NEO.
+        approach = next(
+            approach
+            for approach in reopened.query(
+                create_filters(date=neo.approaches[0].time.date())
+            )
+            if approach._designation == "3360"
+        )
+        self.assertIs(approach.neo, neo)
+        self.assertIn(approach, neo.approaches)
+
+    def test_aggregates_match_the_original(self):
+        database = self.load()
+        metrics = ["count", "min_distance", "mean_velocity", "sum_diameter"]
+        filters = create_filters(start_date=datetime.date(2020, 6, 1))
+        for group_by in (None, "year", "month", "neo", "hazardous"):
+            with self.subTest(group_by=group_by):
+                received = database.aggregate(filters, group_by, metrics)
+                expected = self.db.aggregate(filters, group_by, metrics)
+                self.assertEqual(list(received), list(expected))
+                for group, values in expected.items():
+                    for metric, value in values.items():
+                        if value is None:
+                            self.assertIsNone(received[group][metric])
+                        else:
+                            self.assertAlmostEqual(received[group][metric], value)
+        nothing = create_filters(distance_min=0.5, distance_max=0.1)
+        self.assertEqual(
+            database.aggregate(nothing, None, metrics),
+            self.db.aggregate(nothing, None, metrics),
+        )
+        with self.assertRaises(ValueError):
+            database.aggregate(filters, "decade")
+
+    def test_changing_a_data_file_rebuilds_the_file(self):
+        self.load()
+        modified = self.path.stat().st_mtime_ns
+        self.load()
+        self.assertEqual(self.path.stat().st_mtime_ns, modified)
+        with open(self.cadfile, "a") as outfile:
+            outfile.write("\n")
+        self.load()
+        self.assertNotEqual(self.path.stat().st_mtime_ns, modified)
+
+    def test_touched_data_files_are_only_rehashed_once(self):
+        self.load()
+        stat = os.stat(self.cadfile)
+        os.utime(self.cadfile, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        with unittest.mock.patch.object(
+            snapshot, "_hash_file", wraps=snapshot._hash_file
+        ) as hasher:
+            self.load()
+            database = self.load()
+        self.assertEqual(hasher.call_count, 1)
+        self.assertEqual(database.count(), len(self.db._approaches))
+
+    def test_without_cache_no_file_is_written(self):
+        database = self.load(use_cache=False)
+        self.assertEqual(database.count(), len(self.db._approaches))
+        self.assertFalse(self.path.exists())
+
+    def test_opening_other_files(self):
+        with self.assertRaises(ValueError):
+            SQLiteDatabase.open(self.root / "missing.sqlite")
+        with self.assertRaises(ValueError):
+            SQLiteDatabase.open(self.neofile)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,170 @@
+"""Check that streaming queries find the same matches as a loaded database.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_stream
+"""
+
+import datetime
+import pathlib
+import shutil
+import tempfile
+import unittest
+
+from columnar import convert
+from database import NEODatabase
+from extract import load_approaches, load_neos
+from filters import create_filters
+from stream import APPROACH_BYTES, parse_size, stream_matches, stream_query
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+QUERIES = (
+    {},
+    {"date": datetime.date(2020, 3, 2)},
+    {"start_date": datetime.date(2020, 6, 1), "velocity_min": 20},
+    {"distance_max": 0.05, "hazardous": False},
+    {"diameter_min": 0.5, "diameter_max": 1.5},
+    {"velocity_min": 10, "velocity_max": 5},
+)
+
+
+class TestParseSize(unittest.TestCase):
+    def test_units(self):
+        self.assertEqual(parse_size("4096"), 4096)
+        self.assertEqual(parse_size("2k"), 2048)
+        self.assertEqual(parse_size("512M"), 512 << 20)
+        self.assertEqual(parse_size("1.5GiB"), 3 << 29)
+
+    def test_invalid_sizes(self):
+        for text in ("", "0", "-1M", "12 parsecs"):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                parse_size(text)
+
+
+class TestStreamQuery(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.db = NEODatabase(load_neos(TEST_NEO_FILE), load_approaches(TEST_CAD_FILE))
+
+    def stream(self, criteria, **kwargs):
+        # A budget of a few dozen approaches splits the file into many chunks.
+        return stream_query(
+            create_filters(**criteria),
+            TEST_NEO_FILE,
+            TEST_CAD_FILE,
+            40 * APPROACH_BYTES,
+            **kwargs,
+        )
+
+    def test_matches_are_those_of_the_database(self):
+        for criteria in QUERIES:
+            with self.subTest(criteria=criteria):
+                self.assertEqual(
+                    [str(approach) for approach in self.stream(criteria)],
+                    [
+                        str(approach)
+                        for approach in self.db.query(create_filters(**criteria))
+                    ],
+                )
+
+    def test_limited_and_ordered_queries(self):
+        for order_by in (None, "time", "distance", "velocity", "diameter"):
+            for descending in (False, True):
+                with self.subTest(order_by=order_by, descending=descending):
+                    criteria = {"start_date": datetime.date(2020, 10, 1)}
+                    self.assertEqual(
+                        [
+                            str(approach)
+                            for approach in self.stream(
+                                criteria,
+                                limit=25,
+                                order_by=order_by,
+                                descending=descending,
+                            )
+                        ],
+                        [
+                            str(approach)
+                            for approach in self.db.query(
+                                create_filters(**criteria),
+                                limit=25,
+                                order_by=order_by,
+                                descending=descending,
+                            )
+                        ],
+                    )
+
+    def test_ordered_queries_must_fit_in_the_budget(self):
+        with self.assertRaises(ValueError):
+            self.stream({}, order_by="distance")
+        with self.assertRaises(ValueError):
+            self.stream({}, limit=41, order_by="distance")
+
+    def test_approaches_are_not_kept_by_their_neos(self):
+        matches = stream_matches(
+            create_filters(diameter_min=0.5), TEST_NEO_FILE, TEST_CAD_FILE, 1 << 20
+        )
+        for approach in matches:
+            self.assertIsNotNone(approach.neo)
+            self.assertEqual(approach.neo.approaches, [])
+
+
+class TestStreamColumnar(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        tmp = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(tmp.cleanup)
+        root = pathlib.Path(tmp.name)
+        cls.neofile = shutil.copy(TEST_NEO_FILE, root / "neos.csv")
+        cls.cadfile = shutil.copy(TEST_CAD_FILE, root / "cad.json")
+        cls.directory = root / "columnar"
+        cls.db = convert(cls.neofile, cls.cadfile, cls.directory)
+
+    def test_matches_are_those_of_the_converted_database(self):
+        for criteria in QUERIES:
+            for memory_limit in (1000, 1 << 20):
+                with self.subTest(criteria=criteria, memory_limit=memory_limit):
+                    filters = create_filters(**criteria)
+                    self.assertEqual(
+                        [
+                            str(approach)
+                            for approach in stream_query(
+                                filters,
+                                self.neofile,
+                                self.cadfile,
+                                memory_limit,
+                                directory=self.directory,
+                            )
+                        ],
+                        [str(approach) for approach in self.db.query(filters)],
+                    )
+
+    def test_ordered_queries(self):
+        filters = create_filters(hazardous=True)
+        self.assertEqual(
+            [
+                str(approach)
+                for approach in stream_query(
+                    filters,
+                    self.neofile,
+                    self.cadfile,
+                    1 << 20,
+                    limit=10,
+                    order_by="velocity",
+                    descending=True,
+                    directory=self.directory,
+                )
+            ],
+            [
+                str(approach)
+                for approach in self.db.query(
+                    filters, limit=10, order_by="velocity", descending=True
+                )
+            ],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
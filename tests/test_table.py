@@ -0,0 +1,102 @@
+"""Check that an `ApproachTable` mirrors the close approaches it is built from.
+
+To run these tests from the project root, run:
+
+    $ python3 -m unittest --verbose tests.test_table
+"""
+
+import math
+import pathlib
+import unittest
+
+from database import NEODatabase
+from extract import iter_approaches, load_approaches, load_neos
+from table import ApproachTable
+
+TESTS_ROOT = (pathlib.Path(__file__).parent).resolve()
+TEST_NEO_FILE = TESTS_ROOT / "test-neos-2020.csv"
+TEST_CAD_FILE = TESTS_ROOT / "test-cad-2020.json"
+
+
+class TestApproachTable(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.neos = load_neos(TEST_NEO_FILE)
+        cls.approaches = load_approaches(TEST_CAD_FILE)
+        NEODatabase(cls.neos, cls.approaches)
+        cls.table = ApproachTable.from_approaches(cls.neos, cls.approaches)
+
+    def test_table_has_a_row_per_approach(self):
+        self.assertEqual(len(self.table), len(self.approaches))
+
+    def test_rows_are_the_original_approaches(self):
+        for i, approach in enumerate(self.approaches):
+            self.assertIs(self.table.row(i), approach)
+
+    def test_rows_without_objects_are_materialized_from_columns(self):
+        table = ApproachTable(
+            self.neos,
+            self.table.epochs,
+            self.table.distances,
+            self.table.velocities,
+            self.table.neo_index,
+        )
+        for i in (0, len(table) // 2, len(table) - 1):
+            view, approach = table.row(i), self.approaches[i]
+            self.assertIsNot(view, approach)
+            self.assertEqual(view.time, approach.time)
+            self.assertEqual(view.distance, approach.distance)
+            self.assertEqual(view.velocity, approach.velocity)
+            self.assertIs(view.neo, approach.neo)
+            self.assertIs(table.row(i), view)
+
+    def test_streamed_tables_keep_only_unlinked_approaches(self):
+        neos = self.neos[1:]
+        table = ApproachTable.from_stream(neos, iter_approaches(TEST_CAD_FILE))
+        self.assertEqual(list(table.epochs), list(self.table.epochs))
+        self.assertEqual(list(table.distances), list(self.table.distances))
+        unlinked = sorted(table.rows)
+        self.assertEqual(
+            unlinked, [i for i, p in enumerate(table.neo_index) if p == len(neos)]
+        )
+        self.assertGreater(len(unlinked), 0)
+        for i in unlinked:
+            self.assertIsNone(table.row(i).neo)
+        approach = self.approaches[-1]
+        view = table.row(len(table) - 1)
+        self.assertEqual(view.time, approach.time)
+        self.assertEqual(view.neo.designation, approach.neo.designation)
+
+    def test_unlinked_approaches_never_match_neo_criteria(self):
+        approaches = load_approaches(TEST_CAD_FILE)[:3]
+        table = ApproachTable.from_approaches(self.neos, approaches)
+        self.assertTrue(math.isnan(table.diameters[table.neo_index[0]]))
+        self.assertEqual(list(table.select({"hazardous": (False, False)})), [])
+        self.assertEqual(list(table.select({"hazardous": (True, True)})), [])
+        self.assertEqual(list(table.select({"diameter": (None, 100.0)})), [])
+        self.assertEqual(list(table.select({"distance": (0, None)})), [0, 1, 2])
+
+    def test_database_from_table_links_neos_on_demand(self):
+        neos = load_neos(TEST_NEO_FILE)
+        table = ApproachTable(
+            neos,
+            self.table.epochs,
+            self.table.distances,
+            self.table.velocities,
+            self.table.neo_index,
+        )
+        db = NEODatabase.from_table(table)
+        self.assertEqual(len(list(db.query())), len(self.approaches))
+        self.assertEqual(db._approaches[-1].time, self.approaches[-1].time)
+
+        original = self.neos[self.table.neo_index[0]]
+        neo = db.get_neo_by_designation(original.designation)
+        self.assertEqual(
+            [approach.time for approach in neo.approaches],
+            [approach.time for approach in original.approaches],
+        )
+        self.assertTrue(all(approach.neo is neo for approach in neo.approaches))
+
+
+if __name__ == "__main__":
+    unittest.main()
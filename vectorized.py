@@ -0,0 +1,101 @@
+"""Evaluate queries over an `ApproachTable` with NumPy boolean masks.
+
+The `NumpyEngine` is an optional query engine for `NEODatabase`, selected with
+`--engine numpy`. It views the table's approach columns as NumPy arrays without
+copying them, and gathers the diameter and hazard flag of each approach's NEO
+into two more contiguous arrays. A query's compiled intervals then become a few
+vectorized comparisons combined into one mask, and only the indices of matching
+rows are handed back to the database, ordered by a column with one `lexsort`
+when the query asks for an order.
+
+NumPy isn't a runtime requirement of this project, so this module is only
+imported when the engine is selected.
+"""
+
+from typing import Any, Dict, Mapping, Tuple
+
+import numpy as np
+
+from table import ApproachTable
+
+
+class NumpyEngine:
+    """A vectorized query engine over the columns of an `ApproachTable`."""
+
+    def __init__(self, table: ApproachTable) -> None:
+        """Prepare the columns of a table for vectorized evaluation.
+
+        :param table: The table to query.
+        """
+
+        def view(column: Any) -> np.ndarray:
+            # Columns are arrays, or memoryviews of shared memory.
+            return np.frombuffer(
+                column, dtype=getattr(column, "typecode", None) or column.format
+            )
+
+        neo_index = view(table.neo_index)
+        self.size = len(table)
+        self.columns: Dict[str, np.ndarray] = {
+            "epoch": view(table.epochs),
+            "distance": view(table.distances),
+            "velocity": view(table.velocities),
+            "diameter": view(table.diameters)[neo_index],
+            "hazardous": view(table.hazardous)[neo_index],
+        }
+
+    def mask(self, bounds: Mapping[str, Tuple[Any, Any]]) -> np.ndarray:
+        """Mark the rows whose columns fall within every interval.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :return: A boolean array, true at the matching row ids.
+        """
+        mask = np.ones(self.size, dtype=bool)
+        for column, (low, high) in bounds.items():
+            values = self.columns[column]
+            if low is not None:
+                mask &= values >= low
+            if high is not None:
+                mask &= values <= high
+        return mask
+
+    def select(self, bounds: Mapping[str, Tuple[Any, Any]]) -> np.ndarray:
+        """Find the rows whose columns fall within every interval.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :return: The matching row ids, in ascending order.
+        """
+        return np.flatnonzero(self.mask(bounds))
+
+    def count(self, bounds: Mapping[str, Tuple[Any, Any]]) -> int:
+        """Count the rows whose columns fall within every interval.
+
+        :param bounds: The closed (low, high) interval of each constrained column.
+        :return: The number of matching rows.
+        """
+        return int(np.count_nonzero(self.mask(bounds)))
+
+    def order(
+        self,
+        rows: np.ndarray,
+        column: str,
+        descending: bool = False,
+        count: int | None = None,
+    ) -> np.ndarray:
+        """Order row ids by a column, as `ApproachTable.sort_key` does.
+
+        :param rows: The row ids to order.
+        :param column: The column to order by.
+        :param descending: Whether larger values come first.
+        :param count: The number of leading rows wanted, or `None` for all.
+        :return: The ordered row ids.
+        """
+        sign = -1 if descending else 1
+        values = self.columns[column][rows]
+        unknown = (
+            np.isnan(values)
+            if values.dtype.kind == "f"
+            else np.zeros_like(rows, dtype=bool)
+        )
+        keys = np.where(unknown, 0, values) * sign
+        return rows[np.lexsort((rows * sign, keys, unknown))[:count]]
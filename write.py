@@ -8,18 +8,22 @@ These functions are invoked by the main module with the output of the `limit`
 function and the filename supplied by the user at the command line. The file's
 extension determines which of these functions is used.
 
+Both functions write each result as soon as it is drawn from the stream, so
+they never hold more than one result in memory - which lets a streaming query
+(see the `stream` module) write more matches than fit in memory.
+
 You'll edit this file in Part 4.
 """
 
 import csv
 import json
 import pathlib
-from typing import List
+from typing import Iterable
 
 from models import CloseApproach
 
 
-def write_to_csv(results: List[CloseApproach], filename: pathlib.PosixPath) -> None:
+def write_to_csv(results: Iterable[CloseApproach], filename: pathlib.PosixPath) -> None:
     """Write an iterable of `CloseApproach` objects to a CSV file.
 
     The precise output specification is in `README.md`. Roughly, each output row
@@ -54,7 +58,9 @@ def write_to_csv(results: List[CloseApproach], filename: pathlib.PosixPath) -> N
             writer.writerow(row)
 
 
-def write_to_json(results: List[CloseApproach], filename: pathlib.PosixPath) -> None:
+def write_to_json(
+    results: Iterable[CloseApproach], filename: pathlib.PosixPath
+) -> None:
     """Write an iterable of `CloseApproach` objects to a JSON file.
 
     The precise output specification is in `README.md`. Roughly, the output is a
@@ -66,9 +72,13 @@ def write_to_json(results: List[CloseApproach], filename: pathlib.PosixPath) ->
     :param filename: A Path-like object pointing to where the data should be saved.
     """
     with open(filename, "w") as outfile:
-        final_json_list = []
-        for result in results:
+        # Write the list one element at a time, formatted exactly as `json.dump`
+        # would format the whole list.
+        outfile.write("[")
+        for i, result in enumerate(results):
+            if i:
+                outfile.write(", ")
             result_dict = result.serialize()
             result_dict["neo"] = result.neo.serialize()  # type: ignore
-            final_json_list.append(result_dict)
-        json.dump(final_json_list, outfile)
+            json.dump(result_dict, outfile)
+        outfile.write("]")